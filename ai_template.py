@@ -1,5 +1,37 @@
 import random
+import threading
+import time
+from batch_eval import BatchEvaluator
+from bitboard import (BLACK, COLOR_NAMES, EMPTY, FULL_MASK, INVERSE_SYMMETRIES, OPPONENT, RED, SQUARE_BITS,
+                      WIN_MASKS, board_to_bitboards, generate_moves, has_win, iter_bits, mobility, pattern_codes,
+                      transform_move, wins_through)
 from history_analyzer import HistoryAnalyzer
+from opening_book import open_book
+from parallel_search import ROOT_ALPHA_MARGIN, ROOT_EXACT_MOVES, RootSearchPool
+from search_state import SearchState, pattern_tables
+from search_stats import SearchStats
+from tablebase import DRAW, WIN, open_tablebase
+from threat_search import THREAT_SEARCH_DEPTH, ThreatSearch
+from transposition import EXACT, LOWER, UPPER, TranspositionTable, encode_move
+from zobrist import PIECE_KEYS, SIDE_KEY
+
+WIN_SCORE = 10000  # Score d'une position gagnée, du point de vue de l'IA
+MAX_SEARCH_DEPTH = 32  # Profondeur maximale de l'approfondissement itératif
+ASPIRATION_WINDOW = 50  # Demi-largeur de la fenêtre d'aspiration de l'approfondissement itératif
+REPETITION_PENALTY = 1000  # Pénalité d'un coup racine qui reproduit une position récente (mode expert)
+
+
+class SearchTimeout(Exception):
+    """
+    Levée lorsque la recherche dépasse son budget de temps ou de nœuds.
+    """
+
+
+class SearchCancelled(Exception):
+    """
+    Levée lorsque la recherche est annulée de l'extérieur (voir TeekoAI.cancel).
+    """
+
 
 class TeekoAI:
     """
@@ -10,16 +42,56 @@ class TeekoAI:
     complexe, et plusieurs optimisations pour améliorer les performances et la 
     pertinence stratégique des coups.
     """
-    def __init__(self, game_engine, who, difficulty="2"):
+    def __init__(self, game_engine, who, difficulty="2", transposition_table=None,
+                 time_budget=None, node_budget=None, max_depth=None, tablebase=None, opening_book=None,
+                 workers=1, collect_stats=False, stats_log=None, threat_depth=None):
         """
         Initialise l'intelligence artificielle.
 
         :param game_engine: L'instance du moteur de jeu pour interagir avec l'état de la partie.
-        :param who: La couleur du joueur que l'IA incarne ('black' ou 'red').
-        :type who: str
+        :param who: Le joueur que l'IA incarne (BLACK ou RED, voir bitboard.py).
+        :type who: int
         :param difficulty: Le niveau de difficulté de l'IA, de "1" à "5".
                          Le niveau "5" active le mode expert adaptatif.
         :type difficulty: str
+        :param transposition_table: Une table de transposition à réutiliser,
+                                    par exemple partagée entre plusieurs parties.
+                                    Par défaut, une nouvelle table est allouée.
+        :type transposition_table: TranspositionTable or None
+        :param time_budget: Temps de réflexion maximal par coup, en secondes.
+                            Active l'approfondissement itératif.
+        :type time_budget: float or None
+        :param node_budget: Nombre maximal de nœuds explorés par coup.
+                            Active l'approfondissement itératif.
+        :type node_budget: int or None
+        :param max_depth: Profondeur maximale de l'approfondissement itératif
+                          (par défaut MAX_SEARCH_DEPTH).
+        :type max_depth: int or None
+        :param tablebase: La table de finales de la phase de mouvement. Par
+                          défaut, aux niveaux "4" et "5", le fichier généré par
+                          tablebase.py s'il existe ; False pour s'en passer.
+        :type tablebase: Tablebase or None
+        :param opening_book: Le livre d'ouvertures de la phase de placement.
+                             Par défaut, aux niveaux "4" et "5", le fichier
+                             généré par opening_book.py s'il existe ; False
+                             pour s'en passer.
+        :type opening_book: OpeningBook or None
+        :param workers: Le nombre de processus entre lesquels répartir les
+                        coups racine (voir parallel_search.py). Avec 1, la
+                        recherche reste dans le processus courant.
+        :type workers: int
+        :param collect_stats: True pour relever les statistiques de chaque
+                              décision dans last_stats (voir search_stats.py).
+        :type collect_stats: bool
+        :param stats_log: Un fichier auquel ajouter ces statistiques, une
+                          ligne JSON par coup. Active leur collecte.
+        :type stats_log: str or None
+        :param threat_depth: La profondeur de la recherche de gains forcés par
+                             menaces en phase de mouvement (voir
+                             threat_search.py), en coups de l'attaquant. Par
+                             défaut THREAT_SEARCH_DEPTH aux niveaux "4" et
+                             "5", et 0 (désactivée) sinon.
+        :type threat_depth: int or None
         """
         self.game_engine = game_engine
         self.who_am_i = who
@@ -46,13 +118,58 @@ class TeekoAI:
 
         self.last_opponent_move = None
         self.last_move = None
-        self.last_moves = []
+        self.last_moves = []  # Hachages de Zobrist des dernières positions jouées par l'IA
         self.max_repetitions = 2
 
         # Modules d'analyse et de performance
-        self.analyzer = HistoryAnalyzer()
+        self.analyzer = HistoryAnalyzer(game_engine.win_patterns)
         self.move_history = []
-        self.transposition_table = {}
+        self.aggression_factor = 1.0  # Mis à jour à chaque coup réel, lu par l'évaluation
+        self.transposition_table = transposition_table if transposition_table is not None else TranspositionTable()
+        if tablebase is None and self.base_difficulty >= 4:
+            tablebase = open_tablebase()
+        self.tablebase = tablebase or None  # Résultats exacts de la phase de mouvement
+        if opening_book is None and self.base_difficulty >= 4:
+            opening_book = open_book()
+        self.opening_book = opening_book or None  # Coups précalculés de la phase de placement
+        if threat_depth is None:
+            threat_depth = THREAT_SEARCH_DEPTH if self.base_difficulty >= 4 else 0
+        self.threat_depth = threat_depth  # Gains forcés par menaces, cherchés avant la recherche principale
+        self.workers = workers
+        self.root_pool = None  # Processus de la recherche racine, démarrés à la première recherche
+        # Dans un processus de la recherche racine parallèle : demi-coup du nœud
+        # fils d'un coup racine, et lecture de son beta tenu à jour par les
+        # autres processus (voir parallel_search.py)
+        self.shared_bound_ply = None
+        self.shared_bound = None
+
+        # Heuristiques d'ordre des coups : deux coups meurtriers par profondeur
+        # (coups ayant provoqué une coupure) et historique des coupures par coup
+        self.killers = [[None, None] for _ in range(MAX_SEARCH_DEPTH + 2)]
+        self.history = [0] * 650  # Indexé par encode_move
+        self.search_id = 0  # Numéro de la recherche, transmis aux processus de la recherche parallèle
+
+        # Budget de recherche par coup (approfondissement itératif)
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.max_depth = max_depth
+        self.deadline = None
+        self.budget_active = False
+        self.nodes = 0
+        self.depth_reached = 0
+        self.cancel_event = threading.Event()  # Positionné par cancel() depuis un autre thread
+        self.last_iteration = None  # (hachage, profondeur, [(coup, score), ...]) de la dernière itération complète
+
+        # Statistiques de la recherche (désactivées par défaut, sans coût)
+        self.collect_stats = collect_stats or stats_log is not None
+        self.stats_log = stats_log
+        self.stats = None  # Statistiques de la décision en cours
+        self.last_stats = None  # Statistiques de la dernière décision
+        self.decision = (None, None)  # Origine et score du dernier coup choisi
+
+        # Réflexion anticipée pendant le tour de l'adversaire
+        self.ponder_move = None
+        self.ponder_result = None
 
         # Matrice de valeurs pour l'évaluation positionnelle des cases.
         # Le centre et les zones adjacentes ont plus de valeur.
@@ -63,6 +180,7 @@ class TeekoAI:
             2, 3, 4, 3, 2, 
             1, 2, 2, 2, 1
         ]
+        self.batch_evaluator = BatchEvaluator(self.positional_values)  # Évaluation en lot des coups fils
 
     def record_opponent_move(self, move):
         """
@@ -72,8 +190,30 @@ class TeekoAI:
         """
         if move is None: return
         self.last_opponent_move = move
-        opponent_color = 'red' if self.who_am_i == 'black' else 'black'
-        self.move_history.append({'move': move, 'player': opponent_color})
+        opponent = OPPONENT[self.who_am_i]
+        self.move_history.append({'move': move, 'player': opponent})
+        self.analyzer.record_move(move, opponent)
+        self.update_aggression_factor()
+
+    def update_aggression_factor(self):
+        """
+        Recalcule le facteur d'agressivité à partir du style de l'adversaire.
+
+        Appelée une seule fois par coup réellement joué : l'évaluation, appelée
+        à chaque feuille de la recherche, se contente de lire la valeur. Les
+        scores de la table de transposition et de la réflexion anticipée ont
+        été calculés avec l'ancien facteur : s'il change, ils sont oubliés.
+        """
+        aggression_factor = 1.0
+        if len(self.move_history) > 4:
+            opponent = OPPONENT[self.who_am_i]
+            all_styles = self.analyzer.get_player_styles()
+            if all_styles and (opponent_style := all_styles.get(opponent)) and opponent_style['offensive_ratio'] > 0.6:
+                aggression_factor = 1.5
+        if aggression_factor != self.aggression_factor:
+            self.transposition_table.clear()
+            self.ponder_result = None
+        self.aggression_factor = aggression_factor
 
     def evaluate_board(self, board):
         """
@@ -87,190 +227,349 @@ class TeekoAI:
         - Menaces directes et potentiel offensif (alignements de 2 ou 3 pions).
         - Style de jeu de l'adversaire (facteur d'agressivité).
 
+        La pénalité de répétition du mode expert n'en fait pas partie : elle
+        dépend de l'historique de la partie et non de la position, et n'est
+        appliquée qu'aux coups racine (voir search_root), hors de la table de
+        transposition.
+
         :param board: L'état du plateau à évaluer.
-        :type board: list
+        :type board: bytearray
         :return: Le score numérique représentant l'avantage de la position.
                  Un score positif favorise l'IA, un score négatif l'adversaire.
         :rtype: int
         """
-        opponent = 'red' if self.who_am_i == 'black' else 'black'
-        win_patterns = self.game_engine.win_patterns
+        mine, theirs = self._bitboards(board, self.who_am_i)
+        return self._score(mine, theirs)
+
+    def evaluate_state(self, state):
+        """
+        Évalue la position courante d'une copie de travail du moteur.
+
+        Équivalent à evaluate_board, mais réutilise les bitboards déjà tenus
+        à jour par push/pop au lieu de les reconstruire. Le gagnant éventuel
+        est déjà connu (push ne teste que les configurations passant par la
+        case jouée), ce qui évite de rechercher les états terminaux.
+        Sur un SearchState, les termes de l'évaluation sont eux aussi déjà à
+        jour et il ne reste qu'à les combiner.
+
+        :param state: La copie de travail du moteur de jeu.
+        :type state: TeekoGame
+        :return: Le score de la position du point de vue de l'IA.
+        :rtype: int
+        """
+        if state.winner is not None:
+            return WIN_SCORE if state.winner == self.who_am_i else -WIN_SCORE
+        if isinstance(state, SearchState) and state.who == self.who_am_i:
+            return state.static_score()
+        return self._score(state.bitboards[self.who_am_i], state.bitboards[OPPONENT[self.who_am_i]], check_terminal=False)
+
+    def _score(self, mine, theirs, check_terminal=True):
+        """
+        Calcule le score heuristique à partir des bitboards des deux camps.
+
+        :param mine: Le bitboard des pions de l'IA.
+        :type mine: int
+        :param theirs: Le bitboard des pions adverses.
+        :type theirs: int
+        :param check_terminal: False si l'on sait déjà que personne n'a gagné.
+        :type check_terminal: bool
+        :return: Le score de la position du point de vue de l'IA.
+        :rtype: int
+        """
         score = 0
-        is_move_phase = sum(1 for pos in board if pos is not None) >= 8
+        occupied = mine | theirs
+        is_move_phase = occupied.bit_count() >= 8
 
-        # Analyse du style adverse pour ajuster la stratégie
-        aggression_factor = 1.0
-        if len(self.move_history) > 4:
-            all_styles = self.analyzer.analyze_player_styles(self.move_history, win_patterns)
-            if all_styles and (opponent_style := all_styles.get(opponent)) and opponent_style['offensive_ratio'] > 0.6:
-                aggression_factor = 1.5
+        # Style adverse (voir update_aggression_factor) pour ajuster la stratégie
+        aggression_factor = self.aggression_factor
 
         # Évaluation des états terminaux (priorité absolue)
-        for pattern in win_patterns:
-            if all(board[pos] == self.who_am_i for pos in pattern): return 10000
-            if all(board[pos] == opponent for pos in pattern): return -10000
-        
-        # Pénalité pour les répétitions d'états en mode expert
-        if self.adaptatif and tuple(board) in self.last_moves:
-            score -= 1000
+        if check_terminal:
+            if has_win(mine): return WIN_SCORE
+            if has_win(theirs): return -WIN_SCORE
 
         # Évaluation du contrôle positionnel
-        positional_score = sum(self.positional_values[i] if board[i] == self.who_am_i else -self.positional_values[i] for i in range(25) if board[i])
+        positional_values = self.positional_values
+        positional_score = sum(positional_values[i] for i in iter_bits(mine)) - sum(positional_values[i] for i in iter_bits(theirs))
         score += positional_score * 2
 
         # Évaluation de la mobilité en phase de mouvement
         if is_move_phase:
-            my_moves_count = len(self.get_all_possible_moves(board, self.who_am_i))
-            opp_moves_count = len(self.get_all_possible_moves(board, opponent))
-            score += (my_moves_count - opp_moves_count) * 3
-
-        # Évaluation des menaces et du potentiel offensif
-        my_threats_3, opp_threats_3 = 0, 0
-        for pattern in win_patterns:
-            my_pieces = sum(1 for pos in pattern if board[pos] == self.who_am_i)
-            opp_pieces = sum(1 for pos in pattern if board[pos] == opponent)
+            empty = FULL_MASK & ~occupied
+            score += (mobility(mine, empty) - mobility(theirs, empty)) * 3
 
-            if my_pieces > 0 and opp_pieces > 0: continue # Ligne sans potentiel
-
-            if my_pieces == 3: my_threats_3 += 1
-            elif my_pieces == 2: score += 20
-            elif my_pieces == 1: score += 5
+        # Évaluation des menaces et du potentiel offensif : le score de chaque
+        # configuration est lu dans une table indexée par son code en base 3
+        values = pattern_tables(aggression_factor)[0]
+        score += sum(values[code] for code in pattern_codes(mine, theirs))
+        return score
 
-            if opp_pieces == 3: opp_threats_3 += 1
-            elif opp_pieces == 2: score -= 30 * aggression_factor
-            elif opp_pieces == 1: score -= 5 * aggression_factor
+    def _bitboards(self, board, player):
+        """
+        Convertit un plateau en bitboards, vus depuis un joueur donné.
 
-        score += my_threats_3 * 200
-        score -= opp_threats_3 * 250 * aggression_factor
-        return score
+        :param board: L'état du plateau.
+        :type board: bytearray
+        :param player: Le joueur de référence.
+        :type player: int
+        :return: Les bitboards du joueur et de son adversaire.
+        :rtype: tuple[int, int]
+        """
+        black, red = board_to_bitboards(board)
+        return (black, red) if player == BLACK else (red, black)
 
-    def _check_board_winner(self, board):
+    def _check_board_winner(self, board, last_move=None):
         """
         Vérifie s'il y a un gagnant sur le plateau donné.
 
         :param board: L'état du plateau à vérifier.
-        :type board: list
-        :return: La couleur du joueur gagnant, ou None si personne n'a gagné.
-        :rtype: str or None
+        :type board: bytearray
+        :param last_move: Le coup qui vient d'être joué sur ce plateau. S'il est
+                          fourni, seules les configurations passant par sa case
+                          d'arrivée sont examinées.
+        :type last_move: tuple or None
+        :return: Le joueur gagnant, ou None si personne n'a gagné.
+        :rtype: int or None
         """
-        for pattern in self.game_engine.win_patterns:
-            if all(board[pos] and board[pos] == board[pattern[0]] for pos in pattern):
-                return board[pattern[0]]
+        if last_move is not None:
+            target = last_move[1] if last_move[0] == 'drop' else last_move[2]
+            player = board[target]
+            mine, theirs = self._bitboards(board, player)
+            return player if wins_through(mine, target) else None
+        black, red = board_to_bitboards(board)
+        if has_win(black): return BLACK
+        if has_win(red): return RED
         return None
 
-    def minimax(self, board, depth, alpha, beta, is_maximizing_player):
+    def negamax(self, state, depth, alpha, beta):
         """
-        Implémente l'algorithme Minimax avec élagage alpha-bêta.
+        Implémente l'algorithme Minimax avec élagage alpha-bêta, sous sa forme
+        negamax : le score est toujours donné du point de vue du joueur au
+        trait, et celui d'un coup est l'opposé du score de la position fille.
 
         Cette fonction explore récursivement l'arbre des coups possibles pour
         trouver le meilleur coup. Elle est optimisée par :
         1. Table de Transposition : met en cache les états déjà évalués pour
-           éviter les calculs redondants.
-        2. Ordre des Coups : évalue les coups les plus prometteurs en premier
-           pour maximiser l'efficacité de l'élagage.
+           éviter les calculs redondants. La clé est le hachage canonique de
+           la position (joueur au trait compris), commun à ses images par les
+           symétries du plateau ; le meilleur coup est rangé dans le repère
+           du représentant canonique.
+        2. Ordre des Coups : explore les coups les plus prometteurs en premier
+           pour maximiser l'efficacité de l'élagage (voir _order_moves), sans
+           évaluer chaque coup fils.
+        3. Recherche à fenêtre nulle (PVS) : seul le premier coup est recherché
+           avec la fenêtre complète ; pour les suivants, une fenêtre nulle
+           suffit à vérifier qu'ils ne font pas mieux, et ils ne sont
+           recherchés à nouveau que si c'est le cas.
+        4. Coups joués en place : chaque coup est appliqué avec push puis
+           annulé avec pop, sans copier le plateau à chaque nœud.
 
-        :param board: L'état du plateau à partir duquel chercher.
-        :type board: list
+        :param state: Copie de travail du moteur, positionnée sur le nœud à
+                      explorer. Elle est rendue dans le même état en sortie.
+        :type state: SearchState
         :param depth: La profondeur de recherche restante.
         :type depth: int
-        :param alpha: La meilleure valeur trouvée jusqu'à présent pour le joueur maximisant.
+        :param alpha: Le score que le joueur au trait est déjà assuré d'obtenir.
         :type alpha: float
-        :param beta: La meilleure valeur trouvée jusqu'à présent pour le joueur minimisant.
+        :param beta: Le score au-delà duquel l'adversaire évitera cette position.
         :type beta: float
-        :param is_maximizing_player: True si c'est le tour de l'IA, False pour l'adversaire.
-        :type is_maximizing_player: bool
-        :return: Le meilleur score d'évaluation trouvé pour la branche explorée.
+        :return: Le meilleur score trouvé, du point de vue du joueur au trait.
         :rtype: float
+        :raises SearchTimeout: Si le budget de la recherche est épuisé.
+        :raises SearchCancelled: Si la recherche a été annulée.
         """
+        self.nodes += 1
+        if not self.nodes & 63:
+            self._check_budget()
+
         original_alpha = alpha
-        board_key = tuple(board)
+        board_key, symmetry = state.canonical()
 
         # 1. Consultation de la table de transposition
-        if board_key in self.transposition_table:
-            entry = self.transposition_table[board_key]
-            if entry['depth'] >= depth:
-                if entry['flag'] == 'EXACT': return entry['score']
-                elif entry['flag'] == 'LOWER': alpha = max(alpha, entry['score'])
-                elif entry['flag'] == 'UPPER': beta = min(beta, entry['score'])
-                if alpha >= beta: return entry['score']
-
-        winner = self._check_board_winner(board)
-        if depth == 0 or winner:
-            return self.evaluate_board(board)
-
-        player = self.who_am_i if is_maximizing_player else ('red' if self.who_am_i == 'black' else 'black')
-        
+        entry = self.transposition_table.probe(board_key)
+        tt_move = None
+        if entry is not None:
+            entry_score, entry_depth, entry_flag, tt_move = entry
+            if entry_depth >= depth:
+                if entry_flag == EXACT: return entry_score
+                elif entry_flag == LOWER: alpha = max(alpha, entry_score)
+                elif entry_flag == UPPER: beta = min(beta, entry_score)
+                if alpha >= beta: return entry_score
+
+        # Le coup gagnant ne passe pas le trait : la position est perdue pour
+        # l'autre joueur, celui qui aurait dû jouer.
+        if state.winner:
+            return -WIN_SCORE
+        player = state.current_player
+        if depth == 0:
+            score = self.evaluate_state(state)
+            return score if player == self.who_am_i else -score
+
+        opponent = OPPONENT[player]
+
+        # Phase de mouvement : une position gagnée ou perdue est connue exactement
+        if self.tablebase is not None and state.turn_count >= 8:
+            result, _ = self.tablebase.probe(state.bitboards[player], state.bitboards[opponent])
+            if result != DRAW:
+                return WIN_SCORE if result == WIN else -WIN_SCORE
+
         # 2. Tri des coups pour optimiser l'élagage
-        moves = self.get_all_possible_moves(board, player)
-        move_scores = [(move, self.evaluate_board(self.simulate_move(board, move, player))) for move in moves]
-        move_scores.sort(key=lambda x: x[1], reverse=is_maximizing_player)
-        sorted_moves = [move for move, score in move_scores]
-
-        best_value = float('-inf') if is_maximizing_player else float('inf')
-        for move in sorted_moves:
-            new_board = self.simulate_move(board, move, player)
-            value = self.minimax(new_board, depth - 1, alpha, beta, not is_maximizing_player)
-            if is_maximizing_player:
-                best_value = max(best_value, value)
-                alpha = max(alpha, best_value)
+        moves = self._generate_moves(state.bitboards[player], state.bitboards[opponent])
+        ply = len(state.undo_stack)
+        sorted_moves = self._order_moves(state, moves, transform_move(tt_move, INVERSE_SYMMETRIES[symmetry]), ply)
+
+        best_value, best_move = float('-inf'), None
+        for index, move in enumerate(sorted_moves):
+            state.push(move)
+            if index == 0:
+                value = -self.negamax(state, depth - 1, -beta, -alpha)
             else:
-                best_value = min(best_value, value)
-                beta = min(beta, best_value)
-            if beta <= alpha:
+                value = -self.negamax(state, depth - 1, -alpha - 1, -alpha)
+                if alpha < value < beta:
+                    value = -self.negamax(state, depth - 1, -beta, -alpha)
+            state.pop()
+            if value > best_value:
+                best_value, best_move = value, move
+                alpha = max(alpha, value)
+            if ply == self.shared_bound_ply:
+                # Un coup racine voisin a pu relever l'alpha partagé : la
+                # fenêtre des coups restants se resserre d'autant
+                beta = min(beta, self.shared_bound())
+            if alpha >= beta:
+                if self.stats is not None: self.stats.record_cutoff(index)
+                self._record_cutoff(move, depth, ply)
                 break # Élagage
-    
+
         # 3. Sauvegarde du résultat dans la table de transposition
-        flag = 'EXACT'
-        if best_value <= original_alpha: flag = 'UPPER'
-        elif best_value >= beta: flag = 'LOWER'
-        self.transposition_table[board_key] = {'score': best_value, 'depth': depth, 'flag': flag}
-        
+        flag = EXACT
+        if best_value <= original_alpha: flag = UPPER
+        elif best_value >= beta: flag = LOWER
+        self.transposition_table.store(board_key, best_value, depth, flag, transform_move(best_move, symmetry))
+
         return best_value
 
+    def _order_moves(self, state, moves, tt_move, ply):
+        """
+        Trie les coups d'un nœud sans les jouer ni les évaluer. Viennent dans
+        l'ordre :
+        1. le meilleur coup mémorisé dans la table de transposition ;
+        2. les coups qui complètent une configuration de 3 pions du joueur
+           au trait (victoires immédiates) ;
+        3. les coups qui occupent la case libre d'une configuration de 3 pions
+           adverses (blocages) ;
+        4. les deux coups meurtriers de cette profondeur ;
+        5. les autres, par score d'historique décroissant.
+
+        :param state: La copie de travail du moteur, positionnée sur le nœud.
+        :type state: SearchState
+        :param moves: Les coups légaux du nœud.
+        :type moves: list
+        :param tt_move: Le coup de la table de transposition, ou None.
+        :type tt_move: tuple or None
+        :param ply: Le nombre de demi-coups joués depuis la racine.
+        :type ply: int
+        :return: Les coups, dans l'ordre de recherche.
+        :rtype: list
+        """
+        # Cases libres des configurations de 3 pions, lues dans les codes
+        # tenus à jour par SearchState (du point de vue de state.who)
+        win_squares = block_squares = 0
+        if state.my_threats or state.opp_threats:
+            win_table, block_table = state.my_threat_table, state.opp_threat_table
+            if state.current_player != state.who:
+                win_table, block_table = block_table, win_table
+            for code, mask in zip(state.pattern_codes, WIN_MASKS):
+                if win_table[code]: win_squares |= mask
+                elif block_table[code]: block_squares |= mask
+            occupied = state.bitboards[BLACK] | state.bitboards[RED]
+            win_squares &= ~occupied
+            block_squares &= ~occupied
+
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history
+
+        def priority(move):
+            if move == tt_move: return 1 << 30
+            target = SQUARE_BITS[move[-1]]
+            if target & win_squares: return 1 << 29
+            if target & block_squares: return 1 << 28
+            if move in killers: return 1 << 27
+            return history[encode_move(move)]
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def _record_cutoff(self, move, depth, ply):
+        """
+        Met à jour les coups meurtriers et l'historique après une coupure.
+
+        :param move: Le coup qui a provoqué la coupure.
+        :type move: tuple
+        :param depth: La profondeur restante au nœud de la coupure.
+        :type depth: int
+        :param ply: Le nombre de demi-coups joués depuis la racine.
+        :type ply: int
+        """
+        if ply < len(self.killers):
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1], killers[0] = killers[0], move
+        self.history[encode_move(move)] += depth * depth
+
+    def _new_search(self):
+        """
+        Prépare une nouvelle recherche : nouvelle génération dans la table de
+        transposition, coups meurtriers oubliés et historique atténué.
+        """
+        self.search_id += 1
+        self.transposition_table.new_search()
+        for killers in self.killers:
+            killers[0] = killers[1] = None
+        self.history = [value // 2 for value in self.history]
+
     def get_all_possible_moves(self, board, player):
         """
         Génère une liste de tous les coups légaux pour un joueur donné.
 
         :param board: L'état actuel du plateau.
-        :type board: list
+        :type board: bytearray
         :param player: Le joueur pour lequel générer les coups.
-        :type player: str
+        :type player: int
         :return: Une liste de tuples représentant les coups possibles.
                  Format: ('drop', position) ou ('move', from, to).
         :rtype: list
         """
-        moves = []
-        if board is None: return moves
-        if sum(1 for pos in board if pos is not None) < 8:
-            return [('drop', pos) for pos in range(25) if board[pos] is None]
-        else:
-            player_pieces = [i for i, piece in enumerate(board) if piece == player]
-            for from_pos in player_pieces:
-                r, c = divmod(from_pos, 5)
-                for dr in [-1, 0, 1]:
-                    for dc in [-1, 0, 1]:
-                        if dr == 0 and dc == 0: continue
-                        nr, nc = r + dr, c + dc
-                        if 0 <= nr < 5 and 0 <= nc < 5 and board[nr * 5 + nc] is None:
-                            moves.append(('move', from_pos, nr * 5 + nc))
-            return moves
+        if board is None: return []
+        return self._generate_moves(*self._bitboards(board, player))
+
+    def _generate_moves(self, mine, theirs):
+        """
+        Génère les coups légaux à partir des bitboards des deux camps.
+
+        :param mine: Le bitboard du joueur qui doit jouer.
+        :type mine: int
+        :param theirs: Le bitboard de son adversaire.
+        :type theirs: int
+        :return: La liste des coups, dans le même ordre que get_all_possible_moves.
+        :rtype: list
+        """
+        return generate_moves(mine, theirs)
 
     def simulate_move(self, board, move, player):
         """
         Applique un coup sur une copie du plateau pour simuler son résultat.
 
         :param board: Le plateau d'origine.
-        :type board: list
+        :type board: bytearray
         :param move: Le coup à simuler.
         :type move: tuple
         :param player: Le joueur qui effectue le coup.
-        :type player: str
+        :type player: int
         :return: Un nouveau plateau avec le coup appliqué.
-        :rtype: list
+        :rtype: bytearray
         """
         new_board = board.copy()
         if move[0] == 'drop': new_board[move[1]] = player
-        else: new_board[move[1]], new_board[move[2]] = None, player
+        else: new_board[move[1]], new_board[move[2]] = EMPTY, player
         return new_board
     
     def calculate_threats(self, board, player):
@@ -278,17 +577,360 @@ class TeekoAI:
         Compte le nombre de menaces (alignements de 3 pions) pour un joueur.
 
         :param board: L'état du plateau.
-        :type board: list
+        :type board: bytearray
         :param player: Le joueur dont on veut compter les menaces.
-        :type player: str
+        :type player: int
         :return: Le nombre de menaces de 3 pions non bloquées.
         :rtype: int
         """
-        threats, opponent = 0, 'red' if player == 'black' else 'black'
-        for pattern in self.game_engine.win_patterns:
-            if sum(1 for p in pattern if board[p] == player) == 3 and sum(1 for p in pattern if board[p] == opponent) == 0:
-                threats += 1
-        return threats
+        threat_table = pattern_tables(self.aggression_factor)[1]
+        mine, theirs = self._bitboards(board, player)
+        return sum(threat_table[code] for code in pattern_codes(mine, theirs))
+
+    def cancel(self):
+        """
+        Demande l'arrêt de la recherche en cours.
+
+        Peut être appelée depuis un autre thread : la recherche s'interrompt
+        au prochain point de contrôle en levant SearchCancelled. La demande
+        reste active jusqu'à ce que cancel_event soit réinitialisé.
+        """
+        self.cancel_event.set()
+
+    def close(self):
+        """
+        Arrête les processus de la recherche parallèle, s'il y en a.
+        """
+        if self.root_pool is not None:
+            self.root_pool.shutdown()
+            self.root_pool = None
+
+    def _check_budget(self):
+        """
+        Interrompt la recherche si elle a été annulée ou si son budget de
+        temps ou de nœuds est épuisé.
+
+        :raises SearchCancelled: Si la recherche a été annulée.
+        :raises SearchTimeout: Si le budget est dépassé.
+        """
+        if self.cancel_event.is_set():
+            raise SearchCancelled()
+        if not self.budget_active:
+            return
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if self.node_budget is not None and self.nodes >= self.node_budget:
+            raise SearchTimeout()
+
+    def search_root(self, state, moves, depth, window=None):
+        """
+        Évalue chaque coup racine par une recherche Minimax à profondeur fixe,
+        dans le processus courant ou réparti sur plusieurs processus si l'IA
+        a été créée avec workers > 1.
+
+        Les coups racine partagent une borne alpha qui se resserre au fil de
+        la recherche : chaque coup n'a à battre que le meilleur score déjà
+        trouvé, moins ROOT_ALPHA_MARGIN. Les coups qui restent à moins de
+        ROOT_ALPHA_MARGIN du meilleur reçoivent un score exact, ce qui
+        préserve le bonus de fourchette de choose_best_move ; les autres ne
+        reçoivent qu'un majorant. Les niveaux non adaptatifs tirent leur coup
+        parmi les ROOT_EXACT_MOVES meilleurs : la borne suit alors le
+        ROOT_EXACT_MOVES-ième meilleur score (-inf tant qu'il n'y en a pas
+        autant), et ignore le bas de la fenêtre d'aspiration.
+
+        :param state: La copie de travail du moteur, positionnée sur la racine.
+        :type state: SearchState
+        :param moves: Les coups racine à évaluer, dans l'ordre de recherche.
+        :type moves: list
+        :param depth: La profondeur de recherche, coup racine compris.
+        :type depth: int
+        :param window: Une fenêtre d'aspiration (alpha, beta) pour le meilleur
+                       score. S'il n'y est pas strictement compris, les scores
+                       ne sont que des bornes et la recherche est à reprendre
+                       sans fenêtre.
+        :type window: tuple[float, float] or None
+        :return: La liste des couples (coup, score), dans l'ordre de moves.
+        :rtype: list
+        """
+        if depth == 1 and state.current_player == self.who_am_i:
+            return self._score_children(state, moves)
+        if self.workers > 1 and len(moves) > 1:
+            if self.root_pool is None:
+                self.root_pool = RootSearchPool(self.workers)
+            return self.root_pool.search(self, state, moves, depth, window)
+
+        # Des coups menant à des positions symétriques l'une de l'autre (dès
+        # que la racine a elle-même une symétrie, par exemple le plateau vide)
+        # ont le même score : un seul d'entre eux est recherché. La pénalité
+        # de répétition s'applique au score du coup racine, jamais à ceux de
+        # la table de transposition : la fenêtre de la recherche est décalée
+        # d'autant.
+        lower, beta = window or (float('-inf'), float('inf'))
+        exact_moves = 1 if self.adaptatif else ROOT_EXACT_MOVES
+        if exact_moves > 1:
+            lower = float('-inf')
+        best_scores = []  # Les exact_moves meilleurs scores, par ordre décroissant
+        move_scores, searched = [], {}
+        for move in moves:
+            state.push(move)
+            key = (state.canonical()[0], self.adaptatif and state.hash in self.last_moves)
+            if key not in searched:
+                penalty = REPETITION_PENALTY if key[1] else 0
+                bound = best_scores[-1] if len(best_scores) == exact_moves else float('-inf')
+                alpha = max(lower, bound) - ROOT_ALPHA_MARGIN
+                searched[key] = -self.negamax(state, depth - 1, -beta - penalty, -alpha - penalty) - penalty
+            best_scores = sorted(best_scores + [searched[key]], reverse=True)[:exact_moves]
+            move_scores.append((move, searched[key]))
+            state.pop()
+        return move_scores
+
+    def _child_bitboards(self, mine, moves):
+        """
+        Calcule le bitboard du joueur après chacun de ses coups.
+
+        :param mine: Le bitboard du joueur au trait.
+        :type mine: int
+        :param moves: Ses coups.
+        :type moves: list
+        :return: Un bitboard par coup.
+        :rtype: list[int]
+        """
+        return [mine | SQUARE_BITS[move[1]] if move[0] == 'drop' else mine ^ SQUARE_BITS[move[1]] ^ SQUARE_BITS[move[2]]
+                for move in moves]
+
+    def _score_children(self, state, moves):
+        """
+        Recherche à la profondeur 1 : les positions atteintes par les coups
+        de l'IA sont évaluées en un seul lot (voir batch_eval.py), sans être
+        jouées. La table de transposition n'est pas consultée.
+
+        :param state: La copie de travail du moteur, avec l'IA au trait.
+        :type state: SearchState
+        :param moves: Les coups racine.
+        :type moves: list
+        :return: La liste des couples (coup, score), dans l'ordre de moves.
+        :rtype: list
+        """
+        opponent = OPPONENT[self.who_am_i]
+        children = self._child_bitboards(state.bitboards[self.who_am_i], moves)
+        penalties = None
+        if self.adaptatif and self.last_moves:
+            # Hachage de chaque position fille, l'adversaire au trait
+            keys, side_hash = PIECE_KEYS[self.who_am_i], state.hash ^ SIDE_KEY
+            penalties = [REPETITION_PENALTY if (side_hash ^ keys[move[1]] if move[0] == 'drop' else side_hash ^ keys[move[1]] ^ keys[move[2]])
+                         in self.last_moves else 0 for move in moves]
+        self.nodes += len(moves)
+        start = time.perf_counter()
+        scores = self.batch_evaluator.scores(children, [state.bitboards[opponent]] * len(children),
+                                             self.aggression_factor, penalties)
+        if self.stats is not None:
+            # Évaluations faites en lot, hors de evaluate_state que mesure l'instrumentation
+            self.stats.evaluations += len(children)
+            self.stats.evaluation_time += time.perf_counter() - start
+        return list(zip(moves, scores))
+
+    def iterative_deepening(self, state, moves, max_depth, completed=None, budgeted=True):
+        """
+        Approfondit la recherche racine jusqu'à épuisement du budget.
+
+        Les profondeurs 1, 2, 3... sont explorées successivement. Chaque
+        itération commence par le meilleur coup de la précédente, puis suit
+        l'ordre de ses scores, ce qui maximise l'élagage et profite de la
+        table de transposition. Chaque itération est d'abord recherchée dans
+        une fenêtre d'aspiration de ±ASPIRATION_WINDOW autour du meilleur
+        score de l'avant-dernière, de même parité (l'évaluation favorise le
+        joueur qui vient de jouer, si bien que les scores alternent d'une
+        profondeur à l'autre), et reprise sans fenêtre si le meilleur score
+        en sort. La première itération est toujours menée à
+        son terme ; ensuite, une itération interrompue par le budget est
+        abandonnée au profit de la dernière itération complète. Chaque
+        itération complète est mémorisée dans last_iteration.
+
+        :param state: La copie de travail du moteur, positionnée sur la racine.
+        :type state: SearchState
+        :param moves: Les coups racine.
+        :type moves: list
+        :param max_depth: La profondeur maximale à atteindre.
+        :type max_depth: int
+        :param completed: Une itération déjà menée sur cette position, sous la
+                          forme (profondeur, [(coup, score), ...]), à partir de
+                          laquelle reprendre l'approfondissement.
+        :type completed: tuple or None
+        :param budgeted: False pour ignorer le budget de temps et de nœuds ;
+                         la recherche ne s'arrête alors qu'à max_depth ou sur
+                         annulation.
+        :type budgeted: bool
+        :return: La liste des couples (coup, score) de la dernière itération complète.
+        :rtype: list
+        """
+        if budgeted and self.time_budget is not None:
+            self.deadline = time.perf_counter() + self.time_budget
+        root_ply = len(state.undo_stack)
+        start_depth, move_scores = completed if completed is not None else (0, [])
+        ordered_moves = [move for move, score in sorted(move_scores, key=lambda x: x[1], reverse=True)] or list(moves)
+        best_scores = {start_depth: max(score for move, score in move_scores)} if move_scores else {}
+        try:
+            for depth in range(start_depth + 1, max_depth + 1):
+                self.budget_active = budgeted and (depth > 1 or completed is not None)
+                window = None
+                if depth - 2 in best_scores and abs(best_scores[depth - 2]) < WIN_SCORE:
+                    window = (best_scores[depth - 2] - ASPIRATION_WINDOW, best_scores[depth - 2] + ASPIRATION_WINDOW)
+                try:
+                    scores = self.search_root(state, ordered_moves, depth, window)
+                    if window is not None and not window[0] < max(score for move, score in scores) < window[1]:
+                        scores = self.search_root(state, ordered_moves, depth)
+                    move_scores = scores
+                except SearchTimeout:
+                    # Les coups joués par la recherche interrompue sont annulés
+                    while len(state.undo_stack) > root_ply:
+                        state.pop()
+                    break
+                self.depth_reached = depth
+                best_scores[depth] = max(score for move, score in move_scores)
+                self.last_iteration = (state.hash, depth, move_scores)
+                ordered_moves = [move for move, score in sorted(move_scores, key=lambda x: x[1], reverse=True)]
+                # Inutile d'aller plus loin si l'issue est déjà forcée
+                best_score = max(score for move, score in move_scores)
+                if best_score >= WIN_SCORE or all(score <= -WIN_SCORE for move, score in move_scores):
+                    break
+        finally:
+            self.budget_active = False
+            self.deadline = None
+        return move_scores
+
+    def predict_opponent_move(self, state):
+        """
+        Devine le coup que l'adversaire va jouer dans une position donnée.
+
+        Le meilleur coup mémorisé dans la table de transposition est utilisé
+        en priorité (la recherche précédente de l'IA l'a généralement déjà
+        calculé) ; à défaut, une courte recherche est lancée.
+
+        :param state: La copie de travail du moteur, avec l'adversaire au trait.
+        :type state: SearchState
+        :return: Le coup prédit, ou None si l'adversaire ne peut pas jouer.
+        :rtype: tuple or None
+        """
+        move = self._tt_move(state)
+        if move is None:
+            self.negamax(state, 2, float('-inf'), float('inf'))
+            move = self._tt_move(state)
+        if move is None:
+            player = state.current_player
+            legal_moves = self._generate_moves(state.bitboards[player], state.bitboards[OPPONENT[player]])
+            move = legal_moves[0] if legal_moves else None
+        return move
+
+    def _tt_move(self, state):
+        """
+        Lit le meilleur coup mémorisé dans la table de transposition pour une
+        position, ramené dans le repère de la position.
+
+        :param state: La copie de travail du moteur.
+        :type state: SearchState
+        :return: Le coup, ou None s'il est absent ou illégal (collision).
+        :rtype: tuple or None
+        """
+        board_key, symmetry = state.canonical()
+        entry = self.transposition_table.probe(board_key)
+        if entry is None:
+            return None
+        move = transform_move(entry[3], INVERSE_SYMMETRIES[symmetry])
+        player = state.current_player
+        return move if move in self._generate_moves(state.bitboards[player], state.bitboards[OPPONENT[player]]) else None
+
+    def principal_variation(self, move):
+        """
+        Reconstitue la variante principale commençant par un coup racine, en
+        suivant les meilleurs coups de la table de transposition.
+
+        :param move: Le coup racine.
+        :type move: tuple
+        :return: La suite de coups, de longueur au plus la profondeur atteinte.
+        :rtype: list
+        """
+        state = self.search_state()
+        state.push(move)
+        variation = [move]
+        while len(variation) < self.depth_reached and state.winner is None:
+            move = self._tt_move(state)
+            if move is None: break
+            state.push(move)
+            variation.append(move)
+        return variation
+
+    def ponder(self, state):
+        """
+        Réfléchit pendant le temps de l'adversaire.
+
+        Le coup le plus probable de l'adversaire est joué sur la copie de
+        travail, puis la réponse de l'IA est recherchée par approfondissement
+        itératif, sans budget, jusqu'à la profondeur qu'utilisera la vraie
+        recherche ou jusqu'à annulation (cancel). Les sous-arbres explorés
+        restent dans la table de transposition ; la dernière itération
+        complète est conservée dans ponder_result et sera reprise par
+        choose_best_move si l'adversaire joue effectivement le coup prédit.
+
+        :param state: Une copie du moteur de jeu, avec l'adversaire au trait.
+        :type state: TeekoGame
+        """
+        self.ponder_result = None
+        self.ponder_move = None
+        if state.winner is not None or state.current_player == self.who_am_i: return
+        state = self.search_state(state)
+
+        self._new_search()
+        self.nodes = 0
+        self.last_iteration = None
+        try:
+            predicted = self.predict_opponent_move(state)
+            if predicted is None: return
+            state.push(predicted)
+            if state.winner is not None: return
+            self.ponder_move = predicted
+            root_hash = state.hash  # SearchCancelled laisse state au fond de l'arbre
+
+            if self.max_depth is not None: max_depth = self.max_depth
+            elif self.time_budget is None and self.node_budget is None: max_depth = self.adaptive_depth(state.board)
+            else: max_depth = MAX_SEARCH_DEPTH
+            moves = self._generate_moves(state.bitboards[self.who_am_i], state.bitboards[OPPONENT[self.who_am_i]])
+            self.iterative_deepening(state, moves, max_depth, budgeted=False)
+        except SearchCancelled:
+            pass
+        if self.ponder_move is not None and self.last_iteration is not None and self.last_iteration[0] == root_hash:
+            self.ponder_result = self.last_iteration
+
+    def take_ponder_result(self, position_hash):
+        """
+        Récupère le résultat de la réflexion anticipée, s'il porte sur la
+        position donnée, et l'efface dans tous les cas.
+
+        :param position_hash: Le hachage de la position où l'IA doit jouer.
+        :type position_hash: int
+        :return: La dernière itération complète (profondeur, [(coup, score), ...])
+                 si l'adversaire a joué le coup prédit, None sinon.
+        :rtype: tuple or None
+        """
+        result, self.ponder_result = self.ponder_result, None
+        if result is None or result[0] != position_hash:
+            return None
+        return result[1], result[2]
+
+    def search_state(self, game=None):
+        """
+        Prépare la copie de travail du moteur sur laquelle la recherche joue
+        ses coups en place, et qui tient à jour les termes de l'évaluation.
+
+        :param game: La partie à copier, telle quelle. Par défaut, le moteur
+                     de jeu de l'IA, en donnant le trait à l'IA.
+        :type game: TeekoGame or None
+        :return: Une copie de travail de la partie.
+        :rtype: SearchState
+        """
+        state = SearchState(game or self.game_engine, self.who_am_i, self.positional_values, self.aggression_factor)
+        if game is None and state.current_player != self.who_am_i:
+            state.switch_player()
+        return state
 
     def adaptive_depth(self, board):
         """
@@ -298,11 +940,11 @@ class TeekoAI:
         phase de jeu pour équilibrer performance et pertinence.
 
         :param board: L'état actuel du plateau.
-        :type board: list
+        :type board: bytearray
         :return: La profondeur de recherche à utiliser.
         :rtype: int
         """
-        total_pieces = sum(1 for pos in board if pos is not None)
+        total_pieces = sum(1 for pos in board if pos != EMPTY)
         is_drop_phase = total_pieces < 8
         if not self.adaptatif:
             depth = self.base_difficulty
@@ -312,7 +954,7 @@ class TeekoAI:
             possible_moves = len(self.get_all_possible_moves(board, self.who_am_i))
             depth = min(5, 5 + (8 - possible_moves // 2))
             if is_drop_phase: depth = 3 if total_pieces > 4 else 2
-            print(f"Profondeur de recherche pour {self.who_am_i} (expert): {depth}")
+            print(f"Profondeur de recherche pour {COLOR_NAMES[self.who_am_i]} (expert): {depth}")
             return depth
 
     def choose_best_move(self):
@@ -320,68 +962,161 @@ class TeekoAI:
         Orchestre la recherche du meilleur coup à jouer.
 
         Cette fonction de haut niveau suit une stratégie en plusieurs étapes :
-        1. Vider la table de transposition pour la nouvelle recherche.
-        2. Vérifier s'il existe un coup gagnant immédiat.
-        3. Vérifier s'il faut bloquer une victoire imminente de l'adversaire.
-        4. Gérer la logique de bluff en mode expert.
-        5. Lancer la recherche Minimax pour évaluer tous les autres coups.
-        6. Appliquer un bonus pour les coups créant une "fourchette".
-        7. Sélectionner le meilleur coup parmi les candidats.
+        1. Ouvrir une nouvelle génération dans la table de transposition,
+           qui conserve les résultats des coups précédents.
+        2. Jouer le coup du livre d'ouvertures si la position y figure. En
+           phase de mouvement, consulter la table de finales si elle est
+           disponible : jouer le coup exact, ou écarter les coups perdants.
+        3. Vérifier s'il existe un coup gagnant immédiat.
+        4. En phase de mouvement, sans table de finales, chercher un gain
+           forcé par menaces successives et écarter les coups qui en
+           laissent un à l'adversaire (voir threat_space_search).
+        5. Vérifier s'il faut bloquer une victoire imminente de l'adversaire.
+        6. Gérer la logique de bluff en mode expert.
+        7. Lancer la recherche Minimax pour évaluer tous les autres coups, à
+           profondeur fixe ou par approfondissement itératif si un budget de
+           temps ou de nœuds est défini.
+        8. Appliquer un bonus pour les coups créant une "fourchette".
+        9. Sélectionner le meilleur coup parmi les candidats.
+
+        Si la collecte des statistiques est activée, celles de la décision
+        sont rangées dans last_stats et ajoutées au journal stats_log.
 
         :return: Le meilleur coup trouvé par l'IA.
         :rtype: tuple or None
+        :raises SearchCancelled: Si la recherche a été annulée via cancel().
         """
-        self.transposition_table = {}
+        if not self.collect_stats:
+            return self._choose_best_move()
+        stats = SearchStats(COLOR_NAMES[self.who_am_i], self.game_engine.turn_count)
+        with stats.instrument(self):
+            move = self._choose_best_move()
+        stats.move = move
+        stats.source, stats.score = self.decision
+        if stats.source == 'recherche' and move is not None:
+            stats.principal_variation = self.principal_variation(move)
+        else:
+            stats.depth_reached = 0
+        self.last_stats = stats
+        if self.stats_log is not None:
+            stats.write(self.stats_log)
+        return move
 
+    def _choose_best_move(self):
+        """
+        Choisit le coup à jouer (voir choose_best_move) et renseigne
+        decision, l'origine du coup et son score.
+        """
         board = self.game_engine.get_board()
+        state = self.search_state()
+
+        # Une réflexion anticipée sur le coup effectivement joué par l'adversaire
+        # est reprise telle quelle ; sinon elle est abandonnée.
+        pondered = self.take_ponder_result(state.hash)
+        if pondered is None:
+            self._new_search()
+        else:
+            print(f"IA ({COLOR_NAMES[self.who_am_i]}) reprend sa réflexion anticipée (profondeur {pondered[0]})")
+
+        # Phase de placement : coup précalculé en profondeur par le livre d'ouvertures
+        if self.opening_book is not None and state.turn_count < 8:
+            entry = self.opening_book.lookup(board, self.who_am_i)
+            if entry is not None:
+                print(f"IA ({COLOR_NAMES[self.who_am_i]}) joue le coup du livre d'ouvertures : {entry[0]}")
+                self.decision = ('livre', entry[1])
+                return entry[0]
+
         all_moves = self.get_all_possible_moves(board, self.who_am_i)
-        opponent = 'red' if self.who_am_i == 'black' else 'black'
+        opponent = OPPONENT[self.who_am_i]
+
+        # Phase de mouvement : la table de finales donne le résultat exact de
+        # chaque coup. Une victoire ou une défaite inévitable est jouée
+        # directement ; sinon la recherche départage les coups qui tiennent la nulle.
+        if self.tablebase is not None and state.turn_count >= 8 and all_moves:
+            result, distance, tablebase_moves = self.tablebase.best_moves(
+                state.bitboards[self.who_am_i], state.bitboards[opponent], all_moves)
+            if result != DRAW:
+                print(f"IA ({COLOR_NAMES[self.who_am_i]}) joue d'après la table de finales ({'victoire' if result == WIN else 'défaite'} en {distance} demi-coups)")
+                self.decision = ('finales', WIN_SCORE if result == WIN else -WIN_SCORE)
+                return tablebase_moves[0]
+            all_moves = tablebase_moves
 
         # Recherche de coup gagnant immédiat
         for move in all_moves:
             temp_board = self.simulate_move(board, move, self.who_am_i)
-            if self._check_board_winner(temp_board) == self.who_am_i:
-                print(f"IA ({self.who_am_i}) a trouvé un coup gagnant immédiat : {move}")
+            if self._check_board_winner(temp_board, move) == self.who_am_i:
+                print(f"IA ({COLOR_NAMES[self.who_am_i]}) a trouvé un coup gagnant immédiat : {move}")
+                self.decision = ('victoire', WIN_SCORE)
+                return move
+
+        # Phase de mouvement : gain forcé par menaces successives, prouvé bien
+        # au-delà de l'horizon de la recherche. La table de finales, si elle
+        # est là, a déjà tranché.
+        self.nodes = 0
+        if self.threat_depth and self.tablebase is None and state.turn_count >= 8 and all_moves:
+            forced_win, all_moves = self.threat_space_search(state, all_moves)
+            if forced_win is not None:
+                move, plies = forced_win
+                print(f"IA ({COLOR_NAMES[self.who_am_i]}) a trouvé un gain forcé par menaces en {plies} demi-coups : {move}")
+                self.decision = ('menaces', WIN_SCORE)
                 return move
 
         # Recherche de blocage de victoire adverse
         blocking_moves = []
         for opp_move in self.get_all_possible_moves(board, opponent):
             temp_board = self.simulate_move(board, opp_move, opponent)
-            if self._check_board_winner(temp_board) == opponent:
+            if self._check_board_winner(temp_board, opp_move) == opponent:
                 block_pos = opp_move[1] if opp_move[0] == 'drop' else opp_move[2]
                 for my_move in all_moves:
                     if (my_move[1] if my_move[0] == 'drop' else my_move[2]) == block_pos:
                         blocking_moves.append(my_move)
         
         # Logique de blocage et de bluff
+        self.decision = ('blocage', None)
         if blocking_moves:
             if self.adaptatif:
-                current_score = self.evaluate_board(board)
+                current_score = self.evaluate_state(state)
                 if current_score > 100 and random.random() < 0.35:
-                    print(f"IA ({self.who_am_i}) BLUFFE! Ignore un blocage. Score: {current_score}")
+                    print(f"IA ({COLOR_NAMES[self.who_am_i]}) BLUFFE! Ignore un blocage. Score: {current_score}")
                 else: return random.choice(blocking_moves)
             else: return random.choice(blocking_moves)
 
-        depth = self.adaptive_depth(board)
         best_value, best_moves = float('-inf'), []
+        self.decision = ('recherche', None)
+
+        # Recherche Minimax, à profondeur fixe ou sous budget
+        if self.time_budget is None and self.node_budget is None:
+            depth = self.adaptive_depth(board)
+            if pondered is not None and pondered[0] >= depth:
+                depth, move_scores = pondered
+            else:
+                move_scores = self.search_root(state, all_moves, depth)
+            self.depth_reached = depth
+        else:
+            move_scores = self.iterative_deepening(state, all_moves, self.max_depth or MAX_SEARCH_DEPTH, completed=pondered)
+        if pondered is not None and len(move_scores) != len(all_moves):
+            # La réflexion anticipée portait aussi sur les coups écartés par la table de finales
+            move_scores = [(move, score) for move, score in move_scores if move in all_moves]
 
         # Pour les niveaux non-experts, introduire de la variabilité
         if not self.adaptatif and all_moves:
-            move_scores = sorted([(m, self.minimax(self.simulate_move(board, m, self.who_am_i), depth - 1, float('-inf'), float('inf'), False)) for m in all_moves], key=lambda x: x[1], reverse=True)
-            top_moves = [move for move, score in move_scores[:min(3, len(move_scores))]]
-            return random.choice(top_moves) if top_moves else None
+            move_scores.sort(key=lambda x: x[1], reverse=True)
+            top_moves = move_scores[:min(3, len(move_scores))]
+            if not top_moves: return None
+            move, score = random.choice(top_moves)
+            self.decision = ('recherche', score)
+            return move
 
-        # Recherche Minimax pour le mode expert
+        # Sélection pour le mode expert
         threats_before = self.calculate_threats(board, self.who_am_i)
-        for move in all_moves:
-            new_board = self.simulate_move(board, move, self.who_am_i)
-            move_value = self.minimax(new_board, depth - 1, float('-inf'), float('inf'), False)
-            
+        mine, theirs = state.bitboards[self.who_am_i], state.bitboards[opponent]
+        children = self._child_bitboards(mine, [move for move, move_value in move_scores])
+        threats = self.batch_evaluator.threat_counts(children, [theirs] * len(children))
+        for (move, move_value), threats_after in zip(move_scores, threats):
             # Bonus pour la création de fourchettes
-            if (self.calculate_threats(new_board, self.who_am_i) - threats_before) >= 2:
+            if (threats_after - threats_before) >= 2:
                 move_value += 350
-                print(f"IA ({self.who_am_i}) a détecté une fourchette potentielle avec le coup {move}")
+                print(f"IA ({COLOR_NAMES[self.who_am_i]}) a détecté une fourchette potentielle avec le coup {move}")
 
             if move_value > best_value:
                 best_value, best_moves = move_value, [move]
@@ -390,11 +1125,50 @@ class TeekoAI:
 
         # Anti-répétition en mode expert
         if self.adaptatif and best_moves:
-            filtered_moves = [m for m in best_moves if tuple(self.simulate_move(board, m, self.who_am_i)) not in self.last_moves]
+            filtered_moves = []
+            for m in best_moves:
+                state.push(m)
+                if state.hash not in self.last_moves: filtered_moves.append(m)
+                state.pop()
             if filtered_moves: best_moves = filtered_moves
 
+        self.decision = ('recherche', best_value if best_moves else None)
         return random.choice(best_moves) if best_moves else None
 
+    def threat_space_search(self, state, moves):
+        """
+        Cherche un gain forcé par menaces pour l'IA (voir threat_search.py)
+        et, à défaut, écarte les coups après lesquels l'adversaire en a un.
+
+        Les nœuds explorés s'ajoutent à self.nodes.
+
+        :param state: La partie, en phase de mouvement, avec l'IA au trait.
+        :type state: SearchState
+        :param moves: Les coups candidats de l'IA.
+        :type moves: list
+        :return: Le coup gagnant et la longueur du gain en demi-coups (ou
+                 None), et les coups qui ne perdent pas par menaces (tous
+                 les coups s'ils perdent tous).
+        :rtype: tuple[tuple or None, list]
+        """
+        solver = ThreatSearch(cancel_event=self.cancel_event)
+        mine, theirs = state.bitboards[self.who_am_i], state.bitboards[OPPONENT[self.who_am_i]]
+        forced_win = solver.find_win(mine, theirs, self.threat_depth)
+        self.nodes += solver.nodes
+        if forced_win is not None:
+            move, length = forced_win
+            return (move, 2 * length - 1), moves
+
+        safe_moves = []
+        for move in moves:
+            after = mine ^ SQUARE_BITS[move[1]] ^ SQUARE_BITS[move[2]]
+            if solver.find_win(theirs, after, self.threat_depth) is None:
+                safe_moves.append(move)
+            self.nodes += solver.nodes
+        if safe_moves and len(safe_moves) < len(moves):
+            print(f"IA ({COLOR_NAMES[self.who_am_i]}) écarte {len(moves) - len(safe_moves)} coup(s) perdant(s) par menaces")
+        return None, safe_moves or moves
+
     def get_difficulty_name(self):
         """
         Retourne le nom du niveau de difficulté actuel.
@@ -415,19 +1189,34 @@ class TeekoAI:
         :return: Le coup qui a été joué.
         :rtype: tuple or None
         """
-        best_move = self.choose_best_move()
+        return self.play_move(self.choose_best_move())
+
+    def play_move(self, best_move):
+        """
+        Exécute sur le moteur de jeu un coup choisi par choose_best_move.
+
+        Permet de séparer la recherche, qui peut tourner dans un thread de
+        travail, de l'application du coup, qui doit avoir lieu sur le thread
+        de l'interface.
+
+        :param best_move: Le coup à jouer.
+        :type best_move: tuple or None
+        :return: Le coup qui a été joué.
+        :rtype: tuple or None
+        """
         if best_move:
             self.move_history.append({'move': best_move, 'player': self.who_am_i})
+            self.analyzer.record_move(best_move, self.who_am_i)
+            self.update_aggression_factor()
             self.last_move = best_move
             
             if best_move[0] == 'drop': self.game_engine.drop_piece(best_move[1])
             else: self.game_engine.move_piece(best_move[1], best_move[2])
 
             display_move = ('drop', best_move[1] + 1) if best_move[0] == 'drop' else ('move', best_move[1] + 1, best_move[2] + 1)
-            print(f"IA ({self.who_am_i} - {self.get_difficulty_name()}) a joué: {display_move}")
+            print(f"IA ({COLOR_NAMES[self.who_am_i]} - {self.get_difficulty_name()}) a joué: {display_move}")
 
             if self.adaptatif:
-                current_board = tuple(self.game_engine.get_board())
-                self.last_moves.append(current_board)
+                self.last_moves.append(self.game_engine.hash)
                 if len(self.last_moves) > 3: self.last_moves.pop(0)
         return best_move
@@ -0,0 +1,128 @@
+# ai_worker.py
+"""
+Exécution de la recherche de l'IA dans un thread de travail.
+
+tkinter n'est pas thread-safe : le thread de travail se contente d'appeler
+TeekoAI.choose_best_move, puis range le coup trouvé. L'interface interroge
+régulièrement le worker depuis sa boucle d'événements et applique elle-même
+le coup avec TeekoAI.play_move.
+
+La recherche elle-même travaille sur une copie du moteur, mais
+choose_best_move lit aussi le plateau du moteur en direct (livre
+d'ouvertures, table de finales, coups gagnants et blocages, recherche par
+menaces). Ces lectures sont sûres parce que rien ne modifie ce moteur
+pendant le tour de l'IA : l'interface ignore les clics tant que c'est à
+l'IA de jouer, et seul play_move, sur le thread de l'interface, applique le
+coup une fois la recherche terminée. Une recherche annulée (nouvelle
+partie, abandon) continue de lire l'ancien moteur jusqu'à son prochain
+point de contrôle ; la nouvelle partie utilise un autre moteur.
+"""
+import threading
+
+from bitboard import COLOR_NAMES
+
+from ai_template import SearchCancelled
+
+
+class AIWorker:
+    """
+    Recherche d'un coup en arrière-plan, annulable de façon coopérative.
+    """
+    def __init__(self, ai):
+        """
+        Prépare la recherche pour une IA donnée.
+
+        :param ai: L'IA dont on veut le prochain coup.
+        :type ai: TeekoAI
+        """
+        self.ai = ai
+        self.move = None
+        self.error = None
+        self.cancelled = False
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"teeko-ai-{COLOR_NAMES[ai.who_am_i]}", daemon=True)
+
+    def start(self):
+        """
+        Lance la recherche dans le thread de travail.
+        """
+        self.ai.cancel_event.clear()
+        self.thread.start()
+
+    def _run(self):
+        """Corps du thread de travail."""
+        try:
+            self.move = self.ai.choose_best_move()
+        except SearchCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def cancel(self):
+        """
+        Demande l'arrêt de la recherche. Le thread se termine de lui-même
+        au prochain point de contrôle de la recherche.
+        """
+        self.cancelled = True
+        self.ai.cancel()
+
+    def is_done(self):
+        """
+        Indique si la recherche est terminée (coup trouvé, erreur ou annulation).
+
+        :rtype: bool
+        """
+        return self.done.is_set()
+
+    def join(self, timeout=None):
+        """
+        Attend la fin du thread de travail.
+
+        :param timeout: Durée maximale d'attente, en secondes.
+        :type timeout: float or None
+        """
+        if self.thread.is_alive():
+            self.thread.join(timeout)
+
+
+class PonderWorker:
+    """
+    Réflexion anticipée de l'IA pendant le tour de l'adversaire.
+    """
+    def __init__(self, ai):
+        """
+        Prépare la réflexion sur la position courante.
+
+        La copie du moteur est faite ici, sur le thread de l'interface, avant
+        que le joueur humain ne puisse modifier la partie.
+
+        :param ai: L'IA qui doit réfléchir pendant le tour adverse.
+        :type ai: TeekoAI
+        """
+        self.ai = ai
+        self.state = ai.game_engine.copy()
+        self.thread = threading.Thread(target=self._run, name=f"teeko-ponder-{COLOR_NAMES[ai.who_am_i]}", daemon=True)
+
+    def start(self):
+        """
+        Lance la réflexion dans le thread de travail.
+        """
+        self.ai.cancel_event.clear()
+        self.thread.start()
+
+    def _run(self):
+        """Corps du thread de travail."""
+        try:
+            self.ai.ponder(self.state)
+        except Exception as e:
+            print(f"Erreur pendant la réflexion anticipée : {e}")
+
+    def stop(self):
+        """
+        Arrête la réflexion et attend la fin du thread, afin que l'IA puisse
+        lancer sa vraie recherche sans concurrence.
+        """
+        self.ai.cancel()
+        self.thread.join()
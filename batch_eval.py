@@ -0,0 +1,242 @@
+# batch_eval.py
+"""
+Évaluation en lot d'un ensemble de positions sœurs.
+
+BatchEvaluator reproduit exactement le score de TeekoAI.evaluate_board pour
+N positions à la fois. Avec NumPy, les positions sont dépliées en deux
+matrices N×25 de 0 et de 1 (pions de chaque camp), et tous les termes de
+l'évaluation sont obtenus en quelques opérations matricielles :
+- les codes en base 3 des configurations gagnantes (voir
+  bitboard.pattern_codes), par produit avec la matrice 44×25 des poids 3**k
+  des cases de chaque configuration ;
+- leurs scores et les menaces, par lecture des tables de pattern_tables ;
+- le score positionnel, par produit avec le vecteur positional_values ;
+- la mobilité, par produit des cases vides avec la matrice d'adjacence.
+Le coût Python d'une évaluation est ainsi réparti sur tout le lot.
+
+NumPy est facultatif : sans lui, les positions sont évaluées une à une en
+Python pur, avec le même résultat. Les deux chemins se vérifient contre
+TeekoAI.evaluate_board et TeekoAI.calculate_threats sur des positions
+tirées au hasard (la vérification de NumPy est ignorée s'il est absent) :
+
+    python batch_eval.py --positions 5000
+"""
+import argparse
+import contextlib
+import io
+import random
+import sys
+
+from bitboard import BLACK, BOARD_SIZE, FULL_MASK, NEIGHBOR_MASKS, RED, WIN_PATTERNS, has_win, iter_bits, mobility, pattern_codes
+from search_state import pattern_tables
+
+try:
+    import numpy as np
+except ImportError:  # Repli en Python pur
+    np = None
+
+WIN_SCORE = 10000  # Même valeur que dans ai_template
+
+if np is not None:
+    _SHIFTS = np.arange(BOARD_SIZE, dtype=np.int64)
+    WEIGHTS = np.zeros((len(WIN_PATTERNS), BOARD_SIZE), dtype=np.int64)  # Poids des cases de chaque configuration
+    for _p, _pattern in enumerate(WIN_PATTERNS):
+        WEIGHTS[_p, list(_pattern)] = [3 ** k for k in range(len(_pattern))]
+    WON_CODE, LOST_CODE = 40, 80  # 4 pions du joueur, 4 pions adverses
+    ADJACENCY = np.array([[(NEIGHBOR_MASKS[i] >> j) & 1 for j in range(BOARD_SIZE)] for i in range(BOARD_SIZE)], dtype=np.int8)
+
+
+def unpack(bitboards):
+    """
+    Déplie une suite de bitboards en une matrice N×25 de 0 et de 1.
+
+    :param bitboards: Les bitboards.
+    :type bitboards: list[int]
+    :return: La matrice, de type int8.
+    :rtype: numpy.ndarray
+    """
+    return ((np.array(bitboards, dtype=np.int64)[:, None] >> _SHIFTS) & 1).astype(np.int8)
+
+
+class BatchEvaluator:
+    """
+    Évaluateur de lots de positions, du point de vue d'un joueur.
+    """
+    def __init__(self, positional_values, use_numpy=True):
+        """
+        :param positional_values: La valeur positionnelle de chaque case.
+        :type positional_values: list
+        :param use_numpy: False pour évaluer en Python pur même si NumPy est
+                          disponible (vérification du repli).
+        :type use_numpy: bool
+        """
+        self.positional_values = positional_values
+        self.use_numpy = use_numpy and np is not None
+        self._tables = {}
+        if self.use_numpy:
+            self._positional = np.array(positional_values, dtype=np.float64)
+
+    def tables(self, aggression_factor):
+        """
+        Retourne les tables de score des configurations (voir pattern_tables),
+        calculées une fois par facteur d'agressivité.
+        """
+        if aggression_factor not in self._tables:
+            tables = pattern_tables(aggression_factor)
+            if self.use_numpy:
+                tables = tuple(np.array(table, dtype=np.float64) for table in tables)
+            self._tables[aggression_factor] = tables
+        return self._tables[aggression_factor]
+
+    def scores(self, mine, theirs, aggression_factor=1.0, penalties=None):
+        """
+        Évalue un lot de positions.
+
+        :param mine: Les bitboards des pions du joueur, un par position.
+        :type mine: list[int]
+        :param theirs: Les bitboards des pions adverses.
+        :type theirs: list[int]
+        :param aggression_factor: Le facteur d'agressivité de l'évaluation.
+        :type aggression_factor: float
+        :param penalties: Une pénalité à retrancher de chaque score (répétitions),
+                          ignorée pour les positions gagnées ou perdues.
+        :type penalties: list or None
+        :return: Le score de chaque position, identique à celui de TeekoAI._score.
+        :rtype: list[float]
+        """
+        if not mine:
+            return []
+        if not self.use_numpy:
+            return [self._score(m, t, aggression_factor, penalties[i] if penalties else 0)
+                    for i, (m, t) in enumerate(zip(mine, theirs))]
+
+        values, my_threat_table, opp_threat_table = self.tables(aggression_factor)
+        m, t = unpack(mine), unpack(theirs)
+        empty = 1 - m - t
+        codes = m @ WEIGHTS.T + 2 * (t @ WEIGHTS.T)
+        score = (m @ self._positional - t @ self._positional) * 2
+        move_phase = (m + t).sum(axis=1) >= 8
+        neighbors = empty @ ADJACENCY  # Nombre de cases vides voisines de chaque case
+        score += np.where(move_phase, ((m - t) * neighbors).sum(axis=1) * 3, 0)
+        score += values[codes].sum(axis=1)
+        if penalties:
+            score -= np.array(penalties, dtype=np.float64)
+        won = (codes == WON_CODE).any(axis=1)
+        lost = (codes == LOST_CODE).any(axis=1)
+        score = np.where(won, WIN_SCORE, np.where(lost, -WIN_SCORE, score))
+        return score.tolist()
+
+    def threat_counts(self, mine, theirs):
+        """
+        Compte, pour chaque position d'un lot, les configurations contenant
+        3 pions du joueur et aucun pion adverse (voir TeekoAI.calculate_threats).
+
+        :param mine: Les bitboards des pions du joueur.
+        :type mine: list[int]
+        :param theirs: Les bitboards des pions adverses.
+        :type theirs: list[int]
+        :return: Le nombre de menaces de chaque position.
+        :rtype: list[int]
+        """
+        if not mine:
+            return []
+        threat_table = self.tables(1.0)[1]
+        if not self.use_numpy:
+            return [sum(threat_table[code] for code in pattern_codes(m, t)) for m, t in zip(mine, theirs)]
+        codes = unpack(mine) @ WEIGHTS.T + 2 * (unpack(theirs) @ WEIGHTS.T)
+        return threat_table[codes].sum(axis=1).astype(np.int64).tolist()
+
+    def _score(self, mine, theirs, aggression_factor, penalty):
+        """Évalue une seule position, en Python pur."""
+        if has_win(mine): return WIN_SCORE
+        if has_win(theirs): return -WIN_SCORE
+        values = self.tables(aggression_factor)[0]
+        positional_values = self.positional_values
+        score = -penalty
+        score += (sum(positional_values[i] for i in iter_bits(mine)) - sum(positional_values[i] for i in iter_bits(theirs))) * 2
+        if (mine | theirs).bit_count() >= 8:
+            empty = FULL_MASK & ~(mine | theirs)
+            score += (mobility(mine, empty) - mobility(theirs, empty)) * 3
+        return score + sum(values[code] for code in pattern_codes(mine, theirs))
+
+
+def random_positions(count, rng):
+    """
+    Tire des positions au hasard, de 0 à 4 pions par camp, y compris des
+    positions gagnées ou perdues.
+
+    :param count: Le nombre de positions.
+    :type count: int
+    :param rng: Le générateur aléatoire.
+    :type rng: random.Random
+    :return: Les couples (pions du joueur, pions adverses).
+    :rtype: list[tuple[int, int]]
+    """
+    positions = []
+    for _ in range(count):
+        squares = rng.sample(range(BOARD_SIZE), 8)
+        mine, theirs = squares[:rng.randint(0, 4)], squares[4:4 + rng.randint(0, 4)]
+        positions.append((sum(1 << i for i in mine), sum(1 << i for i in theirs)))
+    return positions
+
+
+def check(positions, aggression_factor=1.0, use_numpy=True):
+    """
+    Compare les scores et les menaces du lot à ceux de TeekoAI, position par
+    position.
+
+    :param positions: Les couples (pions de l'IA, pions adverses).
+    :type positions: list[tuple[int, int]]
+    :param aggression_factor: Le facteur d'agressivité de l'évaluation.
+    :type aggression_factor: float
+    :param use_numpy: False pour vérifier le repli en Python pur.
+    :type use_numpy: bool
+    :return: La liste des écarts trouvés (vide si tout est conforme).
+    :rtype: list[str]
+    """
+    from ai_template import TeekoAI  # Import tardif : ai_template importe ce module
+    from game_engine import TeekoGame
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ai = TeekoAI(TeekoGame(), BLACK, "2", tablebase=False, opening_book=False)
+    ai.aggression_factor = aggression_factor
+    evaluator = BatchEvaluator(ai.positional_values, use_numpy)
+    mine, theirs = [m for m, t in positions], [t for m, t in positions]
+    scores = evaluator.scores(mine, theirs, aggression_factor)
+    threats = evaluator.threat_counts(mine, theirs)
+
+    errors = []
+    for (m, t), score, threat_count in zip(positions, scores, threats):
+        board = bytearray(BOARD_SIZE)
+        for i in iter_bits(m): board[i] = BLACK
+        for i in iter_bits(t): board[i] = RED
+        expected = ai.evaluate_board(board)
+        if score != expected:
+            errors.append(f"score {score} au lieu de {expected} (plateau {list(board)})")
+        if not has_win(m) and not has_win(t) and threat_count != ai.calculate_threats(board, BLACK):
+            errors.append(f"{threat_count} menaces au lieu de {ai.calculate_threats(board, BLACK)} (plateau {list(board)})")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifie l'évaluation en lot contre TeekoAI.evaluate_board.")
+    parser.add_argument('--positions', type=int, default=5000, help="nombre de positions tirées au hasard")
+    parser.add_argument('--seed', type=int, default=0, help="graine du tirage")
+    args = parser.parse_args()
+
+    positions = random_positions(args.positions, random.Random(args.seed))
+    failed = False
+    for label, use_numpy in (("Python pur", False), ("NumPy", True)):
+        if use_numpy and np is None:
+            print("NumPy : absent, vérification ignorée")
+            continue
+        errors = [error for factor in (1.0, 1.5) for error in check(positions, factor, use_numpy)]
+        for error in errors[:20]:
+            print(error)
+        print(f"{label} : {len(errors)} écart(s) sur {len(positions)} positions")
+        failed = failed or bool(errors)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
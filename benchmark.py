@@ -0,0 +1,205 @@
+# benchmark.py
+"""
+Banc d'essai de la recherche de l'IA sur des positions fixes.
+
+Chaque position est recherchée à profondeur fixe, avec une table de
+transposition neuve et un générateur aléatoire initialisé, de deux façons :
+- « minimax » : TeekoAI.search_root sur tous les coups, sans aucun raccourci ;
+- « choose » : TeekoAI.choose_best_move, approfondissement itératif compris.
+
+Pour chacune, le banc d'essai relève le nombre de nœuds, la durée, le
+nombre de nœuds par seconde, le taux de succès de la table de transposition
+et le coup choisi. Les résultats peuvent être enregistrés au format JSON
+puis comparés à une référence :
+
+    python benchmark.py --save reference.json
+    python benchmark.py --compare reference.json
+
+La comparaison signale les recherches dont la durée dépasse celle de la
+référence de plus de la tolérance, ainsi que celles dont le nombre de nœuds
+ou le coup choisi a changé (la recherche elle-même a alors été modifiée).
+Le verdict porte sur la durée totale, moins sensible au bruit de mesure.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+
+from ai_template import TeekoAI
+from bitboard import BLACK, EMPTY, RED, board_to_bitboards
+from game_engine import TeekoGame
+from transposition import TranspositionTable
+from zobrist import hash_board
+
+# Positions de référence : plateau (b = noir, r = rouge, . = vide, ligne par
+# ligne), joueur au trait, profondeur de recherche.
+POSITIONS = {
+    'drop-empty':    ('.........................', BLACK, 4),
+    'drop-2':        ('.......b....r............', BLACK, 4),
+    'drop-4':        ('......b.r...b.....r......', BLACK, 4),
+    'drop-5':        ('...b..b.r...b...r........', RED, 4),
+    'drop-7-threat': ('.....bb.r..rb...r.b......', RED, 4),
+    'move-center':   ('......brb...rb...rbr.....', BLACK, 4),
+    'move-spread':   ('b...r.....rb.b...r.....rb', RED, 4),
+    'move-threat':   ('..bb..r.b.rr....b.....r..', BLACK, 4),
+    'move-edges':    ('br...r.......b.....b..brr', BLACK, 4),
+}
+
+
+def load_position(text, to_move):
+    """
+    Construit une partie à partir d'une position du banc d'essai.
+
+    :param text: Le plateau, 25 caractères parmi 'b', 'r' et '.'.
+    :type text: str
+    :param to_move: Le joueur au trait (BLACK ou RED).
+    :type to_move: int
+    :return: La partie dans cette position.
+    :rtype: TeekoGame
+    """
+    game = TeekoGame()
+    game.board = bytearray({'b': BLACK, 'r': RED}.get(c, EMPTY) for c in text)
+    black, red = board_to_bitboards(game.board)
+    game.bitboards = [0, black, red]
+    game.turn_count = (black | red).bit_count()
+    game.phase = 'move' if game.turn_count >= 8 else 'drop'
+    game.current_player = to_move
+    game.hash = hash_board(game.board, to_move)
+    return game
+
+
+def _new_ai(game, to_move, **kwargs):
+    """Crée une IA sans livre d'ouvertures ni table de finales, avec une table de transposition neuve."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return TeekoAI(game, to_move, "4", transposition_table=TranspositionTable(),
+                       opening_book=False, tablebase=False, **kwargs)
+
+
+def _measure(game, to_move, run, repeat, **kwargs):
+    """
+    Exécute une recherche plusieurs fois, chaque fois avec une IA neuve, et
+    relève ses statistiques ; la durée retenue est la plus courte.
+    """
+    seconds = float('inf')
+    for _ in range(repeat):
+        ai = _new_ai(game, to_move, **kwargs)
+        random.seed(0)
+        ai.nodes = 0
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            move = run(ai)
+        seconds = min(seconds, time.perf_counter() - start)
+    tt = ai.transposition_table.stats()
+    return {
+        'nodes': ai.nodes,
+        'seconds': round(seconds, 4),
+        'nps': round(ai.nodes / seconds) if seconds else 0,
+        'tt_hit_rate': round(tt['hits'] / tt['probes'], 4) if tt['probes'] else 0.0,
+        'move': list(move) if move else None,
+    }
+
+
+def run_position(text, to_move, depth, repeat=3):
+    """
+    Mesure les deux recherches sur une position.
+
+    :param text: Le plateau (voir load_position).
+    :type text: str
+    :param to_move: Le joueur au trait.
+    :type to_move: int
+    :param depth: La profondeur de recherche.
+    :type depth: int
+    :param repeat: Le nombre de mesures, dont la plus rapide est retenue.
+    :type repeat: int
+    :return: Les statistiques de « minimax » et de « choose ».
+    :rtype: dict
+    """
+    game = load_position(text, to_move)
+
+    def search_root(ai):
+        moves = ai.get_all_possible_moves(game.board, to_move)
+        return max(ai.search_root(ai.search_state(), moves, depth), key=lambda x: x[1])[0]
+
+    return {
+        'minimax': _measure(game, to_move, search_root, repeat),
+        'choose': _measure(game, to_move, TeekoAI.choose_best_move, repeat, max_depth=depth, node_budget=10 ** 9),
+    }
+
+
+def run_benchmark(names=None, repeat=3):
+    """
+    Exécute le banc d'essai et affiche ses résultats.
+
+    :param names: Les positions à mesurer (par défaut, toutes).
+    :type names: list[str] or None
+    :param repeat: Le nombre de mesures par recherche.
+    :type repeat: int
+    :return: Les résultats, prêts à être enregistrés en JSON.
+    :rtype: dict
+    """
+    results = {}
+    print(f"{'position':<15} {'recherche':<8} {'nœuds':>9} {'durée (s)':>10} {'nœuds/s':>9} {'TT':>6}  coup")
+    for name in names or POSITIONS:
+        text, to_move, depth = POSITIONS[name]
+        results[name] = run_position(text, to_move, depth, repeat)
+        for kind, r in results[name].items():
+            print(f"{name:<15} {kind:<8} {r['nodes']:>9} {r['seconds']:>10.3f} {r['nps']:>9} {r['tt_hit_rate']:>6.1%}  {r['move']}")
+    total_nodes = sum(r['nodes'] for position in results.values() for r in position.values())
+    total_seconds = sum(r['seconds'] for position in results.values() for r in position.values())
+    print(f"Total : {total_nodes} nœuds en {total_seconds:.2f} s ({total_nodes / total_seconds:,.0f} nœuds/s)")
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'positions': results}
+
+
+def compare(results, reference, tolerance=0.10):
+    """
+    Compare des résultats à une référence et affiche les écarts.
+
+    :param results: Les résultats de run_benchmark.
+    :type results: dict
+    :param reference: Les résultats de référence.
+    :type reference: dict
+    :param tolerance: L'augmentation de durée relative tolérée.
+    :type tolerance: float
+    :return: True si la durée totale n'a pas augmenté au-delà de la tolérance.
+    :rtype: bool
+    """
+    total, total_ref = 0.0, 0.0
+    print(f"\nComparaison avec la référence (tolérance {tolerance:.0%}) :")
+    for name, position in results['positions'].items():
+        for kind, r in position.items():
+            ref = reference['positions'].get(name, {}).get(kind)
+            if ref is None: continue
+            total, total_ref = total + r['seconds'], total_ref + ref['seconds']
+            ratio = r['seconds'] / ref['seconds'] if ref['seconds'] else 1.0
+            notes = []
+            if ratio > 1 + tolerance: notes.append("plus lent")
+            if r['nodes'] != ref['nodes']: notes.append(f"nœuds {ref['nodes']} -> {r['nodes']}")
+            if r['move'] != ref['move']: notes.append(f"coup {ref['move']} -> {r['move']}")
+            print(f"{name:<15} {kind:<8} durée x{ratio:.2f}  {', '.join(notes)}")
+    ratio = total / total_ref if total_ref else 1.0
+    ok = ratio <= 1 + tolerance
+    print(f"Durée totale x{ratio:.2f} : {'OK' if ok else 'RALENTISSEMENT'}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai de la recherche de l'IA.")
+    parser.add_argument('positions', nargs='*', help=f"positions à mesurer parmi : {', '.join(POSITIONS)}")
+    parser.add_argument('--save', help="enregistre les résultats dans ce fichier JSON")
+    parser.add_argument('--compare', help="compare les résultats à ce fichier JSON de référence")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="ralentissement relatif toléré")
+    parser.add_argument('--repeat', type=int, default=3, help="mesures par recherche (la plus rapide est retenue)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.positions, args.repeat)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            reference = json.load(f)
+        sys.exit(0 if compare(results, reference, args.tolerance) else 1)
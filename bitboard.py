@@ -0,0 +1,302 @@
+# bitboard.py
+"""
+Représentation du plateau de Teeko sous forme de bitboards.
+
+Chaque couleur est codée par un entier de 25 bits : le bit i est à 1 si la
+case i est occupée par un pion de cette couleur. Les configurations gagnantes
+et les voisinages sont précalculés sous forme de masques, ce qui ramène la
+détection de victoire et la génération de coups à quelques opérations
+binaires.
+"""
+
+BOARD_SIZE = 25
+FULL_MASK = (1 << BOARD_SIZE) - 1
+SQUARE_BITS = [1 << i for i in range(BOARD_SIZE)]
+
+# Contenu d'une case et identifiants des joueurs. Le plateau est un bytearray
+# de 25 cases ; les noms des couleurs ne servent qu'à l'affichage et aux
+# options en ligne de commande.
+EMPTY, BLACK, RED = 0, 1, 2
+OPPONENT = (EMPTY, RED, BLACK)  # OPPONENT[joueur] : son adversaire
+COLOR_NAMES = {BLACK: 'black', RED: 'red'}
+COLORS = {name: player for player, name in COLOR_NAMES.items()}
+
+
+def generate_win_patterns():
+    """
+    Génère toutes les configurations gagnantes possibles.
+
+    Calcule les alignements horizontaux, verticaux, diagonaux et les carrés 2x2
+    de 4 pions qui constituent une victoire.
+
+    :return: Une liste de listes, où chaque sous-liste est une combinaison de
+             4 positions gagnantes.
+    :rtype: list[list[int]]
+    """
+    win_patterns = []
+
+    # Alignements horizontaux
+    for row in range(5):
+        for col in range(2):
+            win_patterns.append([row * 5 + col + i for i in range(4)])
+
+    # Alignements verticaux
+    for row in range(2):
+        for col in range(5):
+            win_patterns.append([row * 5 + col + i * 5 for i in range(4)])
+
+    # Alignements diagonaux (de haut-gauche à bas-droite)
+    for row in range(2):
+        for col in range(2):
+            win_patterns.append([row * 5 + col + i * 6 for i in range(4)])
+
+    # Alignements diagonaux (de haut-droite à bas-gauche)
+    for row in range(2):
+        for col in range(3, 5):
+            win_patterns.append([row * 5 + col + i * 4 for i in range(4)])
+
+    # Carrés 2x2
+    for row in range(4):
+        for col in range(4):
+            win_patterns.append([row * 5 + col, row * 5 + col + 1,
+                                 (row + 1) * 5 + col, (row + 1) * 5 + col + 1])
+    return win_patterns
+
+
+def _mask(positions):
+    """Construit le masque binaire d'un ensemble de cases."""
+    mask = 0
+    for pos in positions:
+        mask |= 1 << pos
+    return mask
+
+
+def _starts(rows, cols):
+    """Masque des cases de départ (row, col) d'un alignement."""
+    return _mask(r * 5 + c for r in rows for c in cols)
+
+
+WIN_PATTERNS = generate_win_patterns()
+WIN_MASKS = [_mask(pattern) for pattern in WIN_PATTERNS]
+
+# Index inverse case -> configurations gagnantes qui la contiennent (4 à 12
+# par case). Après un coup, seules les configurations passant par la case
+# d'arrivée peuvent avoir été complétées.
+SQUARE_PATTERNS = [[p for p, pattern in enumerate(WIN_PATTERNS) if i in pattern] for i in range(BOARD_SIZE)]
+SQUARE_WIN_MASKS = [[WIN_MASKS[p] for p in patterns] for patterns in SQUARE_PATTERNS]
+
+# Code en base 3 du contenu d'une configuration : sa k-ième case compte pour
+# 3**k, multiplié par 1 si elle porte un pion du joueur, par 2 si elle porte
+# un pion adverse. Chacun des 81 codes désigne un contenu précis, si bien
+# qu'un score ou une menace se lit dans une table au lieu d'être recompté.
+PATTERN_CODES = 81
+SQUARE_PATTERN_WEIGHTS = [[(p, 3 ** WIN_PATTERNS[p].index(i)) for p in SQUARE_PATTERNS[i]] for i in range(BOARD_SIZE)]
+# Nombre de pions du joueur et de pions adverses de chaque code
+CODE_COUNTS = [(sum(code // 3 ** k % 3 == 1 for k in range(4)), sum(code // 3 ** k % 3 == 2 for k in range(4)))
+               for code in range(PATTERN_CODES)]
+
+# Masques des cases adjacentes (8-voisinage) de chaque case.
+NEIGHBOR_MASKS = [
+    _mask(nr * 5 + nc
+          for nr in range(r - 1, r + 2) for nc in range(c - 1, c + 2)
+          if (nr, nc) != (r, c) and 0 <= nr < 5 and 0 <= nc < 5)
+    for r, c in (divmod(i, 5) for i in range(BOARD_SIZE))
+]
+
+# Cases de départ valides pour chaque famille d'alignements, utilisées par
+# has_win : un décalage de 1 (ligne), 5 (colonne), 6 (diagonale), 4
+# (anti-diagonale) ou le carré 1/5/6 ne doit pas « déborder » d'une ligne.
+_H_STARTS = _starts(range(5), range(2))
+_V_STARTS = _starts(range(2), range(5))
+_D_STARTS = _starts(range(2), range(2))
+_A_STARTS = _starts(range(2), range(3, 5))
+_S_STARTS = _starts(range(4), range(4))
+
+
+def has_win(bits):
+    """
+    Vérifie si un bitboard contient une configuration gagnante.
+
+    Chaque famille d'alignements est testée d'un seul coup en combinant le
+    bitboard avec ses propres décalages.
+
+    :param bits: Le bitboard d'un joueur.
+    :type bits: int
+    :return: True si les pions forment un alignement ou un carré gagnant.
+    :rtype: bool
+    """
+    return bool(
+        (bits & (bits >> 1) & (bits >> 2) & (bits >> 3) & _H_STARTS)
+        or (bits & (bits >> 5) & (bits >> 10) & (bits >> 15) & _V_STARTS)
+        or (bits & (bits >> 6) & (bits >> 12) & (bits >> 18) & _D_STARTS)
+        or (bits & (bits >> 4) & (bits >> 8) & (bits >> 12) & _A_STARTS)
+        or (bits & (bits >> 1) & (bits >> 5) & (bits >> 6) & _S_STARTS)
+    )
+
+
+def wins_through(bits, square):
+    """
+    Vérifie si un bitboard contient une configuration gagnante passant par
+    une case donnée.
+
+    C'est le test à utiliser juste après un coup : seules les configurations
+    contenant la case d'arrivée sont examinées.
+
+    :param bits: Le bitboard du joueur qui vient de jouer.
+    :type bits: int
+    :param square: La case d'arrivée du coup.
+    :type square: int
+    :return: True si le coup a complété une configuration gagnante.
+    :rtype: bool
+    """
+    for mask in SQUARE_WIN_MASKS[square]:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def board_to_bitboards(board):
+    """
+    Convertit la vue case par case d'un plateau en une paire de bitboards.
+
+    :param board: Le plateau (25 cases EMPTY, BLACK ou RED).
+    :type board: bytearray
+    :return: Les bitboards des pions noirs et rouges.
+    :rtype: tuple[int, int]
+    """
+    bits = [0, 0, 0]
+    for i, piece in enumerate(board):
+        bits[piece] |= SQUARE_BITS[i]
+    return bits[BLACK], bits[RED]
+
+
+def pattern_codes(mine, theirs):
+    """
+    Calcule le code en base 3 de chacune des configurations gagnantes.
+
+    :param mine: Le bitboard des pions du joueur.
+    :type mine: int
+    :param theirs: Le bitboard des pions adverses.
+    :type theirs: int
+    :return: Les 44 codes, dans l'ordre de WIN_PATTERNS.
+    :rtype: list[int]
+    """
+    codes = [0] * len(WIN_PATTERNS)
+    for square in iter_bits(mine):
+        for p, weight in SQUARE_PATTERN_WEIGHTS[square]:
+            codes[p] += weight
+    for square in iter_bits(theirs):
+        for p, weight in SQUARE_PATTERN_WEIGHTS[square]:
+            codes[p] += 2 * weight
+    return codes
+
+
+def iter_bits(bits):
+    """
+    Itère sur les indices des bits à 1, par ordre croissant.
+
+    :param bits: Un bitboard.
+    :type bits: int
+    :return: Un générateur d'indices de cases.
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def mobility(bits, empty):
+    """
+    Compte les déplacements possibles des pions d'un bitboard.
+
+    :param bits: Le bitboard des pions du joueur.
+    :type bits: int
+    :param empty: Le bitboard des cases vides.
+    :type empty: int
+    :return: Le nombre de coups ('move', from, to) disponibles.
+    :rtype: int
+    """
+    return sum((NEIGHBOR_MASKS[pos] & empty).bit_count() for pos in iter_bits(bits))
+
+
+def generate_moves(mine, theirs):
+    """
+    Génère les coups légaux du joueur au trait à partir des bitboards.
+
+    :param mine: Le bitboard du joueur qui doit jouer.
+    :type mine: int
+    :param theirs: Le bitboard de son adversaire.
+    :type theirs: int
+    :return: Les coups ('drop', pos) en phase de placement, ('move', from, to)
+             ensuite, par cases croissantes.
+    :rtype: list
+    """
+    empty = FULL_MASK & ~(mine | theirs)
+    if (mine | theirs).bit_count() < 8:
+        return [('drop', pos) for pos in iter_bits(empty)]
+    return [('move', from_pos, to_pos) for from_pos in iter_bits(mine) for to_pos in iter_bits(NEIGHBOR_MASKS[from_pos] & empty)]
+
+
+def _symmetry(k):
+    """
+    Construit la permutation des cases associée à l'une des 8 symétries du
+    plateau : k % 4 quarts de tour, précédés d'un retournement horizontal
+    si k >= 4.
+    """
+    permutation = []
+    for i in range(BOARD_SIZE):
+        r, c = divmod(i, 5)
+        if k >= 4: c = 4 - c
+        for _ in range(k % 4):
+            r, c = c, 4 - r
+        permutation.append(r * 5 + c)
+    return permutation
+
+
+# SYMMETRIES[k][i] est l'image de la case i par la symétrie k (0 = identité).
+# Les configurations gagnantes, les voisinages et les valeurs positionnelles
+# de l'IA sont invariants par ces 8 symétries.
+SYMMETRIES = [_symmetry(k) for k in range(8)]
+INVERSE_SYMMETRIES = [SYMMETRIES.index([p.index(i) for i in range(BOARD_SIZE)]) for p in SYMMETRIES]
+
+# Images des bitboards par morceaux de 9, 8 et 8 bits, pour transformer un
+# bitboard complet en trois consultations.
+_SYMMETRY_TABLES = [
+    [[_mask(SYMMETRIES[k][shift + i] for i in range(width) if value >> i & 1) for value in range(1 << width)]
+     for shift, width in ((0, 9), (9, 8), (17, 8))]
+    for k in range(8)
+]
+
+
+def transform(bits, k):
+    """
+    Applique une symétrie du plateau à un bitboard.
+
+    :param bits: Le bitboard à transformer.
+    :type bits: int
+    :param k: L'indice de la symétrie (voir SYMMETRIES).
+    :type k: int
+    :return: Le bitboard image.
+    :rtype: int
+    """
+    low, mid, high = _SYMMETRY_TABLES[k]
+    return low[bits & 0x1FF] | mid[(bits >> 9) & 0xFF] | high[bits >> 17]
+
+
+def transform_move(move, k):
+    """
+    Applique une symétrie du plateau à un coup.
+
+    :param move: Le coup, ('drop', pos) ou ('move', from, to), ou None.
+    :type move: tuple or None
+    :param k: L'indice de la symétrie (voir SYMMETRIES).
+    :type k: int
+    :return: Le coup image.
+    :rtype: tuple or None
+    """
+    if move is None:
+        return None
+    permutation = SYMMETRIES[k]
+    if move[0] == 'drop':
+        return ('drop', permutation[move[1]])
+    return ('move', permutation[move[1]], permutation[move[2]])
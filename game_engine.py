@@ -1,21 +1,33 @@
+from bitboard import BLACK, EMPTY, NEIGHBOR_MASKS, OPPONENT, SQUARE_BITS, generate_win_patterns, has_win, wins_through
+from zobrist import PIECE_KEYS, SIDE_KEY
+
 class TeekoGame:
+    # Attributs fixes : une partie est copiée à chaque recherche et à chaque
+    # envoi vers un processus de calcul.
+    __slots__ = ('board', 'bitboards', 'current_player', 'phase', 'turn_count', 'winner',
+                 'win_patterns', 'undo_stack', 'hash')
+
     def __init__(self):
         """
         Le constructeur de la classe TeekoGame.
 
         Initialise le jeu Teeko avec un plateau vide et un état de jeu initial. 
-        Le plateau est une liste de 25 éléments. Le joueur noir commence.
+        Le plateau est un bytearray de 25 cases valant EMPTY, BLACK ou RED
+        (voir bitboard.py). Le joueur noir commence.
         La partie débute en phase de placement ('drop').
         
         :param self: L'instance de l'objet.
         :return: Aucun.
         """
-        self.board = [None] * 25  # Plateau de 5x5 représenté par une liste
-        self.current_player = 'black'  # Le joueur noir commence
+        self.board = bytearray(25)  # Plateau de 5x5, une case par octet
+        self.bitboards = [0, 0, 0]  # Miroir binaire du plateau, indexé par joueur (BLACK, RED)
+        self.current_player = BLACK  # Le joueur noir commence
         self.phase = 'drop'  # Le jeu commence par la phase de placement
         self.turn_count = 0
         self.winner = None
         self.win_patterns = self.generate_win_patterns()
+        self.undo_stack = []  # Enregistrements d'annulation des coups joués via push()
+        self.hash = 0  # Hachage de Zobrist de la position (plateau et joueur au trait)
         
     def reset(self):
         """
@@ -27,20 +39,45 @@ class TeekoGame:
         :param self: L'instance de l'objet.
         :return: Aucun.
         """
-        self.board = [None] * 25
-        self.current_player = 'black'
+        self.board = bytearray(25)
+        self.bitboards = [0, 0, 0]
+        self.current_player = BLACK
         self.phase = 'drop'
         self.turn_count = 0
         self.winner = None
+        self.undo_stack = []
+        self.hash = 0
+
+    def copy(self):
+        """
+        Crée une copie indépendante de l'état de la partie.
+
+        Utilisée par l'IA pour explorer l'arbre de jeu via push/pop sans
+        toucher au plateau affiché par l'interface.
+
+        :param self: L'instance de l'objet.
+        :return: Une nouvelle instance de TeekoGame dans le même état.
+        :rtype: TeekoGame
+        """
+        clone = TeekoGame.__new__(TeekoGame)
+        clone.board = self.board.copy()
+        clone.bitboards = self.bitboards.copy()
+        clone.current_player = self.current_player
+        clone.phase = self.phase
+        clone.turn_count = self.turn_count
+        clone.winner = self.winner
+        clone.win_patterns = self.win_patterns
+        clone.undo_stack = []
+        clone.hash = self.hash
+        return clone
         
     def get_board(self):
         """
         Retourne l'état actuel du plateau.
 
         :param self: L'instance de l'objet.
-        :return: Une liste de 25 éléments représentant le plateau. 
-                 Chaque élément est soit None, 'black', ou 'red'.
-        :rtype: list
+        :return: Le plateau, 25 cases valant EMPTY, BLACK ou RED.
+        :rtype: bytearray
         """
         return self.board
 
@@ -49,8 +86,8 @@ class TeekoGame:
         Retourne le joueur actuel.
 
         :param self: L'instance de l'objet.
-        :return: La couleur du joueur actuel ('black' ou 'red').
-        :rtype: str
+        :return: Le joueur actuel (BLACK ou RED).
+        :rtype: int
         """
         return self.current_player
 
@@ -79,8 +116,8 @@ class TeekoGame:
         Retourne le gagnant du jeu, s'il y en a un.
 
         :param self: L'instance de l'objet.
-        :return: La couleur du gagnant ('black' ou 'red'), ou None s'il n'y a pas encore de gagnant.
-        :rtype: str or None
+        :return: Le gagnant (BLACK ou RED), ou None s'il n'y a pas encore de gagnant.
+        :rtype: int or None
         """
         return self.winner
 
@@ -105,10 +142,10 @@ class TeekoGame:
         :param self: L'instance de l'objet.
         :param position: L'index de la case à vérifier.
         :type position: int
-        :return: True si la case est libre (contient None), False sinon.
+        :return: True si la case est libre (contient EMPTY), False sinon.
         :rtype: bool
         """
-        return self.board[position] is None
+        return self.board[position] == EMPTY
     
     def is_game_over(self):
         """
@@ -140,10 +177,12 @@ class TeekoGame:
             return False
 
         self.board[position] = self.current_player
+        self.bitboards[self.current_player] |= SQUARE_BITS[position]
+        self.hash ^= PIECE_KEYS[self.current_player][position]
         self.turn_count += 1
 
-        # Vérifie si le joueur actuel a gagné
-        if self.check_win(self.current_player):
+        # Vérifie si le joueur actuel a gagné (configurations passant par la case jouée)
+        if wins_through(self.bitboards[self.current_player], position):
             self.winner = self.current_player
             return True
 
@@ -181,15 +220,17 @@ class TeekoGame:
             return False
 
         # Vérifie si le déplacement est vers une position adjacente
-        if abs(from_position - to_position) not in [1, 5, 6, 4]:
+        if not NEIGHBOR_MASKS[from_position] & SQUARE_BITS[to_position]:
             return False
 
         # Déplace le pion
-        self.board[from_position] = None
+        self.board[from_position] = EMPTY
         self.board[to_position] = self.current_player
+        self.bitboards[self.current_player] ^= SQUARE_BITS[from_position] | SQUARE_BITS[to_position]
+        self.hash ^= PIECE_KEYS[self.current_player][from_position] ^ PIECE_KEYS[self.current_player][to_position]
 
-        # Vérifie si le joueur actuel a gagné
-        if self.check_win(self.current_player):
+        # Vérifie si le joueur actuel a gagné (configurations passant par la case d'arrivée)
+        if wins_through(self.bitboards[self.current_player], to_position):
             self.winner = self.current_player
             return True
 
@@ -198,16 +239,79 @@ class TeekoGame:
 
         return True
 
+    def push(self, move):
+        """
+        Joue un coup en place pour le joueur actuel et mémorise de quoi l'annuler.
+
+        Contrairement à drop_piece et move_piece, aucune validation n'est faite :
+        le coup doit provenir d'un générateur de coups légaux. Le plateau, le
+        joueur actuel, la phase, le compteur de tours et le gagnant évoluent
+        exactement comme lors d'un coup normal, hachage de Zobrist compris.
+
+        :param self: L'instance de l'objet.
+        :param move: Le coup à jouer, ('drop', pos) ou ('move', from, to).
+        :type move: tuple
+        :return: Aucun.
+        """
+        player = self.current_player
+        self.undo_stack.append((move, player, self.phase, self.turn_count, self.winner, self.hash))
+
+        if move[0] == 'drop':
+            target = move[1]
+            self.board[target] = player
+            self.bitboards[player] |= SQUARE_BITS[target]
+            self.hash ^= PIECE_KEYS[player][target]
+            self.turn_count += 1
+        else:
+            target = move[2]
+            self.board[move[1]] = EMPTY
+            self.board[target] = player
+            self.bitboards[player] ^= SQUARE_BITS[move[1]] | SQUARE_BITS[target]
+            self.hash ^= PIECE_KEYS[player][move[1]] ^ PIECE_KEYS[player][target]
+
+        if wins_through(self.bitboards[player], target):
+            self.winner = player
+            return
+
+        self.switch_player()
+        if self.turn_count >= 8:
+            self.phase = 'move'
+
+    def pop(self):
+        """
+        Annule le dernier coup joué avec push.
+
+        Restaure le plateau, le joueur actuel, la phase, le compteur de tours,
+        le gagnant et le hachage tels qu'ils étaient avant ce coup.
+
+        :param self: L'instance de l'objet.
+        :return: Le coup annulé.
+        :rtype: tuple
+        """
+        move, player, self.phase, self.turn_count, self.winner, self.hash = self.undo_stack.pop()
+        self.current_player = player
+
+        if move[0] == 'drop':
+            self.board[move[1]] = EMPTY
+            self.bitboards[player] ^= SQUARE_BITS[move[1]]
+        else:
+            self.board[move[2]] = EMPTY
+            self.board[move[1]] = player
+            self.bitboards[player] ^= SQUARE_BITS[move[1]] | SQUARE_BITS[move[2]]
+        return move
+
     def switch_player(self):
         """
         Change le joueur actuel.
 
-        Passe de 'black' à 'red' et vice-versa.
+        Passe de BLACK à RED et vice-versa, et met à jour le hachage
+        en conséquence.
 
         :param self: L'instance de l'objet.
         :return: Aucun.
         """
-        self.current_player = 'red' if self.current_player == 'black' else 'black'
+        self.current_player = OPPONENT[self.current_player]
+        self.hash ^= SIDE_KEY
 
     def generate_win_patterns(self):
         """
@@ -221,58 +325,19 @@ class TeekoGame:
                  4 positions gagnantes.
         :rtype: list[list[int]]
         """
-        win_patterns = []
-
-        # Alignements horizontaux
-        for row in range(5):
-            for col in range(2):
-                pattern = [row * 5 + col + i for i in range(4)]
-                win_patterns.append(pattern)
-
-        # Alignements verticaux
-        for row in range(2):
-            for col in range(5):
-                pattern = [row * 5 + col + i * 5 for i in range(4)]
-                win_patterns.append(pattern)
-
-        # Alignements diagonaux (de haut-gauche à bas-droite)
-        for row in range(2):
-            for col in range(2):
-                pattern = [row * 5 + col + i * 6 for i in range(4)]
-                win_patterns.append(pattern)
-
-        # Alignements diagonaux (de haut-droite à bas-gauche)
-        for row in range(2):
-            for col in range(3, 5):
-                pattern = [row * 5 + col + i * 4 for i in range(4)]
-                win_patterns.append(pattern)
-
-        # Carrés 2x2
-        for row in range(4):
-            for col in range(4):
-                pattern = [row * 5 + col, row * 5 + col + 1,
-                           (row + 1) * 5 + col, (row + 1) * 5 + col + 1]
-                win_patterns.append(pattern)
-        return win_patterns
+        return generate_win_patterns()
 
     def check_win(self, player):
         """
         Vérifie si un joueur donné a gagné.
 
-        Parcourt toutes les configurations gagnantes et vérifie si le joueur
-        occupe toutes les positions de l'une d'entre elles.
+        S'appuie sur le bitboard du joueur : chaque famille de configurations
+        gagnantes est testée en quelques opérations binaires.
 
         :param self: L'instance de l'objet.
-        :param player: Le joueur à vérifier ('black' ou 'red').
-        :type player: str
+        :param player: Le joueur à vérifier (BLACK ou RED).
+        :type player: int
         :return: True si le joueur a gagné, False sinon.
         :rtype: bool
         """
-        # Vérifie toutes les lignes et tous les carrés possibles
-        win_patterns = self.win_patterns
-
-        for pattern in win_patterns:
-            if all(self.board[pos] == player for pos in pattern):
-                return True
-
-        return False
+        return has_win(self.bitboards[player])
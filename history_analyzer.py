@@ -1,33 +1,81 @@
 # history_analyzer.py
+from bitboard import BLACK, EMPTY, OPPONENT, RED, WIN_PATTERNS
 
 class HistoryAnalyzer:
-    def __init__(self):
+    def __init__(self, win_patterns=None):
         """
         Initialise l'analyseur d'historique.
-        Définit les zones stratégiques du plateau de 5x5.
+        Définit les zones stratégiques du plateau de 5x5 et les compteurs
+        de style tenus à jour coup par coup par record_move.
         """
         self.corners = {0, 4, 20, 24}
         self.center = {12}
         self.edges = {1, 2, 3, 5, 9, 10, 14, 15, 19, 21, 22, 23}
 
+        self.win_patterns = win_patterns if win_patterns is not None else WIN_PATTERNS
+        self.reset()
+
+    def reset(self):
+        """Remet à zéro le plateau suivi et les compteurs de style."""
+        self.board = bytearray(25)
+        self.move_count = 0
+        self.styles = {
+            BLACK: {'offensive': 0, 'defensive': 0, 'neutral': 0},
+            RED: {'offensive': 0, 'defensive': 0, 'neutral': 0}
+        }
+
     def _simulate_move(self, board, move, player):
         """Simule un coup sur une copie du plateau."""
-        new_board = list(board)
+        new_board = board.copy()
         move_type, *positions = move
         if move_type == 'drop':
             new_board[positions[0]] = player
         elif move_type == 'move':
-            new_board[positions[0]] = None
+            new_board[positions[0]] = EMPTY
             new_board[positions[1]] = player
         return new_board
 
-    def _reconstruct_board_at_turn(self, move_history, turn_index):
-        """Reconstruit l'état du plateau à un tour donné en rejouant l'historique."""
-        board = [None] * 25
-        for i in range(turn_index):
-            entry = move_history[i]
-            board = self._simulate_move(board, entry['move'], entry['player'])
-        return board
+    def _classify_move(self, board_before, move, player, win_patterns):
+        """
+        Classe un coup comme 'offensive', 'defensive' ou 'neutral' d'après le
+        plateau juste avant ce coup.
+        """
+        opponent = OPPONENT[player]
+        target_pos = move[1] if move[0] == 'drop' else move[2]
+
+        move_category = 'neutral'
+        for pattern in win_patterns:
+            if target_pos in pattern:
+                my_pieces_before = sum(1 for pos in pattern if board_before[pos] == player)
+                opp_pieces_before = sum(1 for pos in pattern if board_before[pos] == opponent)
+
+                if opp_pieces_before >= 2 and my_pieces_before == 0:
+                    return 'defensive'  # C'est un blocage, la plus haute priorité
+
+                if my_pieces_before >= 1:
+                    move_category = 'offensive'
+        return move_category
+
+    def record_move(self, move, player):
+        """
+        Enregistre un coup réellement joué et met à jour les compteurs de style.
+
+        Le coup est classé une seule fois, sur le plateau suivi par l'analyseur,
+        ce qui évite de rejouer tout l'historique à chaque analyse.
+        """
+        category = self._classify_move(self.board, move, player, self.win_patterns)
+        self.styles[player][category] += 1
+        self.move_count += 1
+        self.board = self._simulate_move(self.board, move, player)
+
+    def get_player_styles(self):
+        """
+        Retourne le style de jeu de chaque joueur d'après les coups enregistrés
+        par record_move, sans recalcul. Même format que analyze_player_styles.
+        """
+        if self.move_count < 2:
+            return None  # Pas assez de données
+        return self._style_ratios(self.styles)
 
     def analyze_player_styles(self, move_history, win_patterns):
         """
@@ -35,43 +83,26 @@ class HistoryAnalyzer:
         de CHAQUE joueur.
         """
         styles = {
-            'black': {'offensive': 0, 'defensive': 0, 'neutral': 0},
-            'red': {'offensive': 0, 'defensive': 0, 'neutral': 0}
+            BLACK: {'offensive': 0, 'defensive': 0, 'neutral': 0},
+            RED: {'offensive': 0, 'defensive': 0, 'neutral': 0}
         }
 
         if len(move_history) < 2:
             return None  # Pas assez de données
 
-        for i, entry in enumerate(move_history):
+        board = bytearray(25)
+        for entry in move_history:
             player = entry['player']
             move = entry['move']
-            opponent = 'red' if player == 'black' else 'black'
-            
-            board_before = self._reconstruct_board_at_turn(move_history, i)
-            
-            target_pos = move[1] if move[0] == 'drop' else move[2]
-            
-            move_category = 'neutral'
-            is_defensive = False
-            for pattern in win_patterns:
-                if target_pos in pattern:
-                    my_pieces_before = sum(1 for pos in pattern if board_before[pos] == player)
-                    opp_pieces_before = sum(1 for pos in pattern if board_before[pos] == opponent)
-
-                    if opp_pieces_before >= 2 and my_pieces_before == 0:
-                        is_defensive = True
-                        break  # C'est un blocage, la plus haute priorité
-
-                    if my_pieces_before >= 1:
-                        move_category = 'offensive'
-            
-            if is_defensive:
-                styles[player]['defensive'] += 1
-            else:
-                styles[player][move_category] += 1
-        
+            styles[player][self._classify_move(board, move, player, win_patterns)] += 1
+            board = self._simulate_move(board, move, player)
+
+        return self._style_ratios(styles)
+
+    def _style_ratios(self, styles):
+        """Convertit des compteurs de style en ratios arrondis, par joueur."""
         final_analysis = {}
-        for player in ['black', 'red']:
+        for player in (BLACK, RED):
             total_moves = sum(styles[player].values())
             if total_moves > 0:
                 final_analysis[player] = {
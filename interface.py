@@ -1,6 +1,15 @@
 import tkinter as tk
 from game_engine import TeekoGame
 from ai_template import TeekoAI
+from mcts_ai import MCTSAI
+from ai_worker import AIWorker, PonderWorker
+from bitboard import BLACK, BOARD_SIZE, COLOR_NAMES, RED
+
+# Seul l'affichage manipule les noms des couleurs ; le moteur et l'IA
+# identifient les joueurs par BLACK et RED.
+PLAYER_LABELS = {BLACK: "Noir", RED: "Rouge"}
+
+MCTS_TIME_BUDGET = 1.5  # Temps de réflexion par coup du niveau « MCTS », en secondes
 
 class App(tk.Tk):
     """
@@ -29,6 +38,7 @@ class App(tk.Tk):
             frame.grid(row=0, column=0, sticky="nsew")
         
         self.show("StartScreen")
+        self.protocol("WM_DELETE_WINDOW", self.close)
 
         # État partagé entre les différents écrans de l'application
         self.game = None
@@ -45,6 +55,14 @@ class App(tk.Tk):
         """
         self.screens[name].tkraise()
 
+    def close(self):
+        """
+        Ferme l'application après avoir annulé une éventuelle recherche de l'IA
+        en cours, pour ne pas laisser de calcul orphelin.
+        """
+        self.screens["GameScreen"].cancel_ai_search()
+        self.destroy()
+
     def new_game(self, options):
         """
         Configure et lance une nouvelle partie en fonction des options choisies.
@@ -61,22 +79,15 @@ class App(tk.Tk):
         self.ai_black = None
         self.ai_red = None
         
-        level_to_depth = {
-            "Débutant": 1, "Normal": 2, "Pro": 4, "Expert": 5
-        }
-        
         mode = options["mode"]
-        who_starts_color = "black" if options["who_starts"] == "Noir" else "red"
+        who_starts_color = BLACK if options["who_starts"] == "Noir" else RED
         
         # Instanciation des IA en fonction du mode de jeu
         if mode == "Humain vs IA":
-            depth = level_to_depth[options["red_level"]]
-            self.ai_red = TeekoAI(self.game, "red", depth)
+            self.ai_red = self.create_ai(RED, options["red_level"])
         elif mode == "IA vs IA":
-            depth_black = level_to_depth[options["black_level"]]
-            depth_red = level_to_depth[options["red_level"]]
-            self.ai_black = TeekoAI(self.game, "black", depth_black)
-            self.ai_red = TeekoAI(self.game, "red", depth_red)
+            self.ai_black = self.create_ai(BLACK, options["black_level"])
+            self.ai_red = self.create_ai(RED, options["red_level"])
 
         # Ajustement du joueur de départ si nécessaire
         if who_starts_color != self.game.get_current_player():
@@ -88,6 +99,25 @@ class App(tk.Tk):
         self.show("GameScreen")
         game_screen.kickoff_if_ai()
 
+    def create_ai(self, who, level):
+        """
+        Crée l'IA correspondant à un niveau du menu : TeekoAI à la profondeur
+        du niveau, ou le moteur Monte-Carlo pour « MCTS ».
+
+        :param who: La couleur jouée par l'IA (BLACK ou RED).
+        :type who: int
+        :param level: Le niveau choisi dans le menu.
+        :type level: str
+        :return: L'IA, qui expose choose_best_move et make_move.
+        :rtype: TeekoAI or MCTSAI
+        """
+        if level == "MCTS":
+            return MCTSAI(self.game, who, time_budget=MCTS_TIME_BUDGET)
+        level_to_depth = {
+            "Débutant": 1, "Normal": 2, "Pro": 4, "Expert": 5
+        }
+        return TeekoAI(self.game, who, level_to_depth[level])
+
 class StartScreen(tk.Frame):
     """
     Écran d'accueil et de configuration de la partie.
@@ -131,13 +161,18 @@ class StartScreen(tk.Frame):
         
         self.red_frame = tk.Frame(self, bg = "#FFEEE0")
         tk.Label(self.red_frame, text="Niveau IA rouge", bg="#FFEEE0", font=("Helvetica", 11, "bold")).pack(side="left")
-        red_menu = tk.OptionMenu(self.red_frame, self.red_level, "Débutant", "Normal", "Pro", "Expert")
+        red_menu = tk.OptionMenu(self.red_frame, self.red_level, "Débutant", "Normal", "Pro", "MCTS", "Expert")
         self.configure_option_menu(red_menu)
         red_menu.pack(side="left")
+
+        # Option de réflexion anticipée (Humain vs IA uniquement)
+        self.ponder = tk.BooleanVar(value=False)
+        self.ponder_check = tk.Checkbutton(self, text="L'IA réfléchit pendant mon tour", variable=self.ponder,
+                                           bg="#FFEEE0", activebackground="#FFEEE0", font=("Helvetica", 10))
         
         self.black_frame = tk.Frame(self, bg = "#FFEEE0")
         tk.Label(self.black_frame, text="Niveau IA noire", bg="#FFEEE0", font=("Helvetica", 11, "bold")).pack(side="left")
-        black_menu = tk.OptionMenu(self.black_frame, self.black_level, "Débutant", "Normal", "Pro", "Expert")
+        black_menu = tk.OptionMenu(self.black_frame, self.black_level, "Débutant", "Normal", "Pro", "MCTS", "Expert")
         self.configure_option_menu(black_menu)
         black_menu.pack(side="left")
 
@@ -178,10 +213,12 @@ class StartScreen(tk.Frame):
         """
         self.red_frame.pack_forget()
         self.black_frame.pack_forget()
+        self.ponder_check.pack_forget()
         
         mode = self.mode.get()
         if mode == "Humain vs IA":
             self.red_frame.pack(pady=8, before=self.launch_btn)
+            self.ponder_check.pack(pady=4, before=self.launch_btn)
         elif mode == "IA vs IA":
             self.red_frame.pack(pady=8, before=self.launch_btn)
             self.black_frame.pack(pady=8, before=self.launch_btn)
@@ -196,6 +233,7 @@ class StartScreen(tk.Frame):
             "who_starts": self.who_starts.get(),
             "red_level": self.red_level.get(),
             "black_level": self.black_level.get(),
+            "ponder": self.ponder.get(),
         }
         self.app.new_game(options)
 
@@ -222,6 +260,8 @@ class GameScreen(tk.Frame):
         self.options = None
         self.selected_from = None
         self.aborted = False
+        self.worker = None  # Recherche de l'IA en cours dans un thread de travail
+        self.ponder_worker = None  # Réflexion anticipée de l'IA pendant le tour humain
 
         tk.Frame(self, height=20, bg="#FFEEE0").pack()
         self.status = tk.Label(self, text="Prêt", font=("Helvetica", 14, "bold"), bg="#FFEEE0")
@@ -261,6 +301,7 @@ class GameScreen(tk.Frame):
         :param ai_red: L'instance de l'IA pour le joueur rouge, ou None.
         :param options: Le dictionnaire d'options de la partie.
         """
+        self.cancel_ai_search()
         self.game = game
         self.ai_black = ai_black
         self.ai_red = ai_red
@@ -286,8 +327,29 @@ class GameScreen(tk.Frame):
         if self.aborted: return
         if self.game and not self.game.is_game_over():
             cur = self.game.get_current_player()
-            if (cur == "black" and self.ai_black) or (cur == "red" and self.ai_red):
+            if (cur == BLACK and self.ai_black) or (cur == RED and self.ai_red):
                 self.after(400, self.ai_turn)
+            else:
+                self.start_pondering()
+
+    def start_pondering(self):
+        """
+        Lance la réflexion anticipée de l'IA pendant le tour du joueur humain,
+        si l'option a été choisie au lancement de la partie.
+        """
+        if self.ponder_worker is not None or not (self.options and self.options.get("ponder")): return
+        ai = self.ai_red or self.ai_black
+        if ai is None or self.game.is_game_over(): return
+        self.ponder_worker = PonderWorker(ai)
+        self.ponder_worker.start()
+
+    def stop_pondering(self):
+        """
+        Arrête la réflexion anticipée en cours, s'il y en a une.
+        """
+        if self.ponder_worker is not None:
+            self.ponder_worker.stop()
+            self.ponder_worker = None
 
     def on_click(self, r, c):
         """
@@ -304,13 +366,13 @@ class GameScreen(tk.Frame):
         if self.game is None or self.game.is_game_over(): return
         
         cur = self.game.get_current_player()
-        is_ai_turn = (cur == "black" and self.ai_black) or (cur == "red" and self.ai_red)
+        is_ai_turn = (cur == BLACK and self.ai_black) or (cur == RED and self.ai_red)
         if is_ai_turn: return
 
         pos = r * 5 + c
         if self.game.get_phase() == "drop":
             if self.game.drop_piece(pos):
-                print(f"Humain ({cur}) a joué: ('drop', {pos + 1})")
+                print(f"Humain ({COLOR_NAMES[cur]}) a joué: ('drop', {pos + 1})")
                 self.post_move_flow()
         else:
             if self.selected_from is None:
@@ -319,7 +381,7 @@ class GameScreen(tk.Frame):
                     self.status.config(text="Choisis la case d'arrivée")
             else:
                 if self.game.move_piece(self.selected_from, pos):
-                    print(f"Humain ({cur}) a joué: ('move', {self.selected_from + 1}, {pos + 1})")
+                    print(f"Humain ({COLOR_NAMES[cur]}) a joué: ('move', {self.selected_from + 1}, {pos + 1})")
                     self.selected_from = None
                     self.post_move_flow()
                 else:
@@ -334,38 +396,67 @@ class GameScreen(tk.Frame):
         """
         self.move_count += 1
         if self.aborted: return
+        self.stop_pondering()
         
         if self.game.get_winner():
             self.finish()
         else:
             cur = self.game.get_current_player()
-            if (cur == "black" and self.ai_black) or (cur == "red" and self.ai_red):
+            if (cur == BLACK and self.ai_black) or (cur == RED and self.ai_red):
                 self.after(400, self.ai_turn)
 
     def ai_turn(self):
         """
-        Exécute le tour de jeu pour une IA. 
+        Lance le tour de jeu d'une IA. 
         
-        Identifie l'IA active, lui demande de jouer son coup, met à jour l'interface
-        et gère la suite de la partie.
+        Identifie l'IA active et démarre sa recherche dans un thread de travail,
+        afin que la fenêtre reste réactive pendant la réflexion. Le coup est
+        récupéré par poll_ai_turn.
         """
         if self.aborted or self.game is None or self.game.is_game_over(): return
+        if self.worker is not None: return
         
         cur = self.game.get_current_player()
-        ai = self.ai_red if cur == "red" else self.ai_black
+        ai = self.ai_red if cur == RED else self.ai_black
         
         if ai:
-            ai.make_move()
-            self.move_count += 1
-            self.refresh()
-            if self.game.get_winner():
-                self.finish()
-            elif not self.aborted:
-                next_player = self.game.get_current_player()
-                is_next_player_ai = (next_player == "black" and self.ai_black) or \
-                                    (next_player == "red" and self.ai_red)
-                if is_next_player_ai:
-                    self.after(400, self.ai_turn)
+            self.worker = AIWorker(ai)
+            self.worker.start()
+            self.after(16, self.poll_ai_turn, self.worker)
+
+    def poll_ai_turn(self, worker):
+        """
+        Vérifie, depuis la boucle d'événements, si la recherche de l'IA est
+        terminée. Si c'est le cas, joue le coup trouvé, met à jour l'interface
+        et gère la suite de la partie.
+
+        :param worker: La recherche suivie par cet appel.
+        :type worker: AIWorker
+        """
+        if worker is not self.worker: return # Recherche annulée ou remplacée
+        if not worker.is_done():
+            self.after(16, self.poll_ai_turn, worker)
+            return
+
+        self.worker = None
+        if worker.cancelled or self.aborted or self.game is None: return
+        if worker.error is not None:
+            print(f"Erreur de l'IA : {worker.error}")
+            return
+
+        worker.ai.play_move(worker.move)
+        self.move_count += 1
+        self.refresh()
+        if self.game.get_winner():
+            self.finish()
+        elif not self.aborted:
+            next_player = self.game.get_current_player()
+            is_next_player_ai = (next_player == BLACK and self.ai_black) or \
+                                (next_player == RED and self.ai_red)
+            if is_next_player_ai:
+                self.after(400, self.ai_turn)
+            else:
+                self.start_pondering()
 
     def finish(self):
         """
@@ -374,7 +465,7 @@ class GameScreen(tk.Frame):
         Affiche le gagnant et propose les options "Rejouer" ou "Quitter".
         """
         winner = self.game.get_winner()
-        nom = {"black": "Noir", "red": "Rouge"}.get(winner, str(winner))
+        nom = PLAYER_LABELS.get(winner, str(winner))
         self.status.config(text=f"Partie terminée ! Gagnant : {nom}")
         
         self.print_winner_info(winner)
@@ -389,7 +480,7 @@ class GameScreen(tk.Frame):
                 font=("Helvetica", 12, "bold"), width=8,
                 bg="#3E2D2D", fg="white", activebackground="#5A4444").pack(side="left", padx=10)
         
-        tk.Button(button_frame, text="Quitter", command=self.app.destroy,
+        tk.Button(button_frame, text="Quitter", command=self.app.close,
                 font=("Helvetica", 12, "bold"), width=8,
                 bg="#3E2D2D", fg="white", activebackground="#5A4444").pack(side="left", padx=10)
         
@@ -399,11 +490,11 @@ class GameScreen(tk.Frame):
         """
         Affiche des informations détaillées sur la victoire dans la console.
 
-        :param winner: La couleur du joueur gagnant.
-        :type winner: str
+        :param winner: Le joueur gagnant (BLACK ou RED).
+        :type winner: int
         """
         print("=" * 50)
-        print(f"PARTIE TERMINÉE - GAGNANT : {winner.upper()}")
+        print(f"PARTIE TERMINÉE - GAGNANT : {COLOR_NAMES[winner].upper()}")
         print("=" * 50)
         
         board = self.game.get_board()
@@ -414,7 +505,7 @@ class GameScreen(tk.Frame):
                 break
         
         if winning_pattern:
-            print(f"Motif gagnant ({winner}) :")
+            print(f"Motif gagnant ({COLOR_NAMES[winner]}) :")
             for pos in winning_pattern:
                 row, col = divmod(pos, 5)
                 print(f"  - Position {pos + 1} → Ligne {row + 1}, Colonne {col + 1}")
@@ -422,10 +513,24 @@ class GameScreen(tk.Frame):
             print("Erreur : Impossible de trouver le motif gagnant")
         print("=" * 50)
 
+    def cancel_ai_search(self):
+        """
+        Annule la recherche de l'IA en cours et sa réflexion anticipée, s'il
+        y en a.
+
+        Le thread de travail s'arrête de lui-même au prochain point de contrôle
+        de la recherche ; son résultat éventuel est ignoré.
+        """
+        self.stop_pondering()
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+
     def replay(self):
         """
         Retourne à l'écran d'accueil pour une nouvelle partie.
         """
+        self.cancel_ai_search()
         self.app.show("StartScreen")
 
     def abort(self):
@@ -433,6 +538,7 @@ class GameScreen(tk.Frame):
         Interrompt la partie en cours et retourne à l'écran d'accueil.
         """
         print("Partie abandonnée")
+        self.cancel_ai_search()
         self.aborted = True
         self.game = self.ai_black = self.ai_red = self.options = None
         self.app.show("StartScreen")
@@ -442,20 +548,20 @@ class GameScreen(tk.Frame):
         Met à jour l'intégralité de l'interface graphique (plateau, labels)
         pour refléter l'état actuel du jeu.
         """
-        board = self.game.get_board() if self.game else [None]*25
+        board = self.game.get_board() if self.game else bytearray(BOARD_SIZE)
         for i in range(5):
             for j in range(5):
                 piece = board[i*5 + j]
-                color = "black" if piece == "black" else "red"
+                color = COLOR_NAMES.get(piece, "red")
                 text = "⬤" if piece else ""
                 self.buttons[i][j].config(text=text, fg=color, bg="#5A4444")
 
         if self.game and not self.game.is_game_over():
             cur = self.game.get_current_player()
-            if (cur == "black" and self.ai_black) or (cur == "red" and self.ai_red):
-                self.status.config(text=f"Tour de l'IA ({cur})…")
+            if (cur == BLACK and self.ai_black) or (cur == RED and self.ai_red):
+                self.status.config(text=f"Tour de l'IA ({COLOR_NAMES[cur]})…")
             else:
-                self.status.config(text=f"À toi ({cur}) — Phase {self.game.get_phase()}")
+                self.status.config(text=f"À toi ({COLOR_NAMES[cur]}) — Phase {self.game.get_phase()}")
         
         if hasattr(self, 'move_count_label'):
             self.move_count_label.config(text=f"Coups joués : {self.move_count if hasattr(self, 'move_count') else 0}")
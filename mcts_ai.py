@@ -0,0 +1,536 @@
+# mcts_ai.py
+"""
+Recherche arborescente Monte-Carlo (MCTS), moteur alternatif à TeekoAI.
+
+Au lieu d'explorer l'arbre à profondeur fixe et de noter les feuilles avec
+evaluate_board, MCTSAI fait croître un arbre de façon sélective. Chaque
+itération :
+1. descend depuis la racine en choisissant à chaque nœud le fils de
+   meilleure borne UCT (taux de victoire + bonus d'exploration) ;
+2. ajoute au nœud atteint un fils pour l'un de ses coups non explorés ;
+3. estime la position de ce fils par une courte partie (playout), suivie
+   de l'évaluation de la position atteinte ;
+4. remonte le résultat le long du chemin.
+Le coup joué est le fils le plus visité de la racine. La force croît avec le
+nombre d'itérations, donc avec le temps de calcul, y compris dans les longues
+phases de mouvement où la recherche à profondeur fixe plafonne.
+
+Les playouts sont joués sur les seuls bitboards : un coup gagnant est joué
+s'il existe, sinon une victoire adverse immédiate est bloquée si possible,
+sinon le coup est tiré au hasard. Après PLAYOUT_DEPTH demi-coups, la
+position est notée par les scores des configurations gagnantes de TeekoAI
+(voir search_state.pattern_tables), ramenés à une probabilité de gain par une
+sigmoïde ; un joueur au trait qui peut gagner a gagné, et une partie dont le
+joueur au trait ne peut plus jouer est nulle. Les playouts de Teeko jusqu'au
+bout, presque toujours nuls ou gagnés par hasard, renseignaient mal l'arbre.
+
+À la racine, un gain forcé par menaces (voir threat_search.py) est joué sans
+recherche, et les coups qui laissent à l'adversaire une victoire immédiate ou
+un gain forcé par menaces sont écartés de l'arbre, s'il en reste d'autres.
+
+Les feuilles sont choisies par lots de PLAYOUT_BATCH (une perte virtuelle
+détourne les descentes suivantes des chemins déjà retenus), puis leurs
+playouts sont joués d'un bloc : dans le processus courant, ou répartis sur
+un groupe de processus si workers > 1.
+
+L'arbre est conservé d'un coup à l'autre : la recherche suivante repart du
+nœud de la position atteinte (reconnu par son hachage de Zobrist) s'il a
+déjà été exploré, y compris pendant la réflexion anticipée (ponder).
+
+MCTSAI offre la même interface que TeekoAI (choose_best_move, make_move,
+play_move, record_opponent_move, ponder, cancel, close) : l'interface et
+tournament.py (niveau « mcts ») peuvent le choisir.
+"""
+import math
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ai_template import SearchCancelled
+from bitboard import (BLACK, CODE_COUNTS, COLOR_NAMES, NEIGHBOR_MASKS, OPPONENT, RED, SQUARE_BITS, WIN_MASKS,
+                      generate_moves, iter_bits, pattern_codes, wins_through)
+from search_state import pattern_tables
+from threat_search import ThreatSearch
+
+EXPLORATION = 0.5  # Constante d'exploration de la formule UCT
+PLAYOUT_DEPTH = 8  # Demi-coups d'un playout avant d'évaluer la position atteinte
+EVAL_SCALE = 150.0  # Avance (en points d'évaluation) qui vaut 73 % de chances de gain
+PLAYOUT_BATCH = 16  # Feuilles choisies avant de jouer leurs playouts (par processus)
+DEFAULT_ITERATIONS = 5000  # Itérations par coup sans budget de temps ni de nœuds
+PONDER_ITERATIONS = 200000  # Itérations au plus pendant la réflexion anticipée
+
+
+def _pattern_values():
+    """
+    Construit la table des scores des configurations gagnantes, indexée par
+    le code en base 3 de leur contenu vu des noirs, à partir des scores de
+    TeekoAI (voir pattern_tables) rendus antisymétriques : échanger les
+    couleurs change le signe du score.
+    """
+    values = pattern_tables(1.0)[0]
+    by_counts = {counts: values[code] for code, counts in enumerate(CODE_COUNTS)}
+    return [(by_counts[(black, red)] - by_counts[(red, black)]) / 2 for black, red in CODE_COUNTS]
+
+
+PATTERN_VALUES = _pattern_values()
+
+
+def _threats(mine, theirs):
+    """
+    Liste les configurations de 3 pions du joueur sans pion adverse.
+
+    :return: Les couples (bit de la case libre, masque de la configuration).
+    :rtype: list[tuple[int, int]]
+    """
+    if mine.bit_count() < 3:
+        return []
+    return [(mask & ~mine, mask) for mask in WIN_MASKS if not theirs & mask and (mine & mask).bit_count() == 3]
+
+
+def _winning_move(mine, theirs, rng=random):
+    """
+    Cherche un coup gagnant immédiat pour le joueur au trait.
+
+    :param mine: Le bitboard du joueur au trait.
+    :type mine: int
+    :param theirs: Le bitboard de son adversaire.
+    :type theirs: int
+    :return: Le coup, ou None s'il n'y en a pas.
+    :rtype: tuple or None
+    """
+    drop = (mine | theirs).bit_count() < 8
+    for hole, mask in _threats(mine, theirs):
+        square = hole.bit_length() - 1
+        if drop:
+            return ('drop', square)
+        sources = NEIGHBOR_MASKS[square] & mine & ~mask
+        if sources:
+            return ('move', rng.choice(list(iter_bits(sources))), square)
+    return None
+
+
+def _playout_move(mine, theirs, rng):
+    """
+    Choisit le coup d'un playout : victoire immédiate, sinon blocage d'une
+    victoire adverse immédiate, sinon coup au hasard.
+
+    :param mine: Le bitboard du joueur au trait.
+    :type mine: int
+    :param theirs: Le bitboard de son adversaire.
+    :type theirs: int
+    :param rng: Le générateur aléatoire.
+    :type rng: random.Random
+    :return: Le coup, ou None si le joueur ne peut pas jouer.
+    :rtype: tuple or None
+    """
+    move = _winning_move(mine, theirs, rng)
+    if move is not None:
+        return move
+    drop = (mine | theirs).bit_count() < 8
+    for hole, mask in _threats(theirs, mine):
+        square = hole.bit_length() - 1
+        if drop:
+            return ('drop', square)
+        if NEIGHBOR_MASKS[square] & theirs & ~mask and NEIGHBOR_MASKS[square] & mine:
+            return ('move', rng.choice(list(iter_bits(NEIGHBOR_MASKS[square] & mine))), square)
+    moves = generate_moves(mine, theirs)
+    return rng.choice(moves) if moves else None
+
+
+def evaluate(black, red, to_move):
+    """
+    Estime les chances de gain des noirs dans une position sans gagnant.
+
+    Le joueur au trait gagne s'il peut compléter une configuration ; sinon,
+    le score des configurations gagnantes (voir PATTERN_VALUES) est ramené
+    entre 0 et 1 par une sigmoïde.
+
+    :param black: Le bitboard des pions noirs.
+    :type black: int
+    :param red: Le bitboard des pions rouges.
+    :type red: int
+    :param to_move: Le joueur au trait (BLACK ou RED).
+    :type to_move: int
+    :return: Les chances de gain des noirs, entre 0 et 1.
+    :rtype: float
+    """
+    mine, theirs = (black, red) if to_move == BLACK else (red, black)
+    if _winning_move(mine, theirs) is not None:
+        return 1.0 if to_move == BLACK else 0.0
+    score = sum(PATTERN_VALUES[code] for code in pattern_codes(black, red))
+    return 1.0 / (1.0 + math.exp(-score / EVAL_SCALE))
+
+
+def playout(black, red, to_move, rng=random):
+    """
+    Joue au plus PLAYOUT_DEPTH demi-coups à partir d'une position (voir
+    _playout_move), puis évalue la position atteinte (voir evaluate).
+
+    :param black: Le bitboard des pions noirs.
+    :type black: int
+    :param red: Le bitboard des pions rouges.
+    :type red: int
+    :param to_move: Le joueur au trait (BLACK ou RED).
+    :type to_move: int
+    :param rng: Le générateur aléatoire.
+    :type rng: random.Random
+    :return: Le résultat pour les noirs : 1 s'ils gagnent, 0 s'ils perdent,
+             0,5 si la partie est bloquée, et leurs chances estimées sinon.
+    :rtype: float
+    """
+    bits = [0, black, red]
+    player = to_move
+    for _ in range(PLAYOUT_DEPTH):
+        mine = bits[player]
+        move = _playout_move(mine, bits[OPPONENT[player]], rng)
+        if move is None:
+            return 0.5
+        target = move[-1]
+        mine |= SQUARE_BITS[target]
+        if move[0] == 'move':
+            mine ^= SQUARE_BITS[move[1]]
+        bits[player] = mine
+        if wins_through(mine, target):
+            return 1.0 if player == BLACK else 0.0
+        player = OPPONENT[player]
+    return evaluate(bits[BLACK], bits[RED], player)
+
+
+def _playout_batch(positions, seed):
+    """
+    Joue les playouts d'un lot de positions dans un processus de travail.
+
+    :param positions: Les triplets (noirs, rouges, joueur au trait).
+    :type positions: list[tuple[int, int, int]]
+    :param seed: La graine du générateur aléatoire du lot.
+    :type seed: int
+    :return: Le résultat de chaque playout pour les noirs (voir playout).
+    :rtype: list[float]
+    """
+    rng = random.Random(seed)
+    return [playout(black, red, to_move, rng) for black, red, to_move in positions]
+
+
+class _Node:
+    """
+    Nœud de l'arbre : une position, atteinte par un coup de player.
+    """
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried', 'visits', 'wins', 'hash', 'winner')
+
+    def __init__(self, move, player, parent, state):
+        """
+        :param move: Le coup qui mène à ce nœud (None pour la racine).
+        :param player: Le joueur qui a joué ce coup.
+        :param parent: Le nœud parent (None pour la racine).
+        :param state: La partie, positionnée sur ce nœud.
+        :type state: TeekoGame
+        """
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = []
+        self.winner = state.winner
+        self.untried = [] if state.winner is not None else generate_moves(
+            state.bitboards[state.current_player], state.bitboards[OPPONENT[state.current_player]])
+        self.visits = 0
+        self.wins = 0.0  # Résultats cumulés, du point de vue de player (entre 0 et 1 par visite)
+        self.hash = state.hash
+
+
+class MCTSAI:
+    """
+    Joueur de Teeko fondé sur la recherche arborescente Monte-Carlo.
+    """
+    def __init__(self, game_engine, who, time_budget=None, node_budget=None, workers=1, exploration=EXPLORATION):
+        """
+        Initialise le moteur.
+
+        :param game_engine: Le moteur de jeu de la partie.
+        :type game_engine: TeekoGame
+        :param who: Le joueur que l'IA incarne (BLACK ou RED).
+        :type who: int
+        :param time_budget: Temps de réflexion par coup, en secondes.
+        :type time_budget: float or None
+        :param node_budget: Nombre d'itérations (playouts) par coup. Sans
+                            budget de temps ni de nœuds, DEFAULT_ITERATIONS.
+        :type node_budget: int or None
+        :param workers: Le nombre de processus entre lesquels répartir les
+                        playouts. Avec 1, ils sont joués dans le processus courant.
+        :type workers: int
+        :param exploration: La constante d'exploration de la formule UCT.
+        :type exploration: float
+        """
+        self.game_engine = game_engine
+        self.who_am_i = who
+        self.time_budget = time_budget
+        self.node_budget = node_budget if node_budget is not None or time_budget is not None else DEFAULT_ITERATIONS
+        self.workers = workers
+        self.exploration = exploration
+        self.pool = None  # Processus des playouts, démarrés au premier lot
+        self.root = None  # Racine de l'arbre conservé d'un coup à l'autre
+        self.nodes = 0  # Itérations de la dernière recherche
+        self.last_move = None
+        self.last_opponent_move = None
+        self.cancel_event = threading.Event()  # Positionné par cancel() depuis un autre thread
+
+    def record_opponent_move(self, move):
+        """
+        Enregistre le dernier coup de l'adversaire. L'arbre n'en a pas besoin :
+        la position atteinte est retrouvée par son hachage.
+
+        :param move: Le coup joué par l'adversaire.
+        """
+        if move is not None:
+            self.last_opponent_move = move
+
+    def _state(self, game=None):
+        """Copie la partie, en donnant le trait à l'IA si aucune partie n'est fournie."""
+        state = (game or self.game_engine).copy()
+        if game is None and state.current_player != self.who_am_i:
+            state.switch_player()
+        return state
+
+    def _set_root(self, state):
+        """
+        Place la racine de l'arbre sur une position : un nœud existant à un ou
+        deux demi-coups de l'ancienne racine est réutilisé avec son sous-arbre.
+        """
+        root = self.root
+        if root is not None and root.hash != state.hash:
+            candidates = [child for child in root.children if child.hash == state.hash]
+            if not candidates:
+                candidates = [grandchild for child in root.children for grandchild in child.children
+                              if grandchild.hash == state.hash]
+            root = candidates[0] if candidates else None
+        if root is None or root.hash != state.hash:
+            root = _Node(None, OPPONENT[state.current_player], None, state)
+        root.parent = None  # Le reste de l'ancien arbre peut être libéré
+        self.root = root
+
+    def _uct_child(self, node):
+        """Choisit le fils de meilleure borne UCT."""
+        scale = self.exploration * math.sqrt(math.log(node.visits))
+        return max(node.children, key=lambda child: child.wins / child.visits + scale / math.sqrt(child.visits))
+
+    def _select(self, state):
+        """
+        Descend de la racine jusqu'à une feuille, qui est développée si elle
+        a encore des coups non explorés. Chaque nœud du chemin reçoit une
+        visite d'avance (perte virtuelle), complétée par _backpropagate.
+
+        :param state: La partie, positionnée sur la racine ; elle y est remise en sortie.
+        :type state: TeekoGame
+        :return: Le chemin, et la position de la feuille (None si elle est terminale).
+        :rtype: tuple[list, tuple or None]
+        """
+        node = self.root
+        node.visits += 1
+        path = [node]
+        while node.winner is None and not node.untried and node.children:
+            node = self._uct_child(node)
+            state.push(node.move)
+            node.visits += 1
+            path.append(node)
+        if node.winner is None and node.untried:
+            move = node.untried.pop(random.randrange(len(node.untried)))
+            player = state.current_player
+            state.push(move)
+            child = _Node(move, player, node, state)
+            node.children.append(child)
+            child.visits += 1
+            path.append(child)
+            node = child
+        position = None if node.winner is not None else (state.bitboards[BLACK], state.bitboards[RED], state.current_player)
+        for _ in range(len(path) - 1):
+            state.pop()
+        return path, position
+
+    def _backpropagate(self, path, value):
+        """Remonte le résultat d'un playout pour les noirs (voir playout) le long d'un chemin."""
+        for node in path:
+            node.wins += value if node.player == BLACK else 1.0 - value
+
+    def _playouts(self, positions):
+        """Joue les playouts d'un lot, dans le processus courant ou répartis sur le groupe de processus."""
+        if self.workers <= 1:
+            return [playout(black, red, to_move) for black, red, to_move in positions]
+        if self.pool is None:
+            # « spawn » plutôt que « fork », comme pour la recherche racine (voir parallel_search.py)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        size = math.ceil(len(positions) / self.workers)
+        chunks = [positions[i:i + size] for i in range(0, len(positions), size)]
+        futures = [self.pool.submit(_playout_batch, chunk, random.getrandbits(32)) for chunk in chunks]
+        return [result for future in futures for result in future.result()]
+
+    def search(self, state, iterations=None, deadline=None, root_moves=None):
+        """
+        Fait croître l'arbre à partir de la position donnée.
+
+        :param state: La partie, positionnée sur la racine.
+        :type state: TeekoGame
+        :param iterations: Le nombre maximal d'itérations.
+        :type iterations: int or None
+        :param deadline: L'instant (time.perf_counter) où s'arrêter.
+        :type deadline: float or None
+        :param root_moves: Si fournis, les seuls coups racine à explorer.
+        :type root_moves: list or None
+        :raises SearchCancelled: Si la recherche a été annulée.
+        """
+        self._set_root(state)
+        if root_moves is not None:
+            allowed = set(root_moves)
+            self.root.untried = [move for move in self.root.untried if move in allowed]
+            self.root.children = [child for child in self.root.children if child.move in allowed]
+        self.nodes = 0
+        batch = PLAYOUT_BATCH * max(1, self.workers)
+        while (iterations is None or self.nodes < iterations) and (deadline is None or time.perf_counter() < deadline):
+            if self.cancel_event.is_set():
+                raise SearchCancelled()
+            if self.root.winner is not None or not (self.root.untried or self.root.children):
+                break
+            size = batch if iterations is None else min(batch, iterations - self.nodes)
+            selected = [self._select(state) for _ in range(size)]
+            leaves = [position for path, position in selected if position is not None]
+            results = iter(self._playouts(leaves))
+            for path, position in selected:
+                if position is None:
+                    value = 1.0 if path[-1].winner == BLACK else 0.0  # Nœud terminal
+                else:
+                    value = next(results)
+                self._backpropagate(path, value)
+            self.nodes += size
+
+    def _root_tactics(self, mine, theirs, moves):
+        """
+        Tranche ce qui peut l'être sans l'arbre : un gain forcé par menaces en
+        phase de mouvement (voir threat_search.py) est joué tel quel, et les
+        coups qui laissent à l'adversaire une victoire immédiate ou un gain
+        forcé par menaces sont écartés.
+
+        :param mine: Le bitboard de l'IA, au trait.
+        :type mine: int
+        :param theirs: Le bitboard de son adversaire.
+        :type theirs: int
+        :param moves: Les coups légaux de l'IA.
+        :type moves: list
+        :return: Le premier coup d'un gain forcé (ou None), et les coups qui
+                 ne perdent pas ainsi (tous les coups s'ils perdent tous).
+        :rtype: tuple[tuple or None, list]
+        """
+        solver = ThreatSearch(cancel_event=self.cancel_event)
+        forced_win = solver.find_win(mine, theirs)
+        if forced_win is not None:
+            return forced_win[0], moves
+        safe_moves = []
+        for move in moves:
+            after = (mine | SQUARE_BITS[move[-1]]) ^ (SQUARE_BITS[move[1]] if move[0] == 'move' else 0)
+            if _winning_move(theirs, after) is None and solver.find_win(theirs, after) is None:
+                safe_moves.append(move)
+        return None, safe_moves or moves
+
+    def choose_best_move(self):
+        """
+        Cherche le coup à jouer dans le budget de temps ou d'itérations.
+
+        Un coup gagnant immédiat ou un gain forcé par menaces est joué sans
+        recherche ; sinon le coup retenu est le fils le plus visité de la
+        racine, parmi les coups qui ne perdent pas d'emblée (voir _root_tactics).
+
+        :return: Le meilleur coup trouvé, ou None si l'IA ne peut pas jouer.
+        :rtype: tuple or None
+        :raises SearchCancelled: Si la recherche a été annulée via cancel().
+        """
+        state = self._state()
+        if state.winner is not None:
+            return None
+        mine, theirs = state.bitboards[self.who_am_i], state.bitboards[OPPONENT[self.who_am_i]]
+        moves = generate_moves(mine, theirs)
+        for move in moves:
+            bits = (mine | SQUARE_BITS[move[-1]]) ^ (SQUARE_BITS[move[1]] if move[0] == 'move' else 0)
+            if wins_through(bits, move[-1]):
+                print(f"IA ({COLOR_NAMES[self.who_am_i]}) a trouvé un coup gagnant immédiat : {move}")
+                return move
+        if not moves:
+            return None
+        forced_win, moves = self._root_tactics(mine, theirs, moves)
+        if forced_win is not None:
+            print(f"IA ({COLOR_NAMES[self.who_am_i]}) a trouvé un gain forcé par menaces : {forced_win}")
+            return forced_win
+
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        self.search(state, self.node_budget, deadline, moves)
+        if not self.root.children:
+            # Aucune itération dans le budget (budget nul, machine chargée) : premier coup retenu
+            print(f"IA ({COLOR_NAMES[self.who_am_i]}) MCTS : aucune itération dans le budget, coup par défaut {moves[0]}")
+            return moves[0]
+        best = max(self.root.children, key=lambda child: (child.visits, child.wins / max(child.visits, 1)))
+        rate = best.wins / best.visits if best.visits else 0.0
+        print(f"IA ({COLOR_NAMES[self.who_am_i]}) MCTS : {self.nodes} itérations, "
+              f"{best.visits} visites et {rate:.0%} de réussite pour {best.move}")
+        return best.move
+
+    def ponder(self, state):
+        """
+        Fait croître l'arbre pendant le tour de l'adversaire, jusqu'à
+        annulation (cancel) ou PONDER_ITERATIONS itérations. La recherche
+        suivante repart du sous-arbre du coup effectivement joué.
+
+        :param state: Une copie du moteur de jeu, avec l'adversaire au trait.
+        :type state: TeekoGame
+        """
+        if state.winner is not None or state.current_player == self.who_am_i: return
+        try:
+            self.search(state, PONDER_ITERATIONS)
+        except SearchCancelled:
+            pass
+
+    def get_difficulty_name(self):
+        """
+        :return: Le nom du niveau, pour l'affichage.
+        :rtype: str
+        """
+        return "MCTS"
+
+    def make_move(self):
+        """
+        Cherche et joue le coup de l'IA sur le moteur de jeu.
+
+        :return: Le coup qui a été joué.
+        :rtype: tuple or None
+        """
+        return self.play_move(self.choose_best_move())
+
+    def play_move(self, best_move):
+        """
+        Exécute sur le moteur de jeu un coup choisi par choose_best_move.
+
+        :param best_move: Le coup à jouer.
+        :type best_move: tuple or None
+        :return: Le coup qui a été joué.
+        :rtype: tuple or None
+        """
+        if best_move:
+            self.last_move = best_move
+            if best_move[0] == 'drop': self.game_engine.drop_piece(best_move[1])
+            else: self.game_engine.move_piece(best_move[1], best_move[2])
+
+            display_move = ('drop', best_move[1] + 1) if best_move[0] == 'drop' else ('move', best_move[1] + 1, best_move[2] + 1)
+            print(f"IA ({COLOR_NAMES[self.who_am_i]} - {self.get_difficulty_name()}) a joué: {display_move}")
+        return best_move
+
+    def cancel(self):
+        """
+        Demande l'arrêt de la recherche en cours, depuis n'importe quel thread.
+        La demande reste active jusqu'à ce que cancel_event soit réinitialisé.
+        """
+        self.cancel_event.set()
+
+    def close(self):
+        """
+        Arrête les processus des playouts, s'il y en a.
+        """
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
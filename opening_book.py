@@ -0,0 +1,210 @@
+# opening_book.py
+"""
+Livre d'ouvertures de la phase de placement.
+
+Pendant la partie, adaptive_depth limite la recherche des premiers coups à
+une faible profondeur. Le livre est calculé une fois pour toutes : toutes les
+positions des premiers demi-coups sont énumérées à symétrie près (une seule
+position par classe d'images par les rotations et retournements du plateau),
+puis chacune est recherchée en profondeur, éventuellement sur plusieurs
+processus :
+
+    python opening_book.py --plies 4 --depth 5 --workers 8
+
+Le fichier contient un en-tête (signature et nombre d'entrées) suivi d'un
+enregistrement de 13 octets par position, trié par clé : le hachage canonique
+de la position (voir zobrist.canonical_hash), la case du meilleur coup dans
+le repère du représentant canonique et son score, du point de vue du joueur
+au trait.
+
+Les positions sont énumérées à partir des placements des noirs, qui
+commencent par défaut. Quand les rouges ont commencé, lookup échange les
+couleurs avant de consulter le livre : la case du coup et son score, vus du
+joueur au trait, ne dépendent pas de sa couleur.
+"""
+import argparse
+import contextlib
+import io
+import os
+import struct
+import time
+from multiprocessing import Pool
+
+from bitboard import BLACK, EMPTY, INVERSE_SYMMETRIES, OPPONENT, RED, iter_bits, transform_move
+from game_engine import TeekoGame
+from zobrist import canonical_hash
+
+MAGIC = b'TEEKOBK1'
+HEADER = struct.Struct('<8sI')  # Signature, nombre d'entrées
+RECORD = struct.Struct('<Qbf')  # Hachage canonique, case du coup, score
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'teeko_opening_book.bin')
+
+
+class OpeningBook:
+    """
+    Livre d'ouvertures chargé en mémoire.
+    """
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Charge un livre d'ouvertures produit par build.
+
+        :param path: Le chemin du fichier du livre.
+        :type path: str
+        :raises ValueError: Si le fichier n'est pas un livre d'ouvertures valide.
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, count = HEADER.unpack_from(data) if len(data) >= HEADER.size else (None, 0)
+        if magic != MAGIC or len(data) != HEADER.size + count * RECORD.size:
+            raise ValueError(f"{path} n'est pas un livre d'ouvertures de Teeko valide")
+        self.path = path
+        self.entries = {key: (square, score) for key, square, score in RECORD.iter_unpack(data[HEADER.size:])}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, board, to_move):
+        """
+        Cherche le coup du livre pour une position, quel que soit le joueur
+        qui a commencé la partie.
+
+        :param board: Le plateau (25 cases EMPTY, BLACK ou RED).
+        :type board: bytearray
+        :param to_move: Le joueur qui a le trait (BLACK ou RED).
+        :type to_move: int
+        :return: Le couple (coup, score du point de vue du joueur au trait),
+                 ou None si la position n'est pas dans le livre.
+        :rtype: tuple or None
+        """
+        blacks, reds = board.count(BLACK), board.count(RED)
+        if reds > blacks or reds == blacks and to_move == RED:
+            # Les rouges ont commencé : même position que dans le livre, couleurs échangées
+            board = bytearray(OPPONENT[cell] for cell in board)
+            to_move = OPPONENT[to_move]
+        key, symmetry = canonical_hash(board, to_move)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        square, score = entry
+        return transform_move(('drop', square), INVERSE_SYMMETRIES[symmetry]), score
+
+
+_open_books = {}
+
+
+def open_book(path=DEFAULT_PATH):
+    """
+    Charge un livre d'ouvertures si le fichier existe. Un même livre n'est
+    chargé qu'une fois par processus, quel que soit le nombre d'IA.
+
+    :param path: Le chemin du fichier du livre.
+    :type path: str
+    :return: Le livre, ou None si le fichier n'a pas été généré.
+    :rtype: OpeningBook or None
+    """
+    if path not in _open_books:
+        if not os.path.exists(path):
+            return None
+        _open_books[path] = OpeningBook(path)
+    return _open_books[path]
+
+
+# --- Construction ---
+
+def _replay(black, red):
+    """Reconstitue une partie en phase de placement à partir des bitboards."""
+    game = TeekoGame()
+    blacks, reds = list(iter_bits(black)), list(iter_bits(red))
+    for i in range(len(blacks) + len(reds)):
+        game.drop_piece(blacks[i // 2] if i % 2 == 0 else reds[i // 2])
+    return game
+
+
+def enumerate_positions(plies):
+    """
+    Énumère les positions des premiers demi-coups, à symétrie près.
+
+    :param plies: Le nombre de demi-coups couverts par le livre.
+    :type plies: int
+    :return: Les positions, sous forme de bitboards (noirs, rouges).
+    :rtype: list[tuple[int, int]]
+    """
+    positions, level = [], [(0, 0)]
+    for ply in range(plies):
+        positions.extend(level)
+        to_move = BLACK if ply % 2 == 0 else RED
+        seen, next_level = set(), []
+        for black, red in level:
+            game = _replay(black, red)
+            for square in range(25):
+                if game.board[square] != EMPTY: continue
+                game.board[square] = to_move
+                key = canonical_hash(game.board, OPPONENT[to_move])[0]
+                game.board[square] = EMPTY
+                if key not in seen:
+                    seen.add(key)
+                    bit = 1 << square
+                    next_level.append((black | bit, red) if to_move == BLACK else (black, red | bit))
+        level = next_level
+    return positions
+
+
+def _search_position(args):
+    """
+    Recherche le meilleur coup d'une position du livre.
+
+    :param args: Le triplet (noirs, rouges, profondeur).
+    :type args: tuple[int, int, int]
+    :return: L'enregistrement (hachage canonique, case, score).
+    :rtype: tuple[int, int, float]
+    """
+    from ai_template import TeekoAI  # Import tardif : ai_template importe ce module
+
+    black, red, depth = args
+    game = _replay(black, red)
+    to_move = game.current_player
+    with contextlib.redirect_stdout(io.StringIO()):
+        ai = TeekoAI(game, to_move, "4", opening_book=False)
+    state = ai.search_state()
+    moves = ai.get_all_possible_moves(game.board, to_move)
+    move, score = max(ai.search_root(state, moves, depth), key=lambda x: x[1])
+    key, symmetry = canonical_hash(game.board, to_move)
+    return key, transform_move(move, symmetry)[1], score
+
+
+def build(path=DEFAULT_PATH, plies=4, depth=5, workers=None):
+    """
+    Construit le livre d'ouvertures et l'écrit dans un fichier.
+
+    :param path: Le chemin du fichier à produire.
+    :type path: str
+    :param plies: Le nombre de demi-coups couverts par le livre (8 au plus).
+    :type plies: int
+    :param depth: La profondeur de recherche de chaque position.
+    :type depth: int
+    :param workers: Le nombre de processus de calcul (par défaut, un par cœur).
+    :type workers: int or None
+    """
+    start = time.time()
+    positions = enumerate_positions(min(plies, 8))
+    print(f"{len(positions)} positions à rechercher à la profondeur {depth}")
+    with Pool(workers) as pool:
+        records = pool.map(_search_position, [(black, red, depth) for black, red in positions], chunksize=4)
+    records.sort()
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(records)))
+        for record in records:
+            f.write(RECORD.pack(*record))
+    os.replace(tmp_path, path)
+    print(f"Livre écrit dans {path} en {time.time() - start:.0f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construit le livre d'ouvertures de la phase de placement.")
+    parser.add_argument('--out', default=DEFAULT_PATH, help="fichier à produire")
+    parser.add_argument('--plies', type=int, default=4, help="nombre de demi-coups couverts")
+    parser.add_argument('--depth', type=int, default=5, help="profondeur de recherche par position")
+    parser.add_argument('--workers', type=int, default=None, help="nombre de processus de calcul")
+    args = parser.parse_args()
+    build(args.out, args.plies, args.depth, args.workers)
@@ -0,0 +1,199 @@
+# parallel_search.py
+"""
+Recherche racine répartie sur plusieurs processus.
+
+À cause du GIL, des threads n'accéléreraient pas la recherche : les coups
+racine sont donc confiés à un ProcessPoolExecutor. Chaque processus de
+travail garde sa propre IA, et donc sa propre table de transposition, d'un
+coup et d'une recherche à l'autre. Chaque tâche porte le numéro de la
+recherche de l'IA principale : à chaque nouvelle recherche, l'IA du
+processus appelle à son tour _new_search (génération de la table de
+transposition, coups meurtriers oubliés, historique atténué).
+
+Les processus partagent une borne alpha : dès qu'un coup racine est évalué,
+son score (moins ROOT_ALPHA_MARGIN) sert de borne inférieure aux recherches
+des coups suivants, qui élaguent d'autant plus. Une recherche déjà lancée la
+relit aussi après chaque coup de son premier nœud (le fils du coup racine),
+dont le beta se resserre alors pour les coups restants. Les coups dont le score
+reste à moins de ROOT_ALPHA_MARGIN du meilleur reçoivent un score exact, ce
+qui préserve le bonus de fourchette du mode expert ; les autres ne reçoivent
+qu'un majorant. Les niveaux non adaptatifs tirent leur coup parmi les
+ROOT_EXACT_MOVES meilleurs : la borne suit alors le ROOT_EXACT_MOVES-ième
+meilleur score et reste à -inf tant qu'il n'y en a pas autant.
+"""
+import contextlib
+import io
+import math
+import multiprocessing
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+
+ROOT_ALPHA_MARGIN = 400  # Supérieur au bonus de fourchette de choose_best_move
+ROOT_EXACT_MOVES = 3  # Coups parmi lesquels tirent les niveaux non adaptatifs, qui doivent avoir un score exact
+
+_shared_alpha = None  # Borne alpha commune, dans chaque processus de travail
+_shared_best = None  # Meilleurs scores racine trouvés, par ordre décroissant
+_stop = None  # Drapeau d'arrêt commun
+_worker_ais = {}  # IA de chaque processus de travail, par (joueur, niveau)
+
+
+class _SharedFlag:
+    """Drapeau partagé entre processus, utilisable comme cancel_event."""
+    def __init__(self, value):
+        self.value = value
+
+    def is_set(self):
+        return bool(self.value.value)
+
+
+def _init_worker(shared_alpha, shared_best, stop):
+    """Reçoit les valeurs partagées dans un processus de travail."""
+    global _shared_alpha, _shared_best, _stop
+    _shared_alpha, _shared_best, _stop = shared_alpha, shared_best, stop
+
+
+def _search_root_move(task):
+    """
+    Recherche un coup racine dans un processus de travail.
+
+    :param task: Le contexte de la recherche (voir RootSearchPool.search).
+    :type task: tuple
+    :return: Le couple (score, nombre de nœuds explorés).
+    :rtype: tuple[float, int]
+    """
+    from ai_template import TeekoAI  # Import tardif : ai_template importe ce module
+
+    game, who, level, search_id, aggression_factor, penalty, exact_moves, move, depth, beta, time_left, node_budget = task
+    ai = _worker_ais.get((who, level))
+    if ai is None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            ai = TeekoAI(game, who, str(level), opening_book=False)
+        ai.cancel_event = _SharedFlag(_stop)
+        _worker_ais[(who, level)] = ai
+    ai.game_engine = game
+    if search_id != ai.search_id:
+        ai._new_search()
+        ai.search_id = search_id
+    if aggression_factor != ai.aggression_factor:
+        ai.transposition_table.clear()  # Scores calculés avec l'ancien facteur
+        ai.aggression_factor = aggression_factor
+    ai.nodes = 0
+    ai.deadline = None if time_left is None else time.perf_counter() + time_left
+    ai.node_budget = node_budget
+    ai.budget_active = time_left is not None or node_budget is not None
+
+    state = ai.search_state(game)
+    state.push(move)
+    ai.shared_bound_ply = len(state.undo_stack)
+    ai.shared_bound = lambda: -_shared_alpha.value - penalty
+    # La pénalité de répétition s'applique au score du coup racine, hors de la
+    # table de transposition (voir TeekoAI.search_root)
+    score = -ai.negamax(state, depth - 1, -beta - penalty, -_shared_alpha.value - penalty) - penalty
+    with _shared_alpha.get_lock():
+        best = sorted(_shared_best[:exact_moves] + [score], reverse=True)[:exact_moves]
+        _shared_best[:exact_moves] = best
+        if best[-1] - ROOT_ALPHA_MARGIN > _shared_alpha.value:
+            _shared_alpha.value = best[-1] - ROOT_ALPHA_MARGIN
+    return score, ai.nodes
+
+
+class RootSearchPool:
+    """
+    Groupe de processus évaluant en parallèle les coups racine d'une IA.
+    """
+    def __init__(self, workers):
+        """
+        Démarre les processus de travail.
+
+        :param workers: Le nombre de processus.
+        :type workers: int
+        """
+        # « spawn » plutôt que « fork » : l'IA tourne souvent dans un thread
+        # de l'interface, et forker un processus multi-thread est risqué.
+        context = multiprocessing.get_context('spawn')
+        self.shared_alpha = context.Value('d', -math.inf)
+        self.shared_best = context.Array('d', ROOT_EXACT_MOVES, lock=False)  # Protégé par le verrou de shared_alpha
+        self.stop = context.Value('b', 0)
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                            initargs=(self.shared_alpha, self.shared_best, self.stop))
+
+    def search(self, ai, state, moves, depth, window=None):
+        """
+        Évalue les coups racine en parallèle (voir TeekoAI.search_root).
+
+        Les coups menant à des positions symétriques ne sont recherchés
+        qu'une fois. Le budget restant de l'IA est transmis à chaque tâche ;
+        le budget de nœuds s'applique donc à chaque processus séparément.
+
+        :param ai: L'IA qui mène la recherche.
+        :type ai: TeekoAI
+        :param state: La copie de travail du moteur, positionnée sur la racine.
+        :type state: SearchState
+        :param moves: Les coups racine, dans l'ordre de recherche.
+        :type moves: list
+        :param depth: La profondeur de recherche, coup racine compris.
+        :type depth: int
+        :param window: La fenêtre d'aspiration (alpha, beta), ou None.
+        :type window: tuple[float, float] or None
+        :return: La liste des couples (coup, score), dans l'ordre de moves.
+        :rtype: list
+        :raises SearchTimeout: Si le budget est épuisé dans l'un des processus.
+        :raises SearchCancelled: Si la recherche a été annulée.
+        """
+        from ai_template import REPETITION_PENALTY, SearchCancelled
+
+        keys, representatives = [], {}
+        for move in moves:
+            state.push(move)
+            key = (state.canonical()[0], ai.adaptatif and state.hash in ai.last_moves)
+            state.pop()
+            keys.append(key)
+            representatives.setdefault(key, move)
+
+        time_left = node_budget = None
+        if ai.budget_active:
+            if ai.deadline is not None: time_left = ai.deadline - time.perf_counter()
+            if ai.node_budget is not None: node_budget = ai.node_budget - ai.nodes
+
+        alpha, beta = window or (-math.inf, math.inf)
+        exact_moves = 1 if ai.adaptatif else ROOT_EXACT_MOVES
+        if exact_moves > 1:
+            alpha = -math.inf  # Les coups sous la fenêtre seraient tirés sur un simple majorant
+        self.shared_alpha.value = alpha - ROOT_ALPHA_MARGIN
+        self.shared_best[:] = [-math.inf] * ROOT_EXACT_MOVES
+        self.stop.value = 0
+        root = state.copy()
+        futures = {
+            key: self.executor.submit(_search_root_move, (root, ai.who_am_i, ai.base_difficulty, ai.search_id,
+                                                          ai.aggression_factor, REPETITION_PENALTY if key[1] else 0,
+                                                          exact_moves, move, depth, beta, time_left, node_budget))
+            for key, move in representatives.items()
+        }
+        pending = set(futures.values())
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.05, return_when=FIRST_EXCEPTION)
+                if ai.cancel_event.is_set():
+                    raise SearchCancelled()
+                for future in done:
+                    future.result()  # Propage SearchTimeout
+        finally:
+            if pending:
+                # Les tâches restantes sont abandonnées ; on attend celles déjà
+                # lancées pour que la recherche suivante reparte proprement.
+                self.stop.value = 1
+                for future in pending: future.cancel()
+                wait(pending)
+
+        scores = {}
+        for key, future in futures.items():
+            scores[key], nodes = future.result()
+            ai.nodes += nodes
+        return [(move, scores[key]) for move, key in zip(moves, keys)]
+
+    def shutdown(self):
+        """
+        Arrête les processus de travail.
+        """
+        self.stop.value = 1
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,189 @@
+# perft.py
+"""
+Compteur de positions (« perft ») pour le générateur de coups de l'IA.
+
+perft(n) compte les positions atteintes après exactement n demi-coups depuis
+une position donnée, en jouant les coups de TeekoAI.get_all_possible_moves
+avec push/pop. Une position gagnée n'a pas de successeur. Les totaux de la
+position initiale sont connus (PERFT_START) ; tout générateur de coups plus
+rapide doit les retrouver.
+
+Avec --validate, chaque position de l'arbre est en plus confrontée aux règles
+de TeekoGame : l'ensemble des coups générés doit être exactement l'ensemble
+des coups acceptés par drop_piece ou move_piece, et push doit produire le
+même état qu'eux.
+
+    python perft.py --depth 4
+    python perft.py --depth 3 --position "......brb...rb...rbr....." --to-move black --validate --divide
+
+Le débit du générateur est mesuré à part, sur les positions de l'arbre, sans
+le coût de push/pop.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from ai_template import TeekoAI
+from benchmark import load_position
+from bitboard import COLOR_NAMES, COLORS
+from game_engine import TeekoGame
+
+# Totaux connus depuis le plateau vide : aucune victoire n'est possible
+# avant le septième pion.
+PERFT_START = {1: 25, 2: 600, 3: 13800, 4: 303600, 5: 6375600}
+
+
+def perft(ai, state, depth, positions=None):
+    """
+    Compte les positions atteintes après depth demi-coups.
+
+    :param ai: L'IA dont on teste le générateur de coups.
+    :type ai: TeekoAI
+    :param state: La position de départ, rendue intacte en sortie.
+    :type state: TeekoGame
+    :param depth: Le nombre de demi-coups.
+    :type depth: int
+    :param positions: Si fournie, reçoit (plateau, joueur) de chaque nœud
+                      intérieur, pour la mesure du générateur.
+    :type positions: list or None
+    :return: Le nombre de positions feuilles.
+    :rtype: int
+    """
+    if depth == 0:
+        return 1
+    if state.winner is not None:
+        return 0
+    moves = ai.get_all_possible_moves(state.board, state.current_player)
+    if positions is not None:
+        positions.append((state.board.copy(), state.current_player))
+    if depth == 1:
+        return len(moves)
+    count = 0
+    for move in moves:
+        state.push(move)
+        count += perft(ai, state, depth - 1, positions)
+        state.pop()
+    return count
+
+
+def _same_state(a, b):
+    """Compare deux états de partie, hachage compris."""
+    return (a.board == b.board and a.bitboards == b.bitboards and a.current_player == b.current_player
+            and a.phase == b.phase and a.turn_count == b.turn_count and a.winner == b.winner and a.hash == b.hash)
+
+
+def legal_moves_by_rules(game):
+    """
+    Énumère les coups acceptés par les règles de TeekoGame, en essayant
+    chaque pose et chaque déplacement sur une copie de la partie.
+
+    :param game: La position.
+    :type game: TeekoGame
+    :return: Les coups légaux et l'état obtenu après chacun.
+    :rtype: dict
+    """
+    legal = {}
+    for a in range(25):
+        trial = game.copy()
+        if trial.drop_piece(a):
+            legal[('drop', a)] = trial
+        for b in range(25):
+            trial = game.copy()
+            if trial.move_piece(a, b):
+                legal[('move', a, b)] = trial
+    return legal
+
+
+def validate(ai, state, depth):
+    """
+    Vérifie le générateur de coups et push contre les règles, sur tout
+    l'arbre de profondeur depth.
+
+    :return: La liste des anomalies trouvées (vide si tout est conforme).
+    :rtype: list[str]
+    """
+    errors = []
+
+    def visit(depth):
+        if depth == 0 or state.winner is not None:
+            return
+        generated = ai.get_all_possible_moves(state.board, state.current_player)
+        legal = legal_moves_by_rules(state)
+        if len(set(generated)) != len(generated):
+            errors.append(f"coups en double : {generated}")
+        for move in set(generated) ^ set(legal):
+            problem = "généré mais refusé par les règles" if move not in legal else "légal mais non généré"
+            errors.append(f"{move} {problem} (plateau {list(state.board)}, trait {COLOR_NAMES[state.current_player]})")
+        for move in generated:
+            if move not in legal: continue
+            state.push(move)
+            if not _same_state(state, legal[move]):
+                errors.append(f"push{move} diffère de drop_piece/move_piece (plateau {list(state.board)})")
+            visit(depth - 1)
+            state.pop()
+
+    visit(depth)
+    return errors
+
+
+def measure_generator(ai, positions, repeat=3):
+    """
+    Mesure le débit du générateur de coups seul.
+
+    :param positions: Les couples (plateau, joueur) sur lesquels l'appeler.
+    :type positions: list
+    :param repeat: Le nombre de passes sur les positions.
+    :type repeat: int
+    :return: Le nombre d'appels et de coups générés par seconde.
+    :rtype: tuple[float, float]
+    """
+    generated, start = 0, time.perf_counter()
+    for _ in range(repeat):
+        for board, player in positions:
+            generated += len(ai.get_all_possible_moves(board, player))
+    seconds = time.perf_counter() - start
+    return len(positions) * repeat / seconds, generated / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compte les positions atteintes par le générateur de coups de l'IA.")
+    parser.add_argument('--depth', type=int, default=4, help="nombre de demi-coups")
+    parser.add_argument('--position', help="plateau de 25 caractères parmi b, r et . (par défaut, le plateau vide)")
+    parser.add_argument('--to-move', default='black', choices=('black', 'red'), help="joueur au trait")
+    parser.add_argument('--divide', action='store_true', help="détaille le total par coup racine")
+    parser.add_argument('--validate', action='store_true', help="vérifie chaque position contre les règles de TeekoGame")
+    args = parser.parse_args()
+
+    game = load_position(args.position, COLORS[args.to_move]) if args.position else TeekoGame()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ai = TeekoAI(game, game.current_player, opening_book=False, tablebase=False)
+    state = game.copy()
+
+    if args.divide:
+        for move in ai.get_all_possible_moves(state.board, state.current_player):
+            state.push(move)
+            print(f"{move}: {perft(ai, state, args.depth - 1)}")
+            state.pop()
+
+    positions = []
+    start = time.perf_counter()
+    count = perft(ai, state, args.depth, positions)
+    seconds = time.perf_counter() - start
+    print(f"perft({args.depth}) = {count} en {seconds:.2f} s ({count / seconds:,.0f} feuilles/s)")
+    if not args.position and args.depth in PERFT_START:
+        expected = PERFT_START[args.depth]
+        print("Total conforme" if count == expected else f"ERREUR : {expected} attendu")
+
+    calls, moves = measure_generator(ai, positions)
+    print(f"Générateur seul : {calls:,.0f} appels/s, {moves:,.0f} coups/s sur {len(positions)} positions")
+
+    if args.validate:
+        errors = validate(ai, state, args.depth)
+        for error in errors[:20]:
+            print(error)
+        print(f"Validation : {len(errors)} anomalie(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# search_state.py
+"""
+État de recherche de l'IA avec évaluation incrémentale.
+
+SearchState est une copie du moteur de jeu (TeekoGame) dont push/pop tiennent
+aussi à jour, du point de vue d'un joueur donné, les termes de la fonction
+d'évaluation de TeekoAI :
+- le code en base 3 du contenu de chacune des 44 configurations gagnantes
+  (voir bitboard.pattern_codes), et la somme des scores de ces
+  configurations, lus dans une table de 81 entrées ;
+- le nombre de menaces (3 pions dans une configuration sans pion adverse) ;
+- le score positionnel ;
+- la mobilité de chaque camp.
+
+Un coup ne touche que les configurations passant par ses cases de départ et
+d'arrivée, si bien que l'évaluation d'un nœud ne coûte plus qu'une poignée
+d'additions.
+
+SearchState tient aussi à jour les hachages des 8 images de la position par
+les symétries du plateau, d'où la clé canonique de la table de transposition.
+"""
+from functools import lru_cache
+
+from bitboard import CODE_COUNTS, FULL_MASK, NEIGHBOR_MASKS, OPPONENT, PATTERN_CODES, SQUARE_BITS, \
+    SQUARE_PATTERN_WEIGHTS, iter_bits, mobility, pattern_codes
+from game_engine import TeekoGame
+from zobrist import SYMMETRY_KEYS, canonical_key, symmetric_hashes
+
+
+@lru_cache(maxsize=None)
+def pattern_tables(aggression_factor):
+    """
+    Construit les tables d'une configuration gagnante, indexées par le code en
+    base 3 de son contenu du point de vue de l'IA (voir bitboard.pattern_codes).
+
+    Le score d'une configuration comprend ses menaces (+200 pour une menace de
+    l'IA, -250 * aggression_factor pour une menace adverse) : l'évaluation se
+    réduit à 44 lectures de table. Les tables sont calculées une fois par
+    facteur d'agressivité et ne doivent pas être modifiées.
+
+    :param aggression_factor: Le facteur d'agressivité appliqué aux pions adverses.
+    :type aggression_factor: float
+    :return: Les tables (score, menace de l'IA, menace adverse).
+    :rtype: tuple[list, list, list]
+    """
+    values, my_threats, opp_threats = [0] * PATTERN_CODES, [0] * PATTERN_CODES, [0] * PATTERN_CODES
+    for code, (mine, theirs) in enumerate(CODE_COUNTS):
+        if mine > 0 and theirs > 0: continue # Ligne sans potentiel
+        if mine == 3:
+            my_threats[code] = 1
+            values[code] += 200
+        elif mine == 2: values[code] += 20
+        elif mine == 1: values[code] += 5
+        if theirs == 3:
+            opp_threats[code] = 1
+            values[code] -= 250 * aggression_factor
+        elif theirs == 2: values[code] -= 30 * aggression_factor
+        elif theirs == 1: values[code] -= 5 * aggression_factor
+    return values, my_threats, opp_threats
+
+
+class SearchState(TeekoGame):
+    """
+    Copie de travail du moteur de jeu qui maintient les termes de l'évaluation.
+    """
+    __slots__ = ('who', 'opponent', 'positional_values', 'aggression_factor', 'values', 'my_threat_table',
+                 'opp_threat_table', 'eval_stack', 'pattern_codes', 'pattern_score', 'my_threats', 'opp_threats',
+                 'positional', 'my_mobility', 'opp_mobility', 'sym_hashes')
+
+    def __init__(self, game, who, positional_values, aggression_factor=1.0):
+        """
+        Copie l'état d'une partie et calcule une première fois tous les termes
+        de l'évaluation.
+
+        :param game: La partie à copier.
+        :type game: TeekoGame
+        :param who: Le joueur du point de vue duquel on évalue (BLACK ou RED).
+        :type who: int
+        :param positional_values: La valeur positionnelle de chaque case.
+        :type positional_values: list
+        :param aggression_factor: Le facteur d'agressivité à appliquer.
+        :type aggression_factor: float
+        """
+        self.board = game.board.copy()
+        self.bitboards = game.bitboards.copy()
+        self.current_player = game.current_player
+        self.phase = game.phase
+        self.turn_count = game.turn_count
+        self.winner = game.winner
+        self.win_patterns = game.win_patterns
+        self.undo_stack = []
+        self.hash = game.hash
+
+        self.who = who
+        self.opponent = OPPONENT[who]
+        self.positional_values = positional_values
+        self.aggression_factor = aggression_factor
+        self.values, self.my_threat_table, self.opp_threat_table = pattern_tables(aggression_factor)
+        self.eval_stack = []
+        self.recompute()
+        self.sym_hashes = symmetric_hashes(self.board)
+
+    def canonical(self):
+        """
+        Retourne la clé canonique de la position, commune à ses 8 images par
+        les symétries du plateau.
+
+        :return: Le couple (hachage canonique, indice de la symétrie qui envoie
+                 la position sur son représentant canonique).
+        :rtype: tuple[int, int]
+        """
+        return canonical_key(self.sym_hashes, self.current_player)
+
+    def _update_sym_hashes(self, move, player):
+        """Ajoute ou retire (XOR) les clés des cases touchées par un coup."""
+        keys = SYMMETRY_KEYS[player]
+        if move[0] == 'drop':
+            self.sym_hashes = [h ^ a for h, a in zip(self.sym_hashes, keys[move[1]])]
+        else:
+            self.sym_hashes = [h ^ a ^ b for h, a, b in zip(self.sym_hashes, keys[move[1]], keys[move[2]])]
+
+    def recompute(self):
+        """
+        Recalcule entièrement les termes de l'évaluation à partir des bitboards.
+        """
+        mine, theirs = self.bitboards[self.who], self.bitboards[self.opponent]
+        empty = FULL_MASK & ~(mine | theirs)
+        self.pattern_codes = pattern_codes(mine, theirs)
+        self.pattern_score = sum(self.values[code] for code in self.pattern_codes)
+        self.my_threats = sum(self.my_threat_table[code] for code in self.pattern_codes)
+        self.opp_threats = sum(self.opp_threat_table[code] for code in self.pattern_codes)
+        self.positional = sum(self.positional_values[i] for i in iter_bits(mine)) - sum(self.positional_values[i] for i in iter_bits(theirs))
+        self.my_mobility = mobility(mine, empty)
+        self.opp_mobility = mobility(theirs, empty)
+
+    def _place(self, square, is_mine, mine, theirs, sign):
+        """
+        Ajoute (sign = 1) ou retire (sign = -1) un pion sur une case et met à
+        jour tous les termes de l'évaluation.
+
+        :param mine: Le bitboard de l'IA sans le pion concerné.
+        :param theirs: Le bitboard adverse sans le pion concerné.
+        """
+        pv = self.positional_values[square]
+        self.positional += pv * sign if is_mine else -pv * sign
+
+        # Les pions voisins perdent (ou regagnent) cette case comme destination,
+        # et le pion concerné a pour destinations les cases vides voisines.
+        neighbors = NEIGHBOR_MASKS[square]
+        own = (neighbors & FULL_MASK & ~(mine | theirs)).bit_count()
+        self.my_mobility -= (neighbors & mine).bit_count() * sign
+        self.opp_mobility -= (neighbors & theirs).bit_count() * sign
+        if is_mine: self.my_mobility += own * sign
+        else: self.opp_mobility += own * sign
+
+        step = (1 if is_mine else 2) * sign
+        codes, values = self.pattern_codes, self.values
+        my_table, opp_table = self.my_threat_table, self.opp_threat_table
+        for p, weight in SQUARE_PATTERN_WEIGHTS[square]:
+            old = codes[p]
+            new = old + step * weight
+            codes[p] = new
+            self.pattern_score += values[new] - values[old]
+            self.my_threats += my_table[new] - my_table[old]
+            self.opp_threats += opp_table[new] - opp_table[old]
+
+    def _shift_codes(self, square, is_mine, sign):
+        """
+        Met à jour les seuls codes des configurations passant par une case ;
+        utilisé par pop, qui restaure les totaux depuis eval_stack.
+        """
+        step = (1 if is_mine else 2) * sign
+        codes = self.pattern_codes
+        for p, weight in SQUARE_PATTERN_WEIGHTS[square]:
+            codes[p] += step * weight
+
+    def push(self, move):
+        """
+        Joue un coup en place (voir TeekoGame.push) et met à jour les termes
+        de l'évaluation pour les seules configurations touchées.
+
+        :param move: Le coup à jouer.
+        :type move: tuple
+        """
+        player = self.current_player
+        self.eval_stack.append((self.pattern_score, self.my_threats, self.opp_threats,
+                                self.positional, self.my_mobility, self.opp_mobility))
+        TeekoGame.push(self, move)
+        self._update_sym_hashes(move, player)
+
+        # Bitboards de la position intermédiaire, où le pion joué n'occupe
+        # ni sa case de départ ni sa case d'arrivée.
+        is_mine = player == self.who
+        mine, theirs = self.bitboards[self.who], self.bitboards[self.opponent]
+        target = move[1] if move[0] == 'drop' else move[2]
+        if is_mine: mine &= ~SQUARE_BITS[target]
+        else: theirs &= ~SQUARE_BITS[target]
+        if move[0] == 'move':
+            self._place(move[1], is_mine, mine, theirs, -1)
+        self._place(target, is_mine, mine, theirs, 1)
+
+    def pop(self):
+        """
+        Annule le dernier coup joué avec push et restaure l'évaluation.
+
+        :return: Le coup annulé.
+        :rtype: tuple
+        """
+        move = TeekoGame.pop(self)
+        self._update_sym_hashes(move, self.current_player)
+        is_mine = self.current_player == self.who
+        if move[0] == 'drop':
+            self._shift_codes(move[1], is_mine, -1)
+        else:
+            self._shift_codes(move[2], is_mine, -1)
+            self._shift_codes(move[1], is_mine, 1)
+        (self.pattern_score, self.my_threats, self.opp_threats,
+         self.positional, self.my_mobility, self.opp_mobility) = self.eval_stack.pop()
+        return move
+
+    def static_score(self):
+        """
+        Combine les termes tenus à jour en un score, hors états terminaux.
+        Identique au score de TeekoAI.evaluate_board.
+
+        :return: Le score de la position du point de vue de self.who.
+        :rtype: float
+        """
+        score = self.positional * 2
+        if (self.bitboards[self.who] | self.bitboards[self.opponent]).bit_count() >= 8:
+            score += (self.my_mobility - self.opp_mobility) * 3
+        return score + self.pattern_score
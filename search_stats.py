@@ -0,0 +1,130 @@
+# search_stats.py
+"""
+Statistiques de la recherche de l'IA, coup par coup.
+
+Lorsque la collecte est activée (TeekoAI(..., collect_stats=True) ou
+stats_log=chemin), chaque appel à choose_best_move produit un SearchStats,
+rangé dans TeekoAI.last_stats et, si un journal est donné, ajouté au format
+JSON (une ligne par coup) à la fin de ce fichier.
+
+Pour que la collecte ne coûte rien lorsqu'elle est désactivée, la recherche
+elle-même n'est pas modifiée : pendant la décision, instrument remplace sur
+l'instance de l'IA les méthodes de génération des coups, d'évaluation et de
+recherche racine par des versions chronométrées, puis les retire. Seules
+les coupures bêta sont relevées dans negamax, au moment de la coupure. Les
+compteurs de la table de transposition sont lus avant et après la décision.
+
+Avec une recherche répartie sur plusieurs processus (workers > 1), seuls le
+nombre de nœuds et le temps de recherche incluent le travail des processus.
+"""
+import json
+import time
+from contextlib import contextmanager
+
+
+class SearchStats:
+    """
+    Statistiques d'une décision de l'IA.
+    """
+    def __init__(self, who, turn):
+        """
+        Initialise des statistiques vides.
+
+        :param who: La couleur de l'IA.
+        :type who: str
+        :param turn: Le nombre de demi-coups déjà joués dans la partie.
+        :type turn: int
+        """
+        self.who = who
+        self.turn = turn
+        self.source = None  # Origine du coup : livre, table de finales, victoire, blocage, recherche...
+        self.move = None
+        self.score = None
+        self.depth_reached = 0
+        self.nodes = 0
+        self.evaluations = 0  # Évaluations statiques (feuilles et tri des coups)
+        self.generations = 0  # Appels au générateur de coups
+        self.cutoffs = []  # Nombre de coupures bêta, par rang du coup dans l'ordre de recherche
+        self.tt = {}  # Consultations, succès, collisions et écritures de la table de transposition
+        self.principal_variation = []
+        self.generation_time = 0.0
+        self.evaluation_time = 0.0
+        self.search_time = 0.0
+        self.total_time = 0.0
+
+    def record_cutoff(self, index):
+        """
+        Compte une coupure bêta.
+
+        :param index: Le rang, dans l'ordre de recherche, du coup qui l'a provoquée.
+        :type index: int
+        """
+        if index >= len(self.cutoffs):
+            self.cutoffs.extend([0] * (index + 1 - len(self.cutoffs)))
+        self.cutoffs[index] += 1
+
+    def _timed(self, function, counter, timer):
+        """Enveloppe une méthode pour compter ses appels et cumuler sa durée."""
+        def wrapper(*args):
+            start = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                setattr(self, timer, getattr(self, timer) + time.perf_counter() - start)
+                if counter: setattr(self, counter, getattr(self, counter) + 1)
+        return wrapper
+
+    @contextmanager
+    def instrument(self, ai):
+        """
+        Mesure une décision de l'IA.
+
+        :param ai: L'IA dont la décision est mesurée.
+        :type ai: TeekoAI
+        """
+        tt_before = ai.transposition_table.stats()
+        ai.nodes = 0
+        ai.stats = self
+        ai.evaluate_state = self._timed(type(ai).evaluate_state.__get__(ai), 'evaluations', 'evaluation_time')
+        ai._generate_moves = self._timed(type(ai)._generate_moves.__get__(ai), 'generations', 'generation_time')
+        ai.search_root = self._timed(type(ai).search_root.__get__(ai), None, 'search_time')
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.total_time = time.perf_counter() - start
+            del ai.evaluate_state, ai._generate_moves, ai.search_root
+            ai.stats = None
+            tt_after = ai.transposition_table.stats()
+            self.tt = {name: tt_after[name] - tt_before[name] for name in ('probes', 'hits', 'collisions', 'stores')}
+            self.nodes = ai.nodes
+            self.depth_reached = ai.depth_reached
+
+    def to_dict(self):
+        """
+        :return: Les statistiques, sous une forme sérialisable en JSON.
+        :rtype: dict
+        """
+        data = dict(vars(self))
+        data['move'] = list(self.move) if self.move else None
+        data['principal_variation'] = [list(move) for move in self.principal_variation]
+        for name in ('generation_time', 'evaluation_time', 'search_time', 'total_time'):
+            data[name] = round(data[name], 6)
+        return data
+
+    def to_json(self):
+        """
+        :return: Les statistiques sur une ligne JSON.
+        :rtype: str
+        """
+        return json.dumps(self.to_dict())
+
+    def write(self, path):
+        """
+        Ajoute les statistiques à un journal au format JSON lines.
+
+        :param path: Le chemin du journal.
+        :type path: str
+        """
+        with open(path, 'a') as f:
+            f.write(self.to_json() + '\n')
@@ -0,0 +1,334 @@
+# tablebase.py
+"""
+Table de finales de la phase de mouvement, calculée par analyse rétrograde.
+
+Une fois les 8 pions posés, une position de Teeko se résume aux 4 cases du
+joueur au trait et aux 4 cases de son adversaire : les règles étant les mêmes
+pour les deux couleurs, il suffit de C(25,4) * C(21,4) = 75 710 250 positions
+vues du joueur au trait. Chacune reçoit un index parfait par le système de
+numération combinatoire (rang des cases du joueur au trait parmi les 25, puis
+rang des cases adverses parmi les 21 restantes).
+
+Le fichier contient un en-tête suivi d'un octet par position :
+- 0 : partie nulle (ou position sans coup légal, ou position impossible) ;
+- d + 1 : résultat atteint en d demi-coups avec un jeu parfait des deux
+  camps. d impair signifie que le joueur au trait gagne, d pair qu'il perd
+  (d = 0 : l'adversaire a déjà aligné ses 4 pions).
+
+La génération procède par niveaux : au niveau d, une position encore
+inconnue est gagnée en d demi-coups si l'un de ses coups mène à une position
+perdue en d - 1, et perdue en d demi-coups si tous ses coups mènent à des
+positions gagnées. Chaque niveau est réparti entre plusieurs processus qui
+lisent la table en cours par mmap. Le calcul complet est long en Python
+(de l'ordre d'une heure par niveau sur un seul cœur) et se lance une fois
+pour toutes :
+
+    python tablebase.py --workers 8
+
+L'IA ouvre ensuite le fichier en mmap : une consultation coûte quelques
+opérations, et plusieurs processus partagent la même copie de la table par
+le cache de pages du système.
+"""
+import argparse
+import mmap
+import os
+import time
+from array import array
+from itertools import combinations
+from math import comb
+from multiprocessing import Pool
+
+from bitboard import BOARD_SIZE, FULL_MASK, NEIGHBOR_MASKS, SQUARE_BITS, has_win, iter_bits
+
+MAGIC = b'TEEKOTB1'
+HEADER_SIZE = len(MAGIC)
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'teeko_tablebase.bin')
+
+PIECES = 4
+SIDE_COMBOS = comb(BOARD_SIZE, PIECES)  # Placements du joueur au trait
+OTHER_COMBOS = comb(BOARD_SIZE - PIECES, PIECES)  # Placements adverses sur les cases libres
+POSITIONS = SIDE_COMBOS * OTHER_COMBOS
+
+WIN, DRAW, LOSS = 1, 0, -1  # Résultats du point de vue du joueur au trait
+MAX_VALUE = 255
+
+
+def _combination_masks(n):
+    """
+    Énumère les masques des combinaisons de PIECES cases parmi n, dans
+    l'ordre colexicographique, qui est celui du système de numération
+    combinatoire : le rang de {c0 < c1 < c2 < c3} vaut
+    C(c0,1) + C(c1,2) + C(c2,3) + C(c3,4).
+    """
+    masks = []
+    for squares in sorted(combinations(range(n), PIECES), key=lambda c: c[::-1]):
+        mask = 0
+        for square in squares:
+            mask |= 1 << square
+        masks.append(mask)
+    return masks
+
+
+SIDE_MASKS = _combination_masks(BOARD_SIZE)
+SIDE_RANKS = {mask: rank for rank, mask in enumerate(SIDE_MASKS)}
+OTHER_MASKS = _combination_masks(BOARD_SIZE - PIECES)
+OTHER_RANKS = {mask: rank for rank, mask in enumerate(OTHER_MASKS)}
+
+
+def position_index(mine, theirs):
+    """
+    Calcule l'index d'une position de la phase de mouvement.
+
+    :param mine: Le bitboard (4 pions) du joueur au trait.
+    :type mine: int
+    :param theirs: Le bitboard (4 pions) de son adversaire.
+    :type theirs: int
+    :return: L'index de la position, entre 0 et POSITIONS - 1.
+    :rtype: int
+    """
+    # Les cases adverses sont renumérotées parmi les 21 cases libres
+    compressed = 0
+    for square in iter_bits(theirs):
+        compressed |= 1 << (square - (mine & (SQUARE_BITS[square] - 1)).bit_count())
+    return SIDE_RANKS[mine] * OTHER_COMBOS + OTHER_RANKS[compressed]
+
+
+def position_from_index(index):
+    """
+    Retrouve la position correspondant à un index (inverse de position_index).
+
+    :param index: L'index de la position.
+    :type index: int
+    :return: Les bitboards (joueur au trait, adversaire).
+    :rtype: tuple[int, int]
+    """
+    side_rank, other_rank = divmod(index, OTHER_COMBOS)
+    mine = SIDE_MASKS[side_rank]
+    return mine, _expand(mine, OTHER_MASKS[other_rank])
+
+
+def _expand(mine, compressed):
+    """Replace sur le plateau des cases numérotées parmi les cases libres."""
+    free = [square for square in range(BOARD_SIZE) if not mine & SQUARE_BITS[square]]
+    theirs = 0
+    for i in iter_bits(compressed):
+        theirs |= SQUARE_BITS[free[i]]
+    return theirs
+
+
+def decode_value(value):
+    """
+    Traduit un octet de la table en résultat.
+
+    :param value: L'octet lu dans la table.
+    :type value: int
+    :return: Le couple (résultat, distance en demi-coups) ; la distance vaut
+             None pour une partie nulle.
+    :rtype: tuple[int, int or None]
+    """
+    if value == 0:
+        return DRAW, None
+    distance = value - 1
+    return (WIN if distance % 2 else LOSS), distance
+
+
+class Tablebase:
+    """
+    Consultation en lecture seule d'une table de finales par mmap.
+    """
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Ouvre et projette en mémoire le fichier de la table.
+
+        :param path: Le chemin du fichier produit par generate.
+        :type path: str
+        :raises ValueError: Si le fichier n'est pas une table de finales complète.
+        """
+        self.path = path
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:HEADER_SIZE] != MAGIC or len(self.data) != HEADER_SIZE + POSITIONS:
+            self.close()
+            raise ValueError(f"{path} n'est pas une table de finales de Teeko valide")
+
+    def close(self):
+        """
+        Libère la projection mémoire et le fichier.
+        """
+        self.data.close()
+        self.file.close()
+
+    def probe(self, mine, theirs):
+        """
+        Lit le résultat exact d'une position de la phase de mouvement.
+
+        :param mine: Le bitboard du joueur au trait.
+        :type mine: int
+        :param theirs: Le bitboard de son adversaire.
+        :type theirs: int
+        :return: Le couple (résultat, distance) du point de vue du joueur au
+                 trait (voir decode_value).
+        :rtype: tuple[int, int or None]
+        """
+        return decode_value(self.data[HEADER_SIZE + position_index(mine, theirs)])
+
+    def best_moves(self, mine, theirs, moves):
+        """
+        Classe les coups du joueur au trait d'après la table.
+
+        Une victoire est préférée au plus court, une défaite retardée au plus
+        long ; sinon, tous les coups qui conservent la nulle sont retenus.
+
+        :param mine: Le bitboard du joueur au trait.
+        :type mine: int
+        :param theirs: Le bitboard de son adversaire.
+        :type theirs: int
+        :param moves: Les coups légaux, de la forme ('move', from, to).
+        :type moves: list
+        :return: Le triplet (résultat, distance, meilleurs coups).
+        :rtype: tuple[int, int or None, list]
+        """
+        best_key, best = None, (DRAW, None, [])
+        for move in moves:
+            after = mine ^ SQUARE_BITS[move[1]] ^ SQUARE_BITS[move[2]]
+            result, distance = self.probe(theirs, after)
+            result = -result
+            if distance is not None: distance += 1
+            # Victoire courte > victoire longue > nulle > défaite longue > défaite courte
+            key = (result, -distance if result == WIN else (distance or 0))
+            if best_key is None or key > best_key:
+                best_key, best = key, (result, distance, [move])
+            elif key == best_key:
+                best[2].append(move)
+        return best
+
+
+_open_tables = {}
+
+
+def open_tablebase(path=DEFAULT_PATH):
+    """
+    Ouvre une table de finales si le fichier existe. Une même table n'est
+    projetée qu'une fois par processus, quel que soit le nombre d'IA.
+
+    :param path: Le chemin du fichier de la table.
+    :type path: str
+    :return: La table, ou None si le fichier n'a pas été généré.
+    :rtype: Tablebase or None
+    """
+    if path not in _open_tables:
+        if not os.path.exists(path):
+            return None
+        _open_tables[path] = Tablebase(path)
+    return _open_tables[path]
+
+
+# --- Génération ---
+
+_table = None  # Projection de la table en cours de calcul, dans chaque processus de travail
+_file = None
+
+
+def _init_worker(path):
+    """Ouvre en lecture la table en cours de calcul dans un processus de travail."""
+    global _table, _file
+    _file = open(path, 'rb')
+    _table = mmap.mmap(_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _solve_chunk(args):
+    """
+    Résout un niveau de l'analyse rétrograde pour une tranche de placements
+    du joueur au trait.
+
+    :param args: Le couple (rangs des placements du joueur au trait, niveau).
+    :type args: tuple[range, int]
+    :return: Les index des positions résolues à ce niveau.
+    :rtype: array
+    """
+    side_ranks, level = args
+    table = _table
+    solved = array('I')
+    for side_rank in side_ranks:
+        mine = SIDE_MASKS[side_rank]
+        if has_win(mine): continue  # Position impossible : la partie serait déjà finie
+        base = HEADER_SIZE + side_rank * OTHER_COMBOS
+        free = [square for square in range(BOARD_SIZE) if not mine & SQUARE_BITS[square]]
+        pieces = list(iter_bits(mine))
+        for other_rank, compressed in enumerate(OTHER_MASKS):
+            if table[base + other_rank]: continue  # Déjà résolue
+            theirs = 0
+            for i in iter_bits(compressed):
+                theirs |= SQUARE_BITS[free[i]]
+
+            if level == 0:
+                if has_win(theirs): solved.append(side_rank * OTHER_COMBOS + other_rank)
+                continue
+
+            # Valeurs des positions atteintes, vues de l'adversaire
+            empty = FULL_MASK & ~(mine | theirs)
+            found, all_won, any_move = False, True, False
+            for square in pieces:
+                for target in iter_bits(NEIGHBOR_MASKS[square] & empty):
+                    any_move = True
+                    value = table[HEADER_SIZE + position_index(theirs, mine ^ SQUARE_BITS[square] ^ SQUARE_BITS[target])]
+                    if level % 2:
+                        if value == level: found = True; break  # L'adversaire y perd en level - 1
+                    elif value == 0 or value % 2:
+                        all_won = False; break  # L'adversaire n'y gagne pas forcément
+                if found or not all_won: break
+            if found or (level % 2 == 0 and all_won and any_move):
+                solved.append(side_rank * OTHER_COMBOS + other_rank)
+    return solved
+
+
+def generate(path=DEFAULT_PATH, workers=None, chunk_size=50):
+    """
+    Calcule la table de finales complète et l'écrit dans un fichier.
+
+    Le calcul se fait dans un fichier temporaire, renommé à la fin : une
+    génération interrompue ne laisse jamais de table incomplète.
+
+    :param path: Le chemin du fichier à produire.
+    :type path: str
+    :param workers: Le nombre de processus de calcul (par défaut, un par cœur).
+    :type workers: int or None
+    :param chunk_size: Le nombre de placements du joueur au trait par tâche.
+    :type chunk_size: int
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.truncate(HEADER_SIZE + POSITIONS)
+
+    chunks = [range(start, min(start + chunk_size, SIDE_COMBOS)) for start in range(0, SIDE_COMBOS, chunk_size)]
+    with open(tmp_path, 'r+b') as f:
+        table = mmap.mmap(f.fileno(), 0)
+        with Pool(workers, initializer=_init_worker, initargs=(tmp_path,)) as pool:
+            level, empty_levels = 0, 0
+            while empty_levels < 2:
+                if level + 1 > MAX_VALUE:
+                    raise OverflowError("Distance au résultat trop grande pour un octet")
+                start, count = time.time(), 0
+                # Toutes les tranches sont résolues avant d'écrire le niveau,
+                # qui ne dépend ainsi que des niveaux précédents.
+                results = pool.map(_solve_chunk, [(chunk, level) for chunk in chunks])
+                for solved in results:
+                    for index in solved:
+                        table[HEADER_SIZE + index] = level + 1
+                    count += len(solved)
+                table.flush()
+                print(f"Niveau {level} : {count} positions résolues en {time.time() - start:.0f} s")
+                empty_levels = empty_levels + 1 if count == 0 and level > 0 else 0
+                level += 1
+        table.close()
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère la table de finales de la phase de mouvement.")
+    parser.add_argument('--out', default=DEFAULT_PATH, help="fichier à produire")
+    parser.add_argument('--workers', type=int, default=None, help="nombre de processus de calcul")
+    parser.add_argument('--chunk-size', type=int, default=50, help="placements du joueur au trait par tâche")
+    args = parser.parse_args()
+    generate(args.out, args.workers, args.chunk_size)
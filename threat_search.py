@@ -0,0 +1,165 @@
+# threat_search.py
+"""
+Recherche de gains forcés par les menaces (« threat-space search »), en
+phase de mouvement.
+
+Une menace est une configuration gagnante occupée par 3 pions d'un joueur et
+aucun pion adverse (celles que compte TeekoAI.calculate_threats), dont la
+case libre est adjacente à un autre pion du joueur : il peut la compléter au
+coup suivant. L'attaquant ne joue ici que des coups qui créent une telle
+menace ; le défenseur doit alors occuper la case libre, faute de quoi il
+perd. Une seule menace se pare ainsi, deux cases libres différentes sont
+imparables.
+
+L'arbre des coups de l'attaquant est donc très étroit, et celui du défenseur
+se réduit aux coups qui occupent la case menacée, sans perte d'exactitude :
+les autres réponses laissent la victoire immédiate. Un gain trouvé est un
+gain forcé, quelle que soit la défense ; l'absence de gain ne prouve rien,
+l'attaquant pouvant gagner par des coups tranquilles que la recherche
+n'explore pas. La profondeur se compte en coups de l'attaquant : un gain en
+n coups de l'attaquant dure 2n - 1 demi-coups.
+
+En phase de placement (moins de 8 pions posés), aucun gain n'est cherché.
+"""
+from bitboard import NEIGHBOR_MASKS, SQUARE_BITS, WIN_MASKS, generate_moves
+
+THREAT_SEARCH_DEPTH = 8  # Coups de l'attaquant, soit un gain forcé en 15 demi-coups au plus
+THREAT_SEARCH_NODES = 20000  # Nœuds au plus par appel de find_win
+
+
+class ThreatSearchLimit(Exception):
+    """
+    Levée lorsque la recherche dépasse son budget de nœuds.
+    """
+
+
+def winning_moves(mine, theirs):
+    """
+    Énumère les coups gagnants immédiats d'un joueur en phase de mouvement.
+
+    Un coup gagnant complète une configuration occupée par 3 pions du joueur,
+    depuis une case adjacente extérieure à cette configuration.
+
+    :param mine: Le bitboard du joueur.
+    :type mine: int
+    :param theirs: Le bitboard de son adversaire.
+    :type theirs: int
+    :return: Les coups ('move', from, to) gagnants.
+    :rtype: list
+    """
+    moves = []
+    for mask in WIN_MASKS:
+        if theirs & mask or (mine & mask).bit_count() != 3:
+            continue
+        hole = mask & ~mine
+        to_pos = hole.bit_length() - 1
+        sources = NEIGHBOR_MASKS[to_pos] & mine & ~mask
+        while sources:
+            low = sources & -sources
+            moves.append(('move', low.bit_length() - 1, to_pos))
+            sources ^= low
+    return moves
+
+
+def _apply(bits, move):
+    """Bitboard d'un joueur après l'un de ses déplacements."""
+    return bits ^ SQUARE_BITS[move[1]] ^ SQUARE_BITS[move[2]]
+
+
+class ThreatSearch:
+    """
+    Recherche de gains forcés par menaces successives, avec un cache des
+    positions déjà résolues et un budget de nœuds.
+    """
+    def __init__(self, max_nodes=THREAT_SEARCH_NODES, cancel_event=None):
+        """
+        :param max_nodes: Le nombre maximal de nœuds par appel de find_win.
+        :type max_nodes: int
+        :param cancel_event: Un événement dont le positionnement interrompt la
+                             recherche comme un budget épuisé.
+        :type cancel_event: threading.Event or None
+        """
+        self.max_nodes = max_nodes
+        self.cancel_event = cancel_event
+        self.nodes = 0  # Nœuds du dernier appel de find_win
+        self.cache = {}  # (attaquant, défenseur) -> (profondeur, coup gagnant ou None)
+
+    def find_win(self, mine, theirs, depth=THREAT_SEARCH_DEPTH):
+        """
+        Cherche un gain forcé pour le joueur au trait, du plus court au plus
+        long, en depth coups au plus.
+
+        :param mine: Le bitboard du joueur au trait (l'attaquant).
+        :type mine: int
+        :param theirs: Le bitboard de son adversaire.
+        :type theirs: int
+        :param depth: Le nombre maximal de coups de l'attaquant.
+        :type depth: int
+        :return: Le premier coup du gain et sa longueur en coups de
+                 l'attaquant, ou None si aucun gain n'a été trouvé (dans le
+                 budget de nœuds).
+        :rtype: tuple[tuple, int] or None
+        """
+        self.nodes = 0
+        if (mine | theirs).bit_count() < 8:
+            return None
+        try:
+            for length in range(1, depth + 1):
+                move = self._attack(mine, theirs, length)
+                if move is not None:
+                    return move, length
+        except ThreatSearchLimit:
+            pass
+        return None
+
+    def _attack(self, mine, theirs, depth):
+        """
+        Nœud de l'attaquant : un coup gagnant en depth coups au plus, ou None.
+
+        :raises ThreatSearchLimit: Si le budget de nœuds est épuisé.
+        """
+        key = (mine, theirs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            cached_depth, cached_move = cached
+            if cached_move is not None and cached_depth <= depth: return cached_move
+            if cached_move is None and cached_depth >= depth: return None
+
+        self.nodes += 1
+        if self.nodes > self.max_nodes or self.cancel_event is not None and self.cancel_event.is_set():
+            raise ThreatSearchLimit()
+
+        wins = winning_moves(mine, theirs)
+        if wins:
+            self.cache[key] = (1, wins[0])
+            return wins[0]
+        result = None
+        if depth > 1:
+            for move in generate_moves(mine, theirs):
+                after = _apply(mine, move)
+                threats = winning_moves(after, theirs)
+                if not threats or winning_moves(theirs, after):
+                    continue  # Coup tranquille, ou victoire immédiate laissée au défenseur
+                if self._defend(after, theirs, {threat[2] for threat in threats}, depth - 1):
+                    result = move
+                    break
+        self.cache[key] = (depth, result)
+        return result
+
+    def _defend(self, mine, theirs, holes, depth):
+        """
+        Nœud du défenseur, qui doit occuper une case menacée : True si toutes
+        ses parades mènent à un gain de l'attaquant en depth coups au plus.
+        Face à deux cases menacées, chaque parade en laisse une, que
+        l'attaquant complète au coup suivant. Sans aucun coup légal, la
+        partie est bloquée et rien n'est prouvé.
+        """
+        replies = generate_moves(theirs, mine)
+        if not replies:
+            return False
+        for reply in replies:
+            if reply[2] not in holes:
+                continue
+            if self._attack(mine, _apply(theirs, reply), depth) is None:
+                return False
+        return True
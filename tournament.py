@@ -0,0 +1,236 @@
+# tournament.py
+"""
+Tournoi sans interface entre deux configurations de l'IA.
+
+Les parties sont jouées directement avec TeekoGame et TeekoAI, sans les
+délais de l'interface, et réparties sur plusieurs processus. Les deux
+configurations alternent les couleurs d'une partie à l'autre. Une partie
+est déclarée nulle si elle atteint la limite de demi-coups ou si une même
+position (joueur au trait compris) se présente pour la troisième fois.
+
+Exemple :
+
+    python tournament.py 5 4,time=0.2 --games 200 --workers 8
+
+Une configuration est un niveau de difficulté, éventuellement suivi
+d'options séparées par des virgules : time (budget par coup, en secondes),
+nodes (budget de nœuds par coup), depth (profondeur maximale de
+l'approfondissement itératif), workers (processus de la recherche racine),
+stats (journal JSON lines des statistiques de chaque coup, voir
+search_stats.py) et threats (profondeur de la recherche de gains forcés par
+menaces, 0 pour la désactiver, voir threat_search.py).
+
+Le niveau « mcts » désigne le moteur Monte-Carlo de mcts_ai.py, qui accepte
+les options time, nodes (itérations par coup) et workers (processus des
+playouts) :
+
+    python tournament.py mcts,time=0.5 3 --games 50
+"""
+import argparse
+import contextlib
+import io
+import math
+import random
+import time
+from multiprocessing import Pool
+
+from ai_template import TeekoAI
+from bitboard import BLACK, OPPONENT, RED
+from game_engine import TeekoGame
+from mcts_ai import MCTSAI
+
+_OPTIONS = {'time': ('time_budget', float), 'nodes': ('node_budget', int),
+            'depth': ('max_depth', int), 'workers': ('workers', int), 'stats': ('stats_log', str),
+            'threats': ('threat_depth', int)}
+_MCTS_OPTIONS = ('time', 'nodes', 'workers')  # Options acceptées par MCTSAI
+
+
+def parse_config(spec):
+    """
+    Traduit une configuration de la ligne de commande en arguments de TeekoAI
+    (ou de MCTSAI pour le niveau « mcts »).
+
+    :param spec: La configuration, par exemple "4,time=0.2,depth=6".
+    :type spec: str
+    :return: Le niveau de difficulté et les arguments nommés de TeekoAI.
+    :rtype: tuple[str, dict]
+    :raises ValueError: Si une option est inconnue, ou non acceptée par le moteur du niveau.
+    """
+    level, *options = spec.split(',')
+    level = level.strip()
+    allowed = _MCTS_OPTIONS if level == 'mcts' else tuple(_OPTIONS)
+    kwargs = {}
+    for option in options:
+        name, _, value = option.partition('=')
+        if name not in allowed:
+            raise ValueError(f"Option inconnue : {name} (attendu : {', '.join(allowed)})")
+        argument, convert = _OPTIONS[name]
+        kwargs[argument] = convert(value)
+    return level, kwargs
+
+
+def play_game(config_a, config_b, a_is_black, seed, max_moves=200):
+    """
+    Joue une partie complète entre deux configurations.
+
+    :param config_a: La configuration A, telle que renvoyée par parse_config.
+    :type config_a: tuple[str, dict]
+    :param config_b: La configuration B.
+    :type config_b: tuple[str, dict]
+    :param a_is_black: True si A joue les noirs (qui commencent).
+    :type a_is_black: bool
+    :param seed: La graine du générateur aléatoire utilisé par l'IA.
+    :type seed: int
+    :param max_moves: Le nombre maximal de demi-coups avant d'arbitrer la nulle.
+    :type max_moves: int
+    :return: Le résultat ('a', 'b' ou 'draw'), la raison, le nombre de
+             demi-coups, et le temps et les nœuds de chaque configuration.
+    :rtype: dict
+    """
+    random.seed(seed)
+    game = TeekoGame()
+    colors = {'a': BLACK if a_is_black else RED, 'b': RED if a_is_black else BLACK}
+    stats = {side: {'time': 0.0, 'nodes': 0, 'moves': 0} for side in colors}
+    with contextlib.redirect_stdout(io.StringIO()):  # L'IA commente chacun de ses coups
+        ais = {}
+        for side, (level, kwargs) in (('a', config_a), ('b', config_b)):
+            ai = MCTSAI(game, colors[side], **kwargs) if level == 'mcts' else TeekoAI(game, colors[side], level, **kwargs)
+            ais[colors[side]] = (side, ai)
+        seen = {game.hash: 1}
+        result, reason = 'draw', 'limite de coups'
+        for ply in range(max_moves):
+            side, ai = ais[game.current_player]
+            ai.nodes = 0
+            start = time.perf_counter()
+            move = ai.make_move()
+            stats[side]['time'] += time.perf_counter() - start
+            stats[side]['nodes'] += ai.nodes
+            stats[side]['moves'] += 1
+            if move is None:
+                result, reason = 'draw', 'aucun coup'  # Comme dans la table de finales
+                break
+            _, other = ais[OPPONENT[ai.who_am_i]]
+            other.record_opponent_move(move)
+            if game.winner is not None:
+                result, reason = side, 'victoire'
+                break
+            seen[game.hash] = seen.get(game.hash, 0) + 1
+            if seen[game.hash] >= 3:
+                result, reason = 'draw', 'répétition'
+                break
+        for _, ai in ais.values():
+            ai.close()
+    return {'result': result, 'reason': reason, 'plies': ply + 1, 'a_is_black': a_is_black, 'stats': stats}
+
+
+def _play(args):
+    """Point d'entrée des processus de travail."""
+    return play_game(*args)
+
+
+def elo_difference(wins, draws, losses):
+    """
+    Estime l'écart Elo entre A et B à partir des résultats de A.
+
+    :param wins: Le nombre de victoires de A.
+    :type wins: int
+    :param draws: Le nombre de nulles.
+    :type draws: int
+    :param losses: Le nombre de défaites de A.
+    :type losses: int
+    :return: L'écart estimé et la demi-largeur de son intervalle de confiance
+             à 95 %, ou (None, None) si le score est de 0 % ou 100 %.
+    :rtype: tuple[float or None, float or None]
+    """
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    if not 0 < score < 1:
+        return None, None
+    elo = -400 * math.log10(1 / score - 1)
+    # Écart type du score par partie, propagé à l'Elo par la dérivée de la courbe logistique
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = 1.96 * math.sqrt(variance / games) * 400 / (math.log(10) * score * (1 - score))
+    return elo, margin
+
+
+def run_tournament(spec_a, spec_b, games=100, workers=None, max_moves=200, seed=0):
+    """
+    Joue un tournoi entre deux configurations et affiche ses statistiques.
+
+    :param spec_a: La configuration A (voir parse_config).
+    :type spec_a: str
+    :param spec_b: La configuration B.
+    :type spec_b: str
+    :param games: Le nombre de parties.
+    :type games: int
+    :param workers: Le nombre de processus (par défaut, un par cœur).
+    :type workers: int or None
+    :param max_moves: Le nombre maximal de demi-coups par partie.
+    :type max_moves: int
+    :param seed: La graine de la première partie.
+    :type seed: int
+    :return: La liste des résultats de play_game.
+    :rtype: list[dict]
+    """
+    config_a, config_b = parse_config(spec_a), parse_config(spec_b)
+    tasks = [(config_a, config_b, i % 2 == 0, seed + i, max_moves) for i in range(games)]
+    results = []
+    start = time.time()
+    with Pool(workers) as pool:
+        for result in pool.imap_unordered(_play, tasks):
+            results.append(result)
+            if len(results) % 10 == 0 or len(results) == games:
+                print(f"{len(results)}/{games} parties jouées ({time.time() - start:.0f} s)")
+    report(spec_a, spec_b, results)
+    return results
+
+
+def report(spec_a, spec_b, results):
+    """
+    Affiche le bilan d'un tournoi.
+
+    :param spec_a: La configuration A.
+    :type spec_a: str
+    :param spec_b: La configuration B.
+    :type spec_b: str
+    :param results: La liste des résultats de play_game.
+    :type results: list[dict]
+    """
+    games = len(results)
+    wins = sum(r['result'] == 'a' for r in results)
+    losses = sum(r['result'] == 'b' for r in results)
+    draws = games - wins - losses
+    print(f"\nA = {spec_a}, B = {spec_b}, {games} parties")
+    print(f"A gagne {wins} ({wins / games:.1%}), nulles {draws} ({draws / games:.1%}), B gagne {losses} ({losses / games:.1%})")
+    for color, a_is_black in (('noirs', True), ('rouges', False)):
+        subset = [r for r in results if r['a_is_black'] == a_is_black]
+        if subset:
+            print(f"  A avec les {color} : {sum(r['result'] == 'a' for r in subset)} victoires, "
+                  f"{sum(r['result'] == 'draw' for r in subset)} nulles, {sum(r['result'] == 'b' for r in subset)} défaites")
+    reasons = {}
+    for r in results:
+        reasons[r['reason']] = reasons.get(r['reason'], 0) + 1
+    print("Fins de partie : " + ", ".join(f"{reason} {count}" for reason, count in sorted(reasons.items())))
+    print(f"Longueur moyenne : {sum(r['plies'] for r in results) / games:.1f} demi-coups")
+
+    elo, margin = elo_difference(wins, draws, losses)
+    print(f"Écart Elo (A - B) : {elo:+.0f} ± {margin:.0f}" if elo is not None else "Écart Elo (A - B) : indéterminé (score de 0 % ou 100 %)")
+
+    for side, spec in (('a', spec_a), ('b', spec_b)):
+        moves = sum(r['stats'][side]['moves'] for r in results)
+        seconds = sum(r['stats'][side]['time'] for r in results)
+        nodes = sum(r['stats'][side]['nodes'] for r in results)
+        nps = nodes / seconds if seconds else 0
+        print(f"{side.upper()} ({spec}) : {seconds / max(moves, 1) * 1000:.1f} ms par coup, {nps:,.0f} nœuds/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tournoi sans interface entre deux configurations de l'IA.")
+    parser.add_argument('a', help="configuration A, par exemple 5, 4,time=0.2 ou mcts,time=0.5")
+    parser.add_argument('b', help="configuration B")
+    parser.add_argument('--games', type=int, default=100, help="nombre de parties")
+    parser.add_argument('--workers', type=int, default=None, help="nombre de processus")
+    parser.add_argument('--max-moves', type=int, default=200, help="demi-coups avant d'arbitrer la nulle")
+    parser.add_argument('--seed', type=int, default=0, help="graine de la première partie")
+    args = parser.parse_args()
+    run_tournament(args.a, args.b, args.games, args.workers, args.max_moves, args.seed)
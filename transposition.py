@@ -0,0 +1,182 @@
+# transposition.py
+"""
+Table de transposition à capacité fixe pour la recherche de l'IA.
+
+Les entrées sont rangées dans des tableaux typés (module array) plutôt que
+dans des dictionnaires : chaque champ (hachage, score, profondeur, drapeau,
+meilleur coup, âge) occupe une case d'un tableau dédié, soit une vingtaine
+d'octets par entrée. La mémoire reste donc bornée quelle que soit la durée
+de vie de la table, qui peut être conservée d'un coup et d'une partie à
+l'autre.
+
+Chaque hachage désigne un seau de deux emplacements :
+- l'emplacement 0 privilégie la profondeur : il n'est remplacé que par une
+  recherche au moins aussi profonde, ou par une recherche plus récente ;
+- l'emplacement 1 est remplacé systématiquement.
+"""
+from array import array
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+_EMPTY = -1  # Profondeur marquant un emplacement libre
+_NO_MOVE = -1
+
+
+def encode_move(move):
+    """
+    Code un coup sous forme d'entier pour le stocker dans la table.
+
+    :param move: Le coup, ('drop', pos) ou ('move', from, to), ou None.
+    :type move: tuple or None
+    :return: Le code du coup (-1 pour None).
+    :rtype: int
+    """
+    if move is None:
+        return _NO_MOVE
+    if move[0] == 'drop':
+        return move[1]
+    return 25 + move[1] * 25 + move[2]
+
+
+def decode_move(code):
+    """
+    Retrouve le coup correspondant à un code produit par encode_move.
+
+    :param code: Le code du coup.
+    :type code: int
+    :return: Le coup, ou None.
+    :rtype: tuple or None
+    """
+    if code == _NO_MOVE:
+        return None
+    if code < 25:
+        return ('drop', code)
+    return ('move',) + divmod(code - 25, 25)
+
+
+class TranspositionTable:
+    """
+    Table de transposition à seaux de deux emplacements (profondeur
+    privilégiée / remplacement systématique).
+    """
+    def __init__(self, size_bits=17):
+        """
+        Alloue la table.
+
+        :param size_bits: Logarithme en base 2 du nombre de seaux. La table
+                          contient 2 * 2**size_bits entrées.
+        :type size_bits: int
+        """
+        self.bucket_mask = (1 << size_bits) - 1
+        self.capacity = 2 << size_bits
+        self.keys = array('Q', bytes(8 * self.capacity))
+        self.scores = array('d', bytes(8 * self.capacity))
+        self.depths = array('b', [_EMPTY]) * self.capacity
+        self.flags = array('b', bytes(self.capacity))
+        self.moves = array('h', [_NO_MOVE]) * self.capacity
+        self.ages = array('B', bytes(self.capacity))
+        self.age = 0
+        self.used = 0  # Nombre d'emplacements occupés
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Remet à zéro les compteurs d'utilisation.
+        """
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def clear(self):
+        """
+        Vide la table et remet ses compteurs à zéro.
+        """
+        self.depths = array('b', [_EMPTY]) * self.capacity
+        self.age = 0
+        self.used = 0
+        self.reset_stats()
+
+    def new_search(self):
+        """
+        Signale le début d'une nouvelle recherche.
+
+        Les entrées des recherches précédentes restent consultables, mais
+        l'emplacement à profondeur privilégiée peut désormais être écrasé
+        même par une recherche moins profonde.
+        """
+        self.age = (self.age + 1) & 0xFF
+
+    def probe(self, key):
+        """
+        Cherche une position dans la table.
+
+        :param key: Le hachage de Zobrist de la position.
+        :type key: int
+        :return: Le tuple (score, profondeur, drapeau, meilleur coup), ou None
+                 si la position n'est pas dans la table.
+        :rtype: tuple or None
+        """
+        self.probes += 1
+        slot = (key & self.bucket_mask) << 1
+        occupied = False
+        for i in (slot, slot + 1):
+            if self.depths[i] != _EMPTY:
+                if self.keys[i] == key:
+                    self.hits += 1
+                    return self.scores[i], self.depths[i], self.flags[i], decode_move(self.moves[i])
+                occupied = True
+        if occupied:
+            self.collisions += 1  # Seau occupé par d'autres positions
+        return None
+
+    def store(self, key, score, depth, flag, move=None):
+        """
+        Enregistre le résultat de la recherche d'une position.
+
+        :param key: Le hachage de Zobrist de la position.
+        :type key: int
+        :param score: Le score trouvé.
+        :type score: float
+        :param depth: La profondeur de la recherche qui a produit ce score.
+        :type depth: int
+        :param flag: La nature du score (EXACT, LOWER ou UPPER).
+        :type flag: int
+        :param move: Le meilleur coup trouvé, s'il y en a un.
+        :type move: tuple or None
+        """
+        self.stores += 1
+        slot = (key & self.bucket_mask) << 1
+        depths, keys = self.depths, self.keys
+        if depths[slot] == _EMPTY or keys[slot] == key or self.ages[slot] != self.age or depths[slot] <= depth:
+            # L'emplacement à profondeur privilégiée accepte l'entrée : on retire
+            # un éventuel doublon de la même position dans l'emplacement voisin.
+            if depths[slot + 1] != _EMPTY and keys[slot + 1] == key:
+                depths[slot + 1] = _EMPTY
+                self.used -= 1
+        else:
+            slot += 1
+        if depths[slot] == _EMPTY:
+            self.used += 1
+        self.keys[slot] = key
+        self.scores[slot] = score
+        self.depths[slot] = depth
+        self.flags[slot] = flag
+        self.moves[slot] = encode_move(move)
+        self.ages[slot] = self.age
+
+    def stats(self):
+        """
+        Retourne les compteurs d'utilisation de la table.
+
+        :return: Un dictionnaire avec le nombre de consultations, de succès,
+                 de collisions, d'écritures et le taux d'occupation.
+        :rtype: dict
+        """
+        return {
+            'probes': self.probes,
+            'hits': self.hits,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'occupancy': round(self.used / self.capacity, 4),
+        }
@@ -0,0 +1,99 @@
+# zobrist.py
+"""
+Clés de hachage de Zobrist pour les positions de Teeko.
+
+Une position est résumée par le XOR d'une clé aléatoire de 64 bits par pion
+(case, couleur) et d'une clé supplémentaire lorsque c'est aux rouges de
+jouer. Un coup ne modifie que deux ou trois termes, ce qui permet de tenir
+le hachage à jour de façon incrémentale. Le générateur est initialisé avec
+une graine fixe pour que les clés soient identiques d'un processus à l'autre.
+
+Le hachage canonique identifie une position à ses 7 images par les symétries
+du plateau (rotations et retournements) : c'est le plus petit des 8 hachages
+des images, qui sert de clé à la table de transposition.
+"""
+import random
+
+from bitboard import BOARD_SIZE, RED, SYMMETRIES
+
+_rng = random.Random(0x7EEC0)
+
+# PIECE_KEYS[joueur][i] : clé d'un pion posé sur la case i, indexée comme le
+# contenu des cases (les clés d'une case vide sont nulles).
+_black_keys = [_rng.getrandbits(64) for _ in range(25)]
+_red_keys = [_rng.getrandbits(64) for _ in range(25)]
+PIECE_KEYS = ([0] * BOARD_SIZE, _black_keys, _red_keys)
+SIDE_KEY = _rng.getrandbits(64)  # Présent dans le hachage quand c'est aux rouges de jouer
+
+# SYMMETRY_KEYS[joueur][i][k] : clé d'un pion posé sur l'image de la case i
+# par la symétrie k. Un coup met à jour les 8 hachages des images à la fois.
+SYMMETRY_KEYS = tuple(
+    [tuple(keys[SYMMETRIES[k][i]] for k in range(8)) for i in range(BOARD_SIZE)]
+    for keys in PIECE_KEYS
+)
+
+
+def hash_board(board, to_move):
+    """
+    Calcule entièrement le hachage de Zobrist d'une position.
+
+    :param board: Le plateau (25 cases EMPTY, BLACK ou RED).
+    :type board: bytearray
+    :param to_move: Le joueur qui a le trait (BLACK ou RED).
+    :type to_move: int
+    :return: Le hachage 64 bits de la position.
+    :rtype: int
+    """
+    h = SIDE_KEY if to_move == RED else 0
+    for i, piece in enumerate(board):
+        if piece:
+            h ^= PIECE_KEYS[piece][i]
+    return h
+
+
+def symmetric_hashes(board):
+    """
+    Calcule les hachages des 8 images d'un plateau par les symétries, sans
+    la clé du joueur au trait.
+
+    :param board: Le plateau (25 cases EMPTY, BLACK ou RED).
+    :type board: bytearray
+    :return: Les 8 hachages, dans l'ordre de bitboard.SYMMETRIES.
+    :rtype: list[int]
+    """
+    hashes = [0] * 8
+    for i, piece in enumerate(board):
+        if piece:
+            hashes = [h ^ key for h, key in zip(hashes, SYMMETRY_KEYS[piece][i])]
+    return hashes
+
+
+def canonical_key(hashes, to_move):
+    """
+    Déduit le hachage canonique d'une position des hachages de ses images.
+
+    :param hashes: Les 8 hachages renvoyés par symmetric_hashes.
+    :type hashes: list[int]
+    :param to_move: Le joueur qui a le trait (BLACK ou RED).
+    :type to_move: int
+    :return: Le couple (hachage canonique, indice de la symétrie qui envoie
+             la position sur son représentant canonique).
+    :rtype: tuple[int, int]
+    """
+    low = min(hashes)
+    return (low ^ SIDE_KEY if to_move == RED else low), hashes.index(low)
+
+
+def canonical_hash(board, to_move):
+    """
+    Calcule le hachage canonique d'une position, identique pour toutes ses
+    images par les symétries du plateau.
+
+    :param board: Le plateau (25 cases EMPTY, BLACK ou RED).
+    :type board: bytearray
+    :param to_move: Le joueur qui a le trait (BLACK ou RED).
+    :type to_move: int
+    :return: Le couple (hachage canonique, indice de la symétrie).
+    :rtype: tuple[int, int]
+    """
+    return canonical_key(symmetric_hashes(board), to_move)